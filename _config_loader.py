@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+配置加载模块 - 带缓存的config.json读取
+
+按(路径, 修改时间)缓存解析结果，多次创建API客户端时不再重复读取和解析
+配置文件；文件被修改后自动重新加载。
+
+同时提供json_loads（安装了orjson时使用orjson），供各API客户端解析应答。
+
+此模块由dynadot_api、porkbun_api和domain_finder使用。
+"""
+
+import functools
+import json
+import os
+from typing import Any, Dict
+
+# orjson为可选依赖，解析JSON比标准库json快数倍
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def json_loads(text: str) -> Any:
+    """
+    解析JSON文本，安装了orjson时使用orjson
+
+    解析失败时抛出json.JSONDecodeError（orjson.JSONDecodeError是其子类）。
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(text)
+    return json.loads(text)
+
+def load_config(config_file: str = 'config.json') -> Dict[str, Any]:
+    """
+    读取并解析JSON配置文件
+
+    返回的字典在多次调用之间共享，调用方不应修改它。
+
+    Args:
+        config_file: 配置文件路径
+
+    Returns:
+        Dict[str, Any]: 配置内容
+
+    Raises:
+        OSError: 文件不存在或无法读取
+        ValueError: 文件不是合法的JSON
+    """
+    path = os.path.abspath(config_file)
+    return _parse_config(path, os.stat(path).st_mtime_ns)
+
+@functools.lru_cache(maxsize=4)
+def _parse_config(path: str, mtime_ns: int) -> Dict[str, Any]:
+    with open(path, 'rb') as f:
+        return json_loads(f.read())
@@ -0,0 +1,545 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+API客户端公共模块 - 域名注册商API客户端的共享逻辑
+
+各提供商的客户端只需说明如何构造请求、如何解析应答；
+单个查询、速率限制和并发批量查询由基类统一实现。
+安装了httpx或aiohttp时批量查询使用asyncio并发（httpx下走HTTP/2多路复用），
+否则使用线程池并发。
+
+此模块由dynadot_api和porkbun_api使用。
+"""
+
+import asyncio
+import atexit
+import enum
+import logging
+import os
+import sqlite3
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from dns_resolver import DEFAULT_NAMESERVERS, RCODE_NOERROR, UDPResolver
+from rate_limiter import TokenBucket
+from result_cache import ResultCache
+
+# aiohttp为可选依赖，可用时批量查询在单个事件循环中并发执行
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+# httpx为可选依赖，可用时优先使用，通过HTTP/2在少量连接上多路复用所有查询
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+ASYNC_AVAILABLE = HTTPX_AVAILABLE or AIOHTTP_AVAILABLE
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+# 批量查询的最大并发请求数
+DEFAULT_CONCURRENCY = 64
+MAX_THREAD_WORKERS = 32  # 线程池模式下的最大线程数
+
+# 异步请求遇到HTTP 429时的重试参数（指数退避 + 随机抖动）
+MAX_429_RETRIES = 3
+BACKOFF_BASE = 1.0  # 秒
+BACKOFF_MAX = 30.0  # 秒
+
+# 查询结果缓存的有效期（秒）：已注册的域名很少被释放，可用的域名随时可能被抢注
+REGISTERED_TTL = 3600
+AVAILABLE_TTL = 300
+
+# DNS预检参数：有NS记录的域名几乎一定已注册，无需调用付费API
+DNS_PRECHECK_CONCURRENCY = 256
+DNS_PRECHECK_TIMEOUT = 2.0  # 秒
+DNS_CACHE_TTL = 300         # 进程内DNS预检结果的有效期（秒）
+DNS_DISK_CACHE_TTL = 900    # 磁盘上DNS预检结果的有效期（秒），多次运行之间共用
+DNS_CACHE_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'domain_finder', 'dns.db')
+DNS_REGISTERED_NOTE = "域名已注册（DNS）"
+
+# {域名: (过期时间, DNS是否显示已注册)}，同一进程内的所有客户端共用
+_dns_cache: Dict[str, Tuple[float, bool]] = {}
+_dns_cache_lock = threading.Lock()
+_dns_store: Optional[ResultCache] = None  # 磁盘DNS缓存，首次使用时打开
+_dns_store_failed = False
+
+def _get_dns_store() -> Optional[ResultCache]:
+    """打开（或返回已打开的）磁盘DNS缓存，无法打开时返回None"""
+    global _dns_store, _dns_store_failed
+    with _dns_cache_lock:
+        if _dns_store is None and not _dns_store_failed:
+            try:
+                if DNS_CACHE_FILE != ':memory:':
+                    os.makedirs(os.path.dirname(DNS_CACHE_FILE), exist_ok=True)
+                _dns_store = ResultCache(DNS_CACHE_FILE, ttl=DNS_DISK_CACHE_TTL)
+                atexit.register(_dns_store.close)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"无法打开DNS缓存 {DNS_CACHE_FILE}: {str(e)}")
+                _dns_store_failed = True
+        return _dns_store
+
+# HTTP连接池参数
+POOL_CONNECTIONS = 32
+POOL_MAXSIZE = 64
+HTTP2_MAX_CONNECTIONS = 8  # HTTP/2下每个连接可承载大量并发请求
+
+def create_session() -> requests.Session:
+    """创建带连接池和自动重试的HTTP会话，复用TCP+TLS长连接"""
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET', 'POST']),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+class ResultKind(enum.IntEnum):
+    """查询结果类型，备注文字只用于显示，判断结果一律使用类型"""
+    AVAILABLE = 0     # 可注册
+    REGISTERED = 1    # 已注册
+    RATE_LIMITED = 2  # 触发速率限制，需要重试
+    ERROR = 3         # 请求或解析出错
+
+    @property
+    def available(self) -> Optional[bool]:
+        """对应的是否可用：速率限制时为None，出错时按不可用处理"""
+        if self is ResultKind.RATE_LIMITED:
+            return None
+        return self is ResultKind.AVAILABLE
+
+class BaseDomainAPI:
+    """
+    域名查询API客户端基类
+
+    子类需要设置rate_limit、provider并实现_build_request和_parse_response。
+    所有请求（包括并发的批量查询）共用一个令牌桶，多个客户端实例
+    也可以通过limiter参数共享同一个令牌桶。确定的查询结果在TTL内
+    直接从缓存返回，不再占用令牌和网络请求。
+    """
+
+    rate_limit = 1.0  # 两次请求之间的平均最小间隔（秒）
+    provider = 'api'  # 结果缓存中使用的检查来源名称
+    dns_nameservers = DEFAULT_NAMESERVERS  # DNS预检使用的DNS服务器
+
+    def __init__(self, timeout: int, limiter: Optional[TokenBucket] = None,
+                 cache: Optional[ResultCache] = None):
+        """
+        初始化API客户端
+
+        Args:
+            timeout: 请求超时时间（秒）
+            limiter: 速率限制令牌桶，默认按rate_limit每次一个请求
+            cache: 持久化结果缓存，用于在多次运行之间复用查询结果（可选）
+        """
+        self.timeout = timeout
+        self.limiter = limiter or TokenBucket.per_interval(self.rate_limit)
+        self.session = create_session()  # 复用HTTP长连接
+        self.result_cache = cache
+        self._cache: Dict[str, Tuple[float, Tuple[bool, str]]] = {}  # {域名: (过期时间, 查询结果)}
+        self._cache_lock = threading.Lock()
+
+    def close(self) -> None:
+        """关闭HTTP会话，释放连接池中的套接字"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _build_request(self, domain: str) -> Tuple[str, str, Dict[str, Any]]:
+        """
+        构造查询请求
+
+        Returns:
+            Tuple[str, str, Dict[str, Any]]: (HTTP方法, URL, 请求参数如params/json/headers)
+        """
+        raise NotImplementedError
+
+    def _parse_response(self, status: int, text: str) -> Tuple[ResultKind, str]:
+        """
+        解析查询应答
+
+        Args:
+            status: HTTP状态码
+            text: 应答正文
+
+        Returns:
+            Tuple[ResultKind, str]: (结果类型, 错误/价格信息)
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _normalize_domain(domain: str) -> str:
+        """确保域名是完整的"""
+        if "." not in domain:
+            domain += ".com"
+            logger.debug(f"补全域名: {domain}")
+        return domain
+
+    def _get_cached(self, domain: str) -> Optional[Tuple[ResultKind, str]]:
+        """查找未过期的缓存结果，先查内存再查持久化缓存"""
+        key = domain.lower()
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                if time.monotonic() < entry[0]:
+                    return entry[1]
+                del self._cache[key]
+
+        if self.result_cache is None:
+            return None
+        hit = self.result_cache.get(key, self.provider)
+        if hit is None or hit[0] is None:
+            return None
+        kind = ResultKind.AVAILABLE if hit[0] else ResultKind.REGISTERED
+        result = (kind, hit[1] or "")
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic() + self._cache_ttl(kind), result)
+        return result
+
+    def _store_cached(self, domain: str, result: Tuple[ResultKind, str]) -> None:
+        """缓存确定的查询结果，出错和速率限制的应答不缓存"""
+        kind, note = result
+        if kind not in (ResultKind.AVAILABLE, ResultKind.REGISTERED):
+            return
+        key = domain.lower()
+        ttl = self._cache_ttl(kind)
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic() + ttl, result)
+        if self.result_cache is not None:
+            self.result_cache.set(key, self.provider, kind.available, note, ttl=ttl)
+
+    @staticmethod
+    def _cache_ttl(kind: ResultKind) -> float:
+        return AVAILABLE_TTL if kind is ResultKind.AVAILABLE else REGISTERED_TTL
+
+    def clear_cache(self) -> None:
+        """清空内存中的查询结果缓存"""
+        with self._cache_lock:
+            self._cache.clear()
+
+    def _respect_rate_limit(self):
+        """遵守API速率限制（线程安全，令牌不足时阻塞等待）"""
+        self.limiter.acquire()
+
+    async def _respect_rate_limit_async(self):
+        """遵守API速率限制（异步等待，不阻塞其他请求）"""
+        await self.limiter.acquire_async()
+
+    @staticmethod
+    def _backoff_delay(attempt: int) -> float:
+        """第attempt次重试前的等待时间：指数退避加随机抖动"""
+        return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+    def check_domain(self, domain: str) -> Tuple[bool, Optional[str]]:
+        """
+        检查域名是否可注册
+
+        Args:
+            domain: 要检查的域名（完整域名，包含TLD）
+
+        Returns:
+            Tuple[bool, Optional[str]]: (是否可用, 错误/价格信息)
+        """
+        kind, note = self._check_domain(domain)
+        return kind.available, note
+
+    def _check_domain(self, domain: str) -> Tuple[ResultKind, str]:
+        """检查域名，返回(结果类型, 错误/价格信息)"""
+        domain = self._normalize_domain(domain)
+        cached = self._get_cached(domain)
+        if cached is not None:
+            return cached
+
+        # 遵守速率限制
+        self._respect_rate_limit()
+
+        method, url, kwargs = self._build_request(domain)
+        try:
+            logger.debug(f"检查域名: {domain}")
+            response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            result = self._parse_response(response.status_code, response.text)
+            self._store_cached(domain, result)
+            return result
+        except requests.Timeout:
+            return ResultKind.ERROR, "请求超时"
+        except requests.RequestException as e:
+            return ResultKind.ERROR, f"请求异常: {str(e)}"
+        except Exception as e:
+            return ResultKind.ERROR, f"未知错误: {str(e)}"
+
+    async def _send_async(self, session, method: str, url: str,
+                          kwargs: Dict[str, Any]) -> Tuple[int, str]:
+        """通过httpx客户端或aiohttp会话发送请求，返回(HTTP状态码, 应答正文)"""
+        if HTTPX_AVAILABLE and isinstance(session, httpx.AsyncClient):
+            response = await session.request(method, url, **kwargs)
+            return response.status_code, response.text
+        async with session.request(method, url, **kwargs) as response:
+            return response.status, await response.text()
+
+    async def _check_domain_async(self, session, domain: str) -> Tuple[ResultKind, str]:
+        """使用httpx客户端或aiohttp会话检查域名，语义与check_domain一致"""
+        domain = self._normalize_domain(domain)
+        cached = self._get_cached(domain)
+        if cached is not None:
+            return cached
+
+        method, url, kwargs = self._build_request(domain)
+        try:
+            for attempt in range(MAX_429_RETRIES + 1):
+                # 遵守速率限制
+                await self._respect_rate_limit_async()
+
+                logger.debug(f"检查域名: {domain}")
+                status, text = await self._send_async(session, method, url, kwargs)
+                if status != 429 or attempt == MAX_429_RETRIES:
+                    result = self._parse_response(status, text)
+                    self._store_cached(domain, result)
+                    return result
+
+                delay = self._backoff_delay(attempt)
+                logger.debug(f"HTTP 429，{delay:.1f}秒后重试: {domain}")
+                await asyncio.sleep(delay)
+        except asyncio.TimeoutError:
+            return ResultKind.ERROR, "请求超时"
+        except Exception as e:
+            if HTTPX_AVAILABLE and isinstance(e, httpx.TimeoutException):
+                return ResultKind.ERROR, "请求超时"
+            if ((HTTPX_AVAILABLE and isinstance(e, httpx.HTTPError)) or
+                    (AIOHTTP_AVAILABLE and isinstance(e, aiohttp.ClientError))):
+                return ResultKind.ERROR, f"请求异常: {str(e)}"
+            return ResultKind.ERROR, f"未知错误: {str(e)}"
+
+    def _create_dns_resolver(self) -> UDPResolver:
+        """创建DNS预检使用的解析器"""
+        return UDPResolver(self.dns_nameservers, timeout=DNS_PRECHECK_TIMEOUT, retries=1)
+
+    def dns_precheck(self, domains: List[str],
+                     concurrency: int = DNS_PRECHECK_CONCURRENCY) -> Dict[str, bool]:
+        """
+        通过DNS NS查询预先筛出已注册的域名
+
+        结果先在进程内缓存DNS_CACHE_TTL秒，同时写入磁盘缓存DNS_CACHE_FILE，
+        以后的运行在DNS_DISK_CACHE_TTL秒内直接复用。查询出错或超时的域名
+        视为未注册，交给API确认，且不缓存。
+
+        Args:
+            domains: 要检查的域名列表
+            concurrency: 最大并发DNS查询数
+
+        Returns:
+            Dict[str, bool]: {域名: DNS是否显示已注册}
+        """
+        results = {}
+        pending = []
+        now = time.monotonic()
+        store = _get_dns_store()
+        for domain in domains:
+            key = self._normalize_domain(domain).lower()
+            with _dns_cache_lock:
+                entry = _dns_cache.get(key)
+            if entry is not None and now < entry[0]:
+                results[domain] = entry[1]
+                continue
+            hit = store.get(key, 'dns_ns') if store is not None else None
+            if hit is not None:
+                results[domain] = hit[0]
+                with _dns_cache_lock:
+                    _dns_cache[key] = (now + DNS_CACHE_TTL, hit[0])
+            else:
+                pending.append(domain)
+
+        if pending:
+            try:
+                fresh = asyncio.run(self._dns_precheck_async(pending, concurrency))
+            except OSError as e:
+                logger.warning(f"DNS预检不可用，全部交给API查询: {str(e)}")
+                fresh = {}
+            expires_at = time.monotonic() + DNS_CACHE_TTL
+            for domain, registered in fresh.items():
+                if registered is None:
+                    continue
+                key = self._normalize_domain(domain).lower()
+                with _dns_cache_lock:
+                    _dns_cache[key] = (expires_at, registered)
+                if store is not None:
+                    store.set(key, 'dns_ns', registered, None)
+            results.update({domain: bool(fresh.get(domain)) for domain in pending})
+        return results
+
+    async def _dns_precheck_async(self, domains: List[str], concurrency: int) -> Dict[str, Optional[bool]]:
+        """在一个流水线式UDP解析器上并发查询所有域名的NS记录，查询出错时为None"""
+        sem = asyncio.Semaphore(concurrency)
+
+        async with self._create_dns_resolver() as resolver:
+            async def registered(domain: str) -> Optional[bool]:
+                async with sem:
+                    try:
+                        rcode, _ = await resolver.query(self._normalize_domain(domain), 'NS')
+                    except Exception as e:
+                        logger.debug(f"DNS预检失败: {domain} - {str(e)}")
+                        return None
+                    # 域名存在（NOERROR）即视为已注册，NXDOMAIN和其他错误交给API确认
+                    return rcode == RCODE_NOERROR
+
+            flags = await asyncio.gather(*[registered(domain) for domain in domains])
+        return dict(zip(domains, flags))
+
+    def batch_check(self, domains: List[str], max_errors: int = 5,
+                    concurrency: int = DEFAULT_CONCURRENCY,
+                    use_async: Optional[bool] = None,
+                    dns_precheck: bool = False) -> Dict[str, Tuple[bool, str]]:
+        """
+        并发批量检查多个域名
+
+        请求发送受令牌桶限制，但各请求的网络往返相互重叠。
+        启用DNS预检时，有NS记录的域名直接判定为已注册，不再调用API。
+
+        Args:
+            domains: 要检查的域名列表
+            max_errors: 最大连续错误次数，超过此值将中止批量查询
+            concurrency: 最大并发请求数
+            use_async: 是否使用异步并发，默认在安装了httpx或aiohttp时使用，
+                False时使用线程池并发
+            dns_precheck: 是否先用DNS NS查询筛掉已注册的域名
+
+        Returns:
+            Dict[str, Tuple[bool, str]]: {域名: (是否可用, 错误/价格信息)}，顺序与输入一致
+        """
+        results = {}
+        to_query = domains
+        if dns_precheck:
+            registered = self.dns_precheck(domains)
+            to_query = [domain for domain in domains if not registered[domain]]
+            for domain in domains:
+                if registered[domain]:
+                    results[domain] = (False, DNS_REGISTERED_NOTE)
+            logger.info(f"DNS预检: {len(domains) - len(to_query)}/{len(domains)} 个域名已注册，"
+                        f"{len(to_query)} 个交给API查询")
+
+        if to_query:
+            tracker = _ErrorTracker(max_errors)
+            if use_async is None:
+                use_async = ASYNC_AVAILABLE
+            if use_async:
+                results.update(asyncio.run(self._batch_check_async(to_query, tracker, concurrency)))
+            else:
+                results.update(self._batch_check_threaded(to_query, tracker, concurrency))
+        return {domain: results[domain] for domain in domains if domain in results}
+
+    async def _batch_check_async(self, domains: List[str], tracker: '_ErrorTracker',
+                                 concurrency: int) -> Dict[str, Tuple[bool, str]]:
+        """在单个httpx客户端（HTTP/2）或aiohttp会话上并发检查所有域名"""
+        results = {}
+        sem = asyncio.Semaphore(concurrency)
+
+        async with self._create_async_session(concurrency) as session:
+            async def bounded(domain: str) -> None:
+                async with sem:
+                    if tracker.aborted:
+                        return
+                    kind, note = await self._check_domain_async(session, domain)
+
+                    # 处理速率限制
+                    if kind is ResultKind.RATE_LIMITED:
+                        logger.warning(f"达到速率限制，等待{self.rate_limit}秒后重试...")
+                        kind, note = await self._check_domain_async(session, domain)
+
+                    results[domain] = (kind.available, note)
+                    tracker.record(domain, kind, note)
+
+            await asyncio.gather(*[bounded(domain) for domain in domains])
+        return results
+
+    def _create_async_session(self, concurrency: int):
+        """创建批量查询共用的异步HTTP客户端"""
+        if HTTPX_AVAILABLE:
+            limits = httpx.Limits(max_connections=HTTP2_MAX_CONNECTIONS,
+                                  max_keepalive_connections=HTTP2_MAX_CONNECTIONS)
+            # 连接池等待不计入超时，令牌桶已经限制了请求速率
+            timeout = httpx.Timeout(self.timeout, pool=None)
+            try:
+                return httpx.AsyncClient(http2=True, limits=limits, timeout=timeout)
+            except ImportError:
+                # 未安装h2时退回HTTP/1.1，按并发数放宽连接数
+                limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+                return httpx.AsyncClient(limits=limits, timeout=timeout)
+
+        connector = aiohttp.TCPConnector(limit_per_host=concurrency, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    def _batch_check_threaded(self, domains: List[str], tracker: '_ErrorTracker',
+                              concurrency: int) -> Dict[str, Tuple[bool, str]]:
+        """使用线程池并发检查所有域名"""
+        def check(domain: str) -> Optional[Tuple[ResultKind, str]]:
+            if tracker.aborted:
+                return None
+            kind, note = self._check_domain(domain)
+
+            # 处理速率限制
+            if kind is ResultKind.RATE_LIMITED:
+                logger.warning(f"达到速率限制，等待{self.rate_limit}秒后重试...")
+                kind, note = self._check_domain(domain)
+            return kind, note
+
+        results = {}
+        max_workers = max(1, min(concurrency, MAX_THREAD_WORKERS, len(domains)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(check, domain): domain for domain in domains}
+            for future in as_completed(futures):
+                result = future.result()
+                if result is None:
+                    continue
+                domain = futures[future]
+                kind, note = result
+                results[domain] = (kind.available, note)
+                tracker.record(domain, kind, note)
+                if tracker.aborted:
+                    # 取消尚未开始的查询，只等待正在进行的请求结束
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    break
+        return results
+
+class _ErrorTracker:
+    """统计连续错误次数，超过上限后中止剩余的查询"""
+
+    def __init__(self, max_errors: int):
+        self.max_errors = max_errors
+        self.consecutive_errors = 0
+        self.aborted = False
+        self._lock = threading.Lock()
+
+    def record(self, domain: str, kind: ResultKind, note: str) -> None:
+        with self._lock:
+            # 重置或增加连续错误计数
+            if kind is ResultKind.ERROR:
+                self.consecutive_errors += 1
+                logger.warning(f"连续错误 {self.consecutive_errors}/{self.max_errors}: {domain} - {note}")
+
+                if self.consecutive_errors >= self.max_errors and not self.aborted:
+                    logger.error(f"连续错误次数超过{self.max_errors}次，中止批量查询")
+                    self.aborted = True
+            else:
+                self.consecutive_errors = 0
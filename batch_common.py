@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量运行公共模块 - run_batch和run_full_scan共用的辅助函数
+
+此模块由run_batch和run_full_scan使用，map_file也供命令行和图形界面查看结果时使用。
+"""
+
+import atexit
+import contextlib
+import io
+import itertools
+import mmap
+import os
+import signal
+import subprocess
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# 增量计数时每次读取的块大小
+READ_CHUNK_SIZE = 1 << 20
+# 校验文件未被重写时比对的尾部字节数
+TAIL_CHECK_SIZE = 64
+# 查看结果文件时每次读取并输出的行数
+LINE_BLOCK_SIZE = 10000
+# 进度文件的写缓冲区大小
+PROGRESS_BUFFER_SIZE = 1 << 16
+# 子进程超时后发送SIGTERM，等待其保存进度的时间（秒），超过后强制终止
+TERMINATE_GRACE = 5
+
+# 日志和进度记录使用的时间格式
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_timestamp_cache = (0, '')
+
+def format_timestamp() -> str:
+    """返回当前时间的字符串，同一秒内的多次调用复用上次格式化的结果"""
+    global _timestamp_cache
+    now = int(time.time())
+    if now != _timestamp_cache[0]:
+        _timestamp_cache = (now, time.strftime(TIMESTAMP_FORMAT, time.localtime(now)))
+    return _timestamp_cache[1]
+
+class LineCounter:
+    """
+    增量行数统计
+
+    记住每个文件上次统计时的(大小, 修改时间, 行数, 末尾字节)。大小和修改时间都没变时
+    只需一次stat调用直接返回上次的结果；否则只读取新追加的部分，文件变小或末尾内容
+    变化（被整体重写）时重新完整统计。
+    """
+
+    def __init__(self):
+        self._state: Dict[str, Tuple[int, int, int, bytes]] = {}
+
+    def count(self, path: str) -> int:
+        """
+        统计文件的行数（换行符个数）
+
+        Args:
+            path: 文件路径
+
+        Returns:
+            int: 行数，文件不存在或无法读取时返回0
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._state.pop(path, None)
+            return 0
+
+        last_size, last_mtime, last_count, last_tail = self._state.get(path, (0, 0, 0, b''))
+        if st.st_size == last_size and st.st_mtime_ns == last_mtime:
+            return last_count
+
+        try:
+            with open(path, 'rb') as f:
+                offset = self._resume_offset(f, st.st_size, last_size, last_tail)
+                count = last_count if offset else 0
+                f.seek(offset)
+                while True:
+                    chunk = f.read(READ_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    count += chunk.count(b'\n')
+                    offset += len(chunk)
+                f.seek(max(0, offset - TAIL_CHECK_SIZE))
+                tail = f.read(TAIL_CHECK_SIZE)
+        except OSError:
+            return last_count
+
+        self._state[path] = (offset, st.st_mtime_ns, count, tail)
+        return count
+
+    @staticmethod
+    def _resume_offset(f, size: int, last_size: int, last_tail: bytes) -> int:
+        """上次统计的内容仍是文件前缀时返回上次的大小，否则返回0（重新统计）"""
+        if not last_size or size < last_size:
+            return 0
+        f.seek(last_size - len(last_tail))
+        if f.read(len(last_tail)) != last_tail:
+            return 0
+        return last_size
+
+_line_counter = LineCounter()
+
+def count_lines(path: str) -> int:
+    """统计文件行数（增量统计，文件不存在时返回0）"""
+    return _line_counter.count(path)
+
+def get_domain_counts(checked_file: str = 'checked_domains.csv',
+                      available_file: str = 'available_domains.csv') -> Tuple[int, int]:
+    """获取当前已检查和可用域名数量（增量统计，只读取上次之后新增的内容）"""
+    return _line_counter.count(checked_file), _line_counter.count(available_file)
+
+@contextlib.contextmanager
+def map_file(path: str):
+    """
+    以只读方式映射整个文件，不把内容读入Python对象
+
+    逐行读取用iter(mm.readline, b'')；行数用count_lines统计。
+
+    Args:
+        path: 文件路径
+
+    Yields:
+        mmap.mmap: 文件映射；文件为空（无法映射）时为None
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield None
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+def iter_line_blocks(mm, block_size: int = LINE_BLOCK_SIZE) -> Iterator[List[bytes]]:
+    """
+    按块逐行读取映射的文件，每块最多block_size行
+
+    Args:
+        mm: map_file得到的文件映射，为None时不产生任何块
+        block_size: 每块的行数
+
+    Yields:
+        List[bytes]: 一块原始行（含换行符）
+    """
+    if mm is None:
+        return
+    lines = iter(mm.readline, b'')
+    while True:
+        block = list(itertools.islice(lines, block_size))
+        if not block:
+            return
+        yield block
+
+class ProgressWriter:
+    """
+    批次进度CSV写入器
+
+    文件在第一次写入时以追加模式打开并保持打开，行先写入缓冲区，
+    程序退出时统一刷新并关闭，不再每个批次打开、写入、关闭一次。
+
+    列是固定的，字段值都是数字、布尔值、时间戳或前缀这类不含逗号和引号的
+    简单值，因此不经过csv模块，直接用预先生成的格式串拼接整行。
+    """
+
+    def __init__(self, path: str, fieldnames: List[str]):
+        self.path = path
+        self.fieldnames = fieldnames
+        self._header = ','.join(fieldnames) + '\n'
+        self._row_format = ','.join('{%s}' % name for name in fieldnames) + '\n'
+        self._file = None
+
+    def write(self, row: Dict) -> None:
+        """追加一行进度记录，新文件先写入表头"""
+        if self._file is None:
+            self._upgrade_columns()
+            # 二进制模式加缓冲写入，跳过文本层的编码处理
+            raw = open(self.path, 'ab', buffering=0)
+            self._file = io.BufferedWriter(raw, buffer_size=PROGRESS_BUFFER_SIZE)
+            if raw.tell() == 0:
+                self._file.write(self._header.encode('utf-8'))
+            atexit.register(self.close)
+        self._file.write(self._row_format.format_map(row).encode('utf-8'))
+
+    def record(self, batch_start: float, success: bool, **fields) -> Tuple[int, int, float]:
+        """
+        记录一个批次的结果：统计当前域名数量和批次耗时，连同其余字段写入一行
+
+        Args:
+            batch_start: 批次开始时间（time.time()）
+            success: 批次是否成功
+            **fields: 其余列的值，如batch_type、length、limit
+
+        Returns:
+            Tuple[int, int, float]: (已检查域名数, 可用域名数, 耗时秒数)
+        """
+        checked, available = get_domain_counts()
+        duration = time.time() - batch_start
+        self.write(dict(fields, timestamp=format_timestamp(), success=success,
+                        checked_count=checked, available_count=available,
+                        duration=round(duration, 2)))
+        return checked, available, duration
+
+    def _upgrade_columns(self) -> None:
+        """已有文件的表头与当前列不同时（旧版本写入），按列名重排旧记录，缺少的列留空"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return
+        if not lines or lines[0] + '\n' == self._header:
+            return
+
+        old_fields = lines[0].split(',')
+        rows = [dict(zip(old_fields, line.split(','))) for line in lines[1:] if line]
+        with open(self.path, 'w', encoding='utf-8', newline='') as f:
+            f.write(self._header)
+            f.writelines(','.join(row.get(name, '') for name in self.fieldnames) + '\n'
+                         for row in rows)
+
+    def close(self) -> None:
+        """刷新缓冲区并关闭文件"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+class BatchTimeout(BaseException):
+    """进程内运行超时（继承BaseException，避免被检查代码中的except Exception吞掉）"""
+
+_domain_finder = None
+
+def _load_domain_finder():
+    """首次使用时导入domain_finder，之后的批次复用已加载的模块和其中的缓存"""
+    global _domain_finder
+    if _domain_finder is None:
+        import domain_finder
+        _domain_finder = domain_finder
+    return _domain_finder
+
+def _raise_timeout(signum, frame):
+    raise BatchTimeout()
+
+def run_in_process(args: List[str], timeout: Optional[float] = None,
+                   words: Optional[List[str]] = None,
+                   interruptible: bool = False) -> Optional[int]:
+    """
+    在当前进程中运行一次domain_finder
+
+    超时通过SIGALRM实现，只能在POSIX系统的主线程中使用；不设超时时可在任意线程中调用。
+
+    Args:
+        args: domain_finder的命令行参数
+        timeout: 超时时间（秒），None表示不限制
+        words: 要检查的单词列表（可选），直接传给domain_finder.run
+        interruptible: 运行期间临时恢复SIGINT的默认处理（仅主线程有效），
+            使调用方自定义或忽略了SIGINT时Ctrl+C仍能中断本次检查
+
+    Returns:
+        Optional[int]: 退出码；无法在进程内运行（导入失败或无法设置超时）时返回None，
+            调用方应改用子进程运行
+
+    Raises:
+        BatchTimeout: 运行超时
+    """
+    use_alarm = bool(timeout)
+    if use_alarm and (not hasattr(signal, 'SIGALRM') or
+                      threading.current_thread() is not threading.main_thread()):
+        return None
+
+    try:
+        module = _load_domain_finder()
+    except ImportError:
+        return None
+
+    previous_int = None
+    if interruptible and threading.current_thread() is threading.main_thread():
+        previous_int = signal.signal(signal.SIGINT, signal.default_int_handler)
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return module.run(args, words)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+        if previous_int is not None:
+            signal.signal(signal.SIGINT, previous_int)
+
+def run_subprocess(cmd: List[str], timeout: Optional[float] = None,
+                   input: Optional[str] = None,
+                   log: Callable[[str], None] = print) -> int:
+    """
+    运行子进程，超时后先让子进程保存进度再结束
+
+    超时后先发送SIGTERM，让domain_finder保存已完成的结果并退出；
+    TERMINATE_GRACE秒内仍未退出时才强制终止。
+
+    Args:
+        cmd: 命令及参数
+        timeout: 超时时间（秒），None表示不限制
+        input: 写入子进程标准输入的文本（可选）
+        log: 输出超时处理过程的函数
+
+    Returns:
+        int: 子进程的返回码
+
+    Raises:
+        subprocess.TimeoutExpired: 运行超时（子进程已结束）
+    """
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE if input is not None else None,
+                            text=input is not None)
+    try:
+        proc.communicate(input, timeout=timeout)
+        return proc.returncode
+    except subprocess.TimeoutExpired as e:
+        log(f"命令执行超时（{timeout}秒），通知子进程保存进度后退出...")
+        proc.terminate()
+        try:
+            proc.communicate(timeout=TERMINATE_GRACE)
+            log("子进程已保存进度并退出")
+        except subprocess.TimeoutExpired:
+            log(f"子进程{TERMINATE_GRACE}秒内未退出，强制终止")
+            proc.kill()
+            proc.communicate()
+        raise e
+    except BaseException:
+        proc.kill()
+        proc.wait()
+        raise
@@ -0,0 +1,583 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DNS解析模块 - 基于长连接UDP套接字的流水线式异步DNS查询
+
+所有查询共用少量长连接UDP套接字，按事务ID(txid)匹配应答；
+发送按批次合并，接收在每次可读事件中一次性取完，
+从而摊薄每个查询的系统调用和事件循环开销。
+
+另提供DNS-over-HTTPS解析器(DoHResolver)，在少量长连接上复用所有查询，
+适用于本地网络无法直接访问53端口的情况。
+
+此模块可以独立使用，也可以集成到域名查找工具中。
+"""
+
+import asyncio
+import ctypes
+import logging
+import os
+import random
+import socket
+import struct
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# httpx为可选依赖，可用时通过HTTP/2在少量连接上多路复用DoH查询
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+# DNS常量
+QTYPES = {'A': 1, 'NS': 2, 'CNAME': 5, 'SOA': 6, 'MX': 15, 'TXT': 16, 'AAAA': 28}
+RCODE_NOERROR = 0
+RCODE_SERVFAIL = 2
+RCODE_NXDOMAIN = 3
+RCODE_NAMES = {0: 'NOERROR', 1: 'FORMERR', 2: 'SERVFAIL', 3: 'NXDOMAIN', 4: 'NOTIMP', 5: 'REFUSED'}
+
+# 解析器参数
+DEFAULT_NAMESERVERS = ['8.8.8.8', '1.1.1.1']
+DEFAULT_TIMEOUT = 2.0  # 单次查询超时（秒）
+DEFAULT_RETRIES = 2    # 超时后的重试次数（轮换DNS服务器）
+MAX_BATCH = 512        # 每批最多合并发送的查询数
+MAX_WAIT = 0.002       # 批次未满时的最长等待时间（秒）
+RECV_BUFSIZE = 4096
+
+# 每次recvmmsg最多读取的应答数
+MMSG_RECV_BATCH = 64
+
+# DNS-over-HTTPS参数
+DEFAULT_DOH_URL = 'https://cloudflare-dns.com/dns-query'
+DOH_MAX_CONNECTIONS = 16
+DOH_CONTENT_TYPE = 'application/dns-message'
+
+class DNSQueryError(Exception):
+    """DNS查询失败（超时或套接字错误）"""
+
+def system_nameservers(resolv_conf: str = '/etc/resolv.conf') -> List[str]:
+    """
+    读取系统配置的DNS服务器
+
+    Args:
+        resolv_conf: resolv.conf文件路径
+
+    Returns:
+        List[str]: DNS服务器地址列表，读取失败时返回公共DNS
+    """
+    servers = []
+    try:
+        with open(resolv_conf, 'r') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] == 'nameserver':
+                    servers.append(parts[1])
+    except OSError:
+        pass
+    return servers or list(DEFAULT_NAMESERVERS)
+
+def build_query(txid: int, domain: str, qtype: str = 'A') -> bytes:
+    """
+    构建DNS查询报文 (RFC 1035)
+
+    Args:
+        txid: 事务ID (0-65535)
+        domain: 要查询的域名
+        qtype: 查询类型，如'A'、'NS'
+
+    Returns:
+        bytes: 查询报文
+    """
+    # 报文头：ID, 标志(RD=1), QDCOUNT=1, ANCOUNT, NSCOUNT, ARCOUNT
+    header = struct.pack('!HHHHHH', txid, 0x0100, 1, 0, 0, 0)
+    labels = domain.rstrip('.').encode('idna').split(b'.')
+    qname = b''.join(bytes((len(label),)) + label for label in labels) + b'\x00'
+    return header + qname + struct.pack('!HH', QTYPES[qtype], 1)
+
+def parse_response(data: bytes) -> Tuple[int, int, int]:
+    """
+    解析DNS应答报文头
+
+    Args:
+        data: 应答报文
+
+    Returns:
+        Tuple[int, int, int]: (事务ID, 响应码, 应答记录数)
+    """
+    if len(data) < 12:
+        raise ValueError("DNS应答报文过短")
+    txid, flags, _qdcount, ancount, _nscount, _arcount = struct.unpack_from('!HHHHHH', data)
+    return txid, flags & 0x000F, ancount
+
+class _IOVec(ctypes.Structure):
+    _fields_ = [('iov_base', ctypes.c_void_p), ('iov_len', ctypes.c_size_t)]
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [('msg_name', ctypes.c_void_p), ('msg_namelen', ctypes.c_uint32),
+                ('msg_iov', ctypes.POINTER(_IOVec)), ('msg_iovlen', ctypes.c_size_t),
+                ('msg_control', ctypes.c_void_p), ('msg_controllen', ctypes.c_size_t),
+                ('msg_flags', ctypes.c_int)]
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [('msg_hdr', _MsgHdr), ('msg_len', ctypes.c_uint)]
+
+def _load_mmsg():
+    """加载libc中的sendmmsg/recvmmsg（仅Linux），不可用时返回None"""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        sendmmsg, recvmmsg = libc.sendmmsg, libc.recvmmsg
+    except (OSError, AttributeError):
+        return None
+    sendmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint, ctypes.c_int]
+    sendmmsg.restype = ctypes.c_int
+    recvmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint, ctypes.c_int,
+                         ctypes.c_void_p]
+    recvmmsg.restype = ctypes.c_int
+    return sendmmsg, recvmmsg
+
+_MMSG = _load_mmsg()
+MMSG_AVAILABLE = _MMSG is not None
+
+def _raise_errno() -> None:
+    err = ctypes.get_errno()
+    raise OSError(err, os.strerror(err))
+
+class _MMsgBatch:
+    """
+    sendmmsg/recvmmsg的封装，一次系统调用收发多个UDP报文
+
+    报文头和接收缓冲区预先分配，每次调用只填写地址和长度。
+    套接字需已connect，且为非阻塞模式。
+    """
+
+    def __init__(self, size: int, recv_bufsize: int = RECV_BUFSIZE):
+        self.size = size
+        self._msgs = (_MMsgHdr * size)()
+        self._iovs = (_IOVec * size)()
+        self._bufs = ctypes.create_string_buffer(size * recv_bufsize)
+        self._recv_bufsize = recv_bufsize
+        for i in range(size):
+            self._msgs[i].msg_hdr.msg_iov = ctypes.pointer(self._iovs[i])
+            self._msgs[i].msg_hdr.msg_iovlen = 1
+
+    def send(self, fd: int, packets: List[bytes]) -> int:
+        """
+        发送最多size个报文
+
+        Returns:
+            int: 实际发送的报文数
+
+        Raises:
+            BlockingIOError: 发送缓冲区已满，一个也未发送
+            OSError: 第一个报文发送失败
+        """
+        count = min(len(packets), self.size)
+        for i in range(count):
+            packet = packets[i]
+            self._iovs[i].iov_base = ctypes.cast(packet, ctypes.c_void_p)
+            self._iovs[i].iov_len = len(packet)
+        sent = _MMSG[0](fd, self._msgs, count, 0)
+        if sent < 0:
+            _raise_errno()
+        return sent
+
+    def recv(self, fd: int) -> List[bytes]:
+        """
+        读取最多size个已到达的报文
+
+        Raises:
+            BlockingIOError: 没有已到达的报文
+            OSError: 读取出错
+        """
+        base = ctypes.addressof(self._bufs)
+        for i in range(self.size):
+            self._iovs[i].iov_base = base + i * self._recv_bufsize
+            self._iovs[i].iov_len = self._recv_bufsize
+        received = _MMSG[1](fd, self._msgs, self.size, 0, None)
+        if received < 0:
+            _raise_errno()
+        return [ctypes.string_at(base + i * self._recv_bufsize, self._msgs[i].msg_len)
+                for i in range(received)]
+
+class UDPResolver:
+    """
+    流水线式异步DNS解析器
+
+    每个DNS服务器对应一个长连接UDP套接字，所有查询复用这些套接字，
+    应答按事务ID分发给等待中的查询。需在事件循环中使用：
+
+        async with UDPResolver() as resolver:
+            rcode, ancount = await resolver.query('example.com')
+    """
+
+    def __init__(self, nameservers: Optional[List[str]] = None,
+                 port: int = 53,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 retries: int = DEFAULT_RETRIES,
+                 max_batch: int = MAX_BATCH,
+                 max_wait: float = MAX_WAIT,
+                 use_mmsg: bool = MMSG_AVAILABLE):
+        """
+        初始化解析器
+
+        Args:
+            nameservers: DNS服务器列表，默认读取系统配置
+            port: DNS服务器端口
+            timeout: 单次查询超时时间（秒）
+            retries: 超时后的重试次数
+            max_batch: 每批最多合并发送的查询数
+            max_wait: 批次未满时的最长等待时间（秒）
+            use_mmsg: 是否用sendmmsg/recvmmsg在一次系统调用中收发整批报文（仅Linux）
+        """
+        self.nameservers = nameservers or system_nameservers()
+        self.port = port
+        self.timeout = timeout
+        self.retries = retries
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+
+        self._loop = None
+        self._socks: List[socket.socket] = []
+        # txid -> (问题段, 等待应答的future)
+        self._pending: Dict[int, Tuple[bytes, asyncio.Future]] = {}
+        self._send_queue: List[Tuple[int, bytes]] = []
+        self._flush_handle = None
+        use_mmsg = use_mmsg and MMSG_AVAILABLE
+        self._sender = _MMsgBatch(max_batch, recv_bufsize=0) if use_mmsg else None
+        self._receiver = _MMsgBatch(MMSG_RECV_BATCH) if use_mmsg else None
+
+    async def __aenter__(self):
+        self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+    def open(self) -> None:
+        """创建UDP套接字并注册到当前事件循环"""
+        if self._socks:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        try:
+            for index, server in enumerate(self.nameservers):
+                family, _, _, _, address = socket.getaddrinfo(
+                    server, self.port, type=socket.SOCK_DGRAM)[0]
+                sock = socket.socket(family, socket.SOCK_DGRAM)
+                sock.setblocking(False)
+                sock.connect(address)
+                self._socks.append(sock)
+                self._loop.add_reader(sock.fileno(), self._drain_replies, index)
+        except OSError:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """关闭套接字，并让所有未完成的查询失败"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        for sock in self._socks:
+            try:
+                self._loop.remove_reader(sock.fileno())
+            except Exception:
+                pass
+            sock.close()
+        self._socks = []
+        self._send_queue = []
+
+        for _, future in self._pending.values():
+            if not future.done():
+                future.set_exception(DNSQueryError("解析器已关闭"))
+        self._pending.clear()
+
+    async def query(self, domain: str, qtype: str = 'A') -> Tuple[int, int]:
+        """
+        查询域名
+
+        Args:
+            domain: 要查询的域名
+            qtype: 查询类型，如'A'、'NS'
+
+        Returns:
+            Tuple[int, int]: (响应码, 应答记录数)
+
+        Raises:
+            DNSQueryError: 所有重试均超时或套接字出错
+        """
+        if not self._socks:
+            self.open()
+
+        for attempt in range(self.retries + 1):
+            txid = self._alloc_txid()
+            packet = build_query(txid, domain, qtype)
+            future = self._loop.create_future()
+            self._pending[txid] = (packet[12:], future)
+            self._enqueue(attempt % len(self._socks), packet)
+
+            try:
+                return await asyncio.wait_for(future, self.timeout)
+            except asyncio.TimeoutError:
+                logger.debug(f"DNS查询超时 ({attempt + 1}/{self.retries + 1}): {domain}")
+            finally:
+                entry = self._pending.get(txid)
+                if entry is not None and entry[1] is future:
+                    del self._pending[txid]
+
+        raise DNSQueryError(f"DNS查询超时: {domain}")
+
+    def _alloc_txid(self) -> int:
+        """分配一个未被占用的随机事务ID"""
+        if len(self._pending) >= 0xFFFF:
+            raise DNSQueryError("并发查询数超过事务ID上限")
+        txid = random.getrandbits(16)
+        while txid in self._pending:
+            txid = random.getrandbits(16)
+        return txid
+
+    def _enqueue(self, sock_index: int, packet: bytes) -> None:
+        """将查询加入发送队列，批次已满或等待超时时统一发送"""
+        self._send_queue.append((sock_index, packet))
+        if len(self._send_queue) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(self.max_wait, self._flush)
+
+    def _flush(self) -> None:
+        """发送队列中的所有查询"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        queue, self._send_queue = self._send_queue, []
+        if self._sender is not None:
+            self._flush_batched(queue)
+            return
+
+        for i, (sock_index, packet) in enumerate(queue):
+            try:
+                self._socks[sock_index].send(packet)
+            except (BlockingIOError, InterruptedError):
+                # 发送缓冲区已满，剩余报文稍后再发
+                self._send_queue = queue[i:] + self._send_queue
+                self._flush_handle = self._loop.call_later(self.max_wait, self._flush)
+                return
+            except OSError as e:
+                self._fail_packet(packet, e)
+
+    def _flush_batched(self, queue: List[Tuple[int, bytes]]) -> None:
+        """按套接字分组，用sendmmsg一次发送一组报文"""
+        by_sock: Dict[int, List[bytes]] = {}
+        for sock_index, packet in queue:
+            by_sock.setdefault(sock_index, []).append(packet)
+
+        for sock_index, packets in by_sock.items():
+            fd = self._socks[sock_index].fileno()
+            sent = 0
+            while sent < len(packets):
+                try:
+                    sent += self._sender.send(fd, packets[sent:sent + self._sender.size])
+                except (BlockingIOError, InterruptedError):
+                    # 发送缓冲区已满，剩余报文稍后再发
+                    self._send_queue.extend((sock_index, packet) for packet in packets[sent:])
+                    break
+                except OSError as e:
+                    self._fail_packet(packets[sent], e)
+                    sent += 1
+
+        if self._send_queue and self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(self.max_wait, self._flush)
+
+    def _fail_packet(self, packet: bytes, error: OSError) -> None:
+        """报文发送失败时让对应的查询立即失败"""
+        txid = struct.unpack_from('!H', packet)[0]
+        entry = self._pending.pop(txid, None)
+        if entry is not None and not entry[1].done():
+            entry[1].set_exception(DNSQueryError(f"发送DNS查询失败: {str(error)}"))
+
+    def _drain_replies(self, sock_index: int) -> None:
+        """一次性读取套接字中所有已到达的应答"""
+        sock = self._socks[sock_index]
+        if self._receiver is not None:
+            self._drain_batched(sock.fileno())
+            return
+
+        while True:
+            try:
+                data = sock.recv(RECV_BUFSIZE)
+            except (BlockingIOError, InterruptedError):
+                return
+            except ConnectionRefusedError:
+                # 收到ICMP端口不可达，忽略并继续读取
+                continue
+            except OSError as e:
+                logger.debug(f"读取DNS应答出错: {str(e)}")
+                return
+            self._handle_reply(data)
+
+    def _drain_batched(self, fd: int) -> None:
+        """用recvmmsg每次读取一批应答，直到没有已到达的应答"""
+        while True:
+            try:
+                replies = self._receiver.recv(fd)
+            except (BlockingIOError, InterruptedError):
+                return
+            except ConnectionRefusedError:
+                continue
+            except OSError as e:
+                logger.debug(f"读取DNS应答出错: {str(e)}")
+                return
+            for data in replies:
+                self._handle_reply(data)
+            if len(replies) < self._receiver.size:
+                return
+
+    def _handle_reply(self, data: bytes) -> None:
+        """解析一个应答并交给等待中的查询"""
+        try:
+            txid, rcode, ancount = parse_response(data)
+        except ValueError:
+            return
+
+        entry = self._pending.get(txid)
+        if entry is None:
+            return
+
+        # 校验问题段，丢弃过期或伪造的应答
+        question, future = entry
+        if data[12:12 + len(question)].lower() != question.lower():
+            return
+
+        del self._pending[txid]
+        if not future.done():
+            future.set_result((rcode, ancount))
+
+class DoHResolver:
+    """
+    DNS-over-HTTPS异步解析器 (RFC 8484)
+
+    查询报文以application/dns-message格式POST到DoH服务器，所有查询
+    复用同一个连接池。安装了httpx时使用HTTP/2多路复用，否则使用
+    requests连接池配合线程执行。接口与UDPResolver一致：
+
+        async with DoHResolver() as resolver:
+            rcode, ancount = await resolver.query('example.com')
+    """
+
+    def __init__(self, url: str = DEFAULT_DOH_URL,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 retries: int = DEFAULT_RETRIES,
+                 max_connections: int = DOH_MAX_CONNECTIONS):
+        """
+        初始化解析器
+
+        Args:
+            url: DoH服务器地址
+            timeout: 单次查询超时时间（秒）
+            retries: 失败后的重试次数
+            max_connections: 连接池最大连接数
+        """
+        self.url = url
+        self.timeout = timeout
+        self.retries = retries
+        self.max_connections = max_connections
+
+        self._client = None
+        self._session = None
+        self._executor = None
+
+    async def __aenter__(self):
+        self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    def open(self) -> None:
+        """创建HTTP连接池"""
+        if self._client is not None or self._session is not None:
+            return
+
+        if HTTPX_AVAILABLE:
+            limits = httpx.Limits(max_connections=self.max_connections,
+                                  max_keepalive_connections=self.max_connections)
+            # 排队等待连接的时间不计入超时
+            timeout = httpx.Timeout(self.timeout, pool=None)
+            try:
+                self._client = httpx.AsyncClient(http2=True, limits=limits, timeout=timeout)
+            except ImportError:
+                # 未安装h2时退回HTTP/1.1
+                self._client = httpx.AsyncClient(limits=limits, timeout=timeout)
+        else:
+            self._session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_connections)
+            self._session.mount('https://', adapter)
+            self._executor = ThreadPoolExecutor(max_workers=self.max_connections)
+
+    async def aclose(self) -> None:
+        """关闭连接池"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._session is not None:
+            self._executor.shutdown(wait=False)
+            self._session.close()
+            self._session = None
+            self._executor = None
+
+    async def query(self, domain: str, qtype: str = 'A') -> Tuple[int, int]:
+        """
+        查询域名
+
+        Args:
+            domain: 要查询的域名
+            qtype: 查询类型，如'A'、'NS'
+
+        Returns:
+            Tuple[int, int]: (响应码, 应答记录数)
+
+        Raises:
+            DNSQueryError: 所有重试均失败
+        """
+        if self._client is None and self._session is None:
+            self.open()
+
+        # RFC 8484建议事务ID固定为0，便于HTTP缓存
+        packet = build_query(0, domain, qtype)
+        last_error = None
+        for attempt in range(self.retries + 1):
+            try:
+                data = await self._post(packet)
+                _, rcode, ancount = parse_response(data)
+                return rcode, ancount
+            except Exception as e:
+                last_error = e
+                logger.debug(f"DoH查询失败 ({attempt + 1}/{self.retries + 1}): {domain} - {str(e)}")
+
+        raise DNSQueryError(f"DoH查询失败: {domain} ({str(last_error)})")
+
+    async def _post(self, packet: bytes) -> bytes:
+        """发送查询报文并返回应答报文"""
+        headers = {'Content-Type': DOH_CONTENT_TYPE, 'Accept': DOH_CONTENT_TYPE}
+        if self._client is not None:
+            response = await self._client.post(self.url, content=packet, headers=headers)
+            response.raise_for_status()
+            return response.content
+
+        def post_sync() -> bytes:
+            response = self._session.post(self.url, data=packet, headers=headers, timeout=self.timeout)
+            response.raise_for_status()
+            return response.content
+
+        return await asyncio.get_running_loop().run_in_executor(self._executor, post_sync)
@@ -10,31 +10,68 @@ Domain Finder - 高效的四字母域名查找工具
 许可证: MIT
 """
 
+import asyncio
+import atexit
+import gzip
 import itertools
 import socket
+import numpy as np
 import pandas as pd
 import time
 import os
 import logging
+import logging.handlers
 import argparse
 import threading
+import queue
+import signal
 import json
 import requests
 import random
 import string
+import sys
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 from typing import List, Dict, Tuple, Set, Optional, Any, Union
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("domain_finder.log"),
-        logging.StreamHandler()
-    ]
+from dns_resolver import UDPResolver, DoHResolver, DEFAULT_DOH_URL, RCODE_NOERROR, RCODE_NXDOMAIN, RCODE_NAMES
+from result_cache import ResultCache, DEFAULT_CACHE_FILE
+from rate_limiter import AdaptiveRateLimiter, TokenBucket
+from _config_loader import load_config
+from api_base import ResultKind
+
+# pyarrow为可选依赖，可用时用于多线程解析CSV和读写Parquet
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# numba为可选依赖，用于加速长名称的组合枚举和名称校验
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+# 配置日志：各线程只把日志记录放入队列，由后台线程统一写入文件和控制台
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(
+    _log_queue,
+    logging.FileHandler("domain_finder.log"),
+    logging.StreamHandler(),
+    respect_handler_level=True
 )
+for _handler in _log_listener.handlers:
+    _handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
 # ========== 配置常量 ==========
@@ -51,14 +88,66 @@ ALPHANUMERIC = string.ascii_lowercase + DIGITS
 RATE_LIMIT_PORKBUN = 11  # Porkbun限制每10秒一次查询，留出1秒余量
 RATE_LIMIT_DYNADOT = 2   # Dynadot API限制未知，假设2秒
 
+# 支持一次请求查询多个域名的API提供商及每批最大域名数
+DYNADOT_BATCH_SIZE = 100
+API_BATCH_SIZES = {'dynadot': DYNADOT_BATCH_SIZE}
+
+# HTTP连接参数
+HTTP_POOL_SIZE = 64  # 每个API主机保持的最大连接数
+HTTP_TIMEOUT = 10    # API请求超时时间（秒）
+
+# 结果文件追加写入参数
+WRITER_FLUSH_INTERVAL = 0.1  # 后台写入线程的最长攒批时间（秒）
+WRITER_FLUSH_LINES = 100     # 攒够多少行立即写入
+WRITER_BUFFER_SIZE = 64 * 1024
+
+# DNS查询参数
+DNS_MAX_INFLIGHT = 5000  # 异步DNS查询的最大并发数
+DNS_TIMEOUT = 2          # 单次DNS查询的超时时间（秒），超时后轮换DNS服务器重试
+DNS_RESOLVERS = ('udp', 'doh', 'system')  # 可选的DNS查询方式
+# 系统解析器的默认线程数：按CPU核数估算，上限32
+DNS_THREADS = min(32, (os.cpu_count() or 1) * 8)
+
+# 向量化生成域名时每块的最大组合数
+GENERATE_CHUNK_SIZE = 1 << 20
+# 名称长度达到该值时使用numba编译的枚举函数
+NUMBA_MIN_LENGTH = 5
+
 # 默认文件路径
 DEFAULT_CHECKED_FILE = 'checked_domains.csv'
 DEFAULT_AVAILABLE_FILE = 'available_domains.csv'
 DEFAULT_ERROR_LOG = 'errors.log'
 DEFAULT_CONFIG_FILE = 'config.json'
 DEFAULT_TLD = '.com'  # 默认顶级域名
+DEFAULT_KNOWN_REGISTERED_FILE = 'known_registered.txt'  # 已知已注册域名列表
+DEFAULT_ZONE_FILE = 'zone_file.gz'  # 可选的公开区域文件（gzip压缩）
+KNOWN_REGISTERED_NOTE = '已知已注册'
 
 # ========== 工具类 ==========
+def get_rate_limit(provider: str) -> float:
+    """获取提供商两次请求之间的最小间隔（秒）"""
+    if provider.lower() == 'dynadot':
+        return RATE_LIMIT_DYNADOT
+    return RATE_LIMIT_PORKBUN
+
+def _create_session() -> requests.Session:
+    """创建带连接池和自动重试的HTTP会话，所有API请求复用其中的长连接"""
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(['GET', 'POST']),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+# 模块级共享会话，避免每次请求重新建立TCP+TLS连接
+_SESSION = _create_session()
+
 class Counter:
     """线程安全的计数器"""
     def __init__(self):
@@ -79,22 +168,61 @@ class APIConfig:
     def __init__(self):
         self.providers = {}  # 存储多个提供商的配置
         self.active_providers = []  # 活跃的API提供商列表
+        self.result_cache = None  # 可选的ResultCache，用于缓存API检查结果
+        self._cycle = None  # 活跃提供商的轮询迭代器
+        self._cycle_lock = threading.Lock()
+        self._rate_limiters = {}  # 每个提供商的令牌桶
     
     def add_provider(self, provider: str, config: Dict[str, Any]) -> None:
         """添加API提供商配置"""
         self.providers[provider.lower()] = config
         if config.get('active', True):  # 默认为活跃状态
             self.active_providers.append(provider.lower())
+            self._cycle = None
     
     def get_provider_config(self, provider: str) -> Dict[str, Any]:
         """获取指定提供商的配置"""
         return self.providers.get(provider.lower(), {})
     
     def get_random_active_provider(self) -> str:
-        """获取随机活跃提供商"""
+        """获取下一个活跃提供商（打乱顺序后轮询，使各提供商的请求均匀分布）"""
         if not self.active_providers:
             return None
-        return random.choice(self.active_providers)
+        with self._cycle_lock:
+            if self._cycle is None:
+                order = list(self.active_providers)
+                random.shuffle(order)
+                self._cycle = itertools.cycle(order)
+            return next(self._cycle)
+    
+    def get_rate_limiter(self, provider: str) -> TokenBucket:
+        """获取提供商的令牌桶，按该提供商的速率限制补充"""
+        provider = provider.lower()
+        with self._cycle_lock:
+            limiter = self._rate_limiters.get(provider)
+            if limiter is None:
+                limiter = TokenBucket.per_interval(get_rate_limit(provider))
+                self._rate_limiters[provider] = limiter
+            return limiter
+    
+    def acquire_provider(self) -> Optional[str]:
+        """
+        轮询选择一个当前有请求配额的提供商并占用一次配额
+        
+        所有提供商的配额都已用尽时，等待最早恢复的那个。
+        """
+        if not self.active_providers:
+            return None
+        
+        candidates = [self.get_random_active_provider() for _ in self.active_providers]
+        for provider in candidates:
+            if self.get_rate_limiter(provider).try_acquire():
+                return provider
+        
+        provider = min(candidates, key=lambda p: self.get_rate_limiter(p).wait_time())
+        logger.debug(f"所有API提供商均达到速率限制，等待{provider}...")
+        self.get_rate_limiter(provider).acquire()
+        return provider
     
     def is_provider_active(self, provider: str) -> bool:
         """检查提供商是否活跃"""
@@ -110,8 +238,7 @@ class APIConfig:
             return config
         
         try:
-            with open(config_file, 'r') as f:
-                data = json.load(f)
+            data = load_config(config_file)
             
             # 兼容旧配置格式
             if isinstance(data, dict) and 'provider' in data:
@@ -129,7 +256,8 @@ class APIConfig:
             elif isinstance(data, dict) and 'providers' in data:
                 providers = data.get('providers', {})
                 for provider_name, provider_config in providers.items():
-                    config.add_provider(provider_name, provider_config)
+                    # 复制一份，解析结果在多次加载之间共享
+                    config.add_provider(provider_name, dict(provider_config))
             
             # 检查是否有活跃的提供商
             if not config.active_providers:
@@ -192,10 +320,274 @@ def generate_domains(characters: str, length: int = 4, limit: int = 0,
         logger.info(f"将生成约{min(total_combinations, actual_limit)}个组合")
     
     # 生成组合
+    if _can_vectorize(characters, effective_length, prefix, suffix, tld, total_combinations):
+        generated = _generate_domains_numpy(characters, effective_length, limit,
+                                            prefix, suffix, tld, exclude_set)
+    else:
+        generated = _generate_domains_python(characters, effective_length, limit,
+                                             prefix, suffix, tld, exclude_set)
+    
+    logger.info(f"成功生成{len(generated)}个域名")
+    return generated
+
+def wordlist_domains(words: List[str], tld: str = DEFAULT_TLD,
+                     exclude_set: Set[str] = None) -> List[str]:
+    """
+    把单词列表转换为待检查的域名
+    
+    Args:
+        words: 单词列表，已带顶级域名（含.）的条目原样使用
+        tld: 顶级域名，如.com
+        exclude_set: 已检查过的域名集合
+
+    Returns:
+        去重后、排除已检查域名的域名列表（保持原顺序）
+    """
+    if exclude_set is None:
+        exclude_set = set()
+    
+    domains = {}
+    for word in words:
+        word = word.strip().lower()
+        if not word or word.startswith('#'):
+            continue
+        domain = word if '.' in word else word + tld
+        if domain not in exclude_set:
+            domains[domain] = None
+    
+    # 丢弃名称部分含非法字符的条目（如空格、下划线、非ASCII字符）
+    domains = list(domains)
+    valid = valid_name_mask([domain.split('.', 1)[0] for domain in domains])
+    if not valid.all():
+        logger.warning(f"单词列表中有{int((~valid).sum())}个条目不是合法的域名名称，已跳过")
+        domains = [domain for domain, ok in zip(domains, valid) if ok]
+    
+    logger.info(f"从单词列表生成{len(domains)}个待检查域名")
+    return domains
+
+def read_wordlist(file_path: str) -> List[str]:
+    """读取单词列表文件，每行一个单词；路径为-时从标准输入读取"""
+    if file_path == '-':
+        return sys.stdin.read().splitlines()
+    with open(file_path, 'r') as f:
+        return f.read().splitlines()
+
+def _can_vectorize(characters: str, length: int, prefix: str, suffix: str, tld: str,
+                   total_combinations: int) -> bool:
+    """判断能否使用NumPy生成（仅支持ASCII字符，且组合数在int64范围内）"""
+    return (bool(characters) and length > 0 and total_combinations < 2 ** 62 and
+            all(part.isascii() for part in (characters, prefix, suffix, tld)))
+
+def _generate_domains_numpy(characters: str, length: int, limit: int,
+                            prefix: str, suffix: str, tld: str,
+                            exclude_set: Set[str]) -> List[str]:
+    """
+    使用NumPy按块批量生成域名组合，顺序与itertools.product一致
+
+    每块写入一个预分配的(N, width)字节缓冲区：前后缀和顶级域名只在
+    模板行中写一次，之后每块只覆盖中间的可变字符列，整体视为定长
+    字节串后批量过滤已检查的域名，不为中间结果分配新的字符串。
+    """
+    chars = np.frombuffer(characters.encode('ascii'), dtype=np.uint8)
+    base = len(chars)
+    total = base ** length
+    target = limit if limit > 0 else total
+    
+    # 只有长度相同的已检查域名才可能与候选域名重复
+    width = len(prefix) + length + len(suffix) + len(tld)
+    exclude_arr = _build_exclude_index(exclude_set, width)
+    
+    chunk_size = min(total, max(target, 4096), GENERATE_CHUNK_SIZE)
+    
+    # 模板行：前缀 + 占位 + 后缀 + 顶级域名，复制到整个缓冲区
+    template = np.frombuffer(f"{prefix}{'-' * length}{suffix}{tld}".encode('ascii'), dtype=np.uint8)
+    buf = np.tile(template, (chunk_size, 1))
+    body = slice(len(prefix), len(prefix) + length)
+    
+    generated = []
+    start = 0
+    while start < total and len(generated) < target:
+        stop = min(total, start + chunk_size)
+        rows = buf[:stop - start]
+        
+        # 组合序号 -> 各位字符，直接写入缓冲区的可变列
+        if NUMBA_AVAILABLE and length >= NUMBA_MIN_LENGTH:
+            _enumerate_combinations_jit(chars, length, start, rows[:, body])
+        else:
+            idx = np.arange(start, stop, dtype=np.int64)
+            for pos in range(body.stop - 1, body.start - 1, -1):
+                rows[:, pos] = chars[idx % base]
+                idx //= base
+        
+        domains = rows.view(f'S{width}').ravel()
+        
+        # 检查是否已经处理过
+        if exclude_arr is not None:
+            domains = domains[~_is_excluded(exclude_arr, domains)]
+        
+        generated.extend(domains[:target - len(generated)].astype(str).tolist())
+        start = stop
+    
+    return generated
+
+def _build_exclude_index(exclude_set: Set[str], width: int) -> Optional[np.ndarray]:
+    """
+    将长度为width的已检查域名构建为有序的定长字节串数组
+
+    每个域名只占width字节，比Python字符串集合紧凑得多，
+    且只需排序一次，之后每块候选域名都用二分查找判断。
+
+    Returns:
+        有序数组，没有可能重复的域名时返回None
+    """
+    excluded = [d for d in exclude_set if isinstance(d, str) and len(d) == width and d.isascii()]
+    if not excluded:
+        return None
+    index = np.array(excluded, dtype=f'S{width}')
+    index.sort()
+    return index
+
+def _is_excluded(index: np.ndarray, domains: np.ndarray) -> np.ndarray:
+    """二分查找判断每个候选域名是否在有序数组index中"""
+    pos = np.searchsorted(index, domains)
+    np.minimum(pos, len(index) - 1, out=pos)
+    return index[pos] == domains
+
+def _enumerate_combinations(chars, length, start, out):
+    """
+    从第start个组合开始，按itertools.product的顺序逐行填充out
+
+    使用里程表式进位代替逐位取模，适合numba编译后运行。
+
+    Args:
+        chars: 字符集(uint8数组)
+        length: 名称长度
+        start: 起始组合序号
+        out: 预分配的(N, length) uint8数组
+    """
+    base = chars.shape[0]
+    digits = np.empty(length, dtype=np.int64)
+    rest = start
+    for pos in range(length - 1, -1, -1):
+        digits[pos] = rest % base
+        rest //= base
+    
+    for row in range(out.shape[0]):
+        for pos in range(length):
+            out[row, pos] = chars[digits[pos]]
+        # 末位加一并向前进位
+        carry = length - 1
+        while carry >= 0:
+            digits[carry] += 1
+            if digits[carry] < base:
+                break
+            digits[carry] = 0
+            carry -= 1
+
+if NUMBA_AVAILABLE:
+    # cache=True将编译结果写入磁盘，避免每次启动重新编译
+    _enumerate_combinations_jit = njit(cache=True)(_enumerate_combinations)
+
+# 域名名称允许的字符（按码点索引）：小写字母、数字和连字符
+_NAME_ALLOWED = np.zeros(128, dtype=np.bool_)
+_NAME_ALLOWED[np.frombuffer((string.ascii_lowercase + DIGITS + '-').encode('ascii'), dtype=np.uint8)] = True
+_HYPHEN = ord('-')
+
+def _filter_candidates(codes, allowed):
+    """
+    逐行校验名称，返回每行是否合法
+
+    名称非空、每个字符都在allowed中、且不以连字符开头或结尾时合法。
+    外层循环用prange，numba编译后各行并行校验。
+
+    Args:
+        codes: (N, L) uint32码点数组，较短的名称末尾以0填充
+        allowed: 按码点索引的布尔数组
+
+    Returns:
+        长度为N的布尔数组
+    """
+    rows, width = codes.shape
+    out = np.zeros(rows, dtype=np.bool_)
+    for i in prange(rows):
+        ok = width > 0 and codes[i, 0] != 0 and codes[i, 0] != _HYPHEN
+        last = 0
+        for j in range(width):
+            c = codes[i, j]
+            if c == 0:
+                break
+            if c >= allowed.shape[0] or not allowed[c]:
+                ok = False
+                break
+            last = c
+        out[i] = ok and last != _HYPHEN
+    return out
+
+if NUMBA_AVAILABLE:
+    _filter_candidates_jit = njit(cache=True, parallel=True)(_filter_candidates)
+
+def _filter_candidates_numpy(codes: np.ndarray, allowed: np.ndarray) -> np.ndarray:
+    """_filter_candidates的NumPy向量化实现，未安装numba时使用"""
+    filled = codes != 0
+    in_range = codes < len(allowed)
+    chars_ok = np.where(in_range, allowed[np.where(in_range, codes, 0)], False)
+    lengths = filled.sum(axis=1)
+    last = codes[np.arange(len(codes)), np.maximum(lengths - 1, 0)]
+    return ((chars_ok | ~filled).all(axis=1) & (lengths > 0) &
+            (codes[:, 0] != _HYPHEN) & (last != _HYPHEN))
+
+def valid_name_mask(names: List[str]) -> np.ndarray:
+    """
+    批量判断名称（不含顶级域名）是否为合法的域名标签
+
+    名称整体转换为(N, L) uint32码点数组后一次校验；安装了numba时使用编译后的并行版本。
+
+    Args:
+        names: 名称列表
+
+    Returns:
+        与names等长的布尔数组
+    """
+    if not names:
+        return np.zeros(0, dtype=np.bool_)
+    arr = np.array(names, dtype=str)
+    width = arr.dtype.itemsize // 4
+    if width == 0:
+        return np.zeros(len(names), dtype=np.bool_)
+    codes = arr.view(np.uint32).reshape(len(names), width)
+    if NUMBA_AVAILABLE:
+        return _filter_candidates_jit(codes, _NAME_ALLOWED)
+    return _filter_candidates_numpy(codes, _NAME_ALLOWED)
+
+def warm_up_jit() -> bool:
+    """
+    预先编译numba函数（串行的组合枚举和并行的名称校验）
+
+    编译结果缓存在磁盘上（cache=True），之后的进程直接加载，
+    因此图形界面启动时调用一次即可让后续检查跳过首次编译。
+
+    Returns:
+        bool: 是否进行了编译，未安装numba时返回False
+    """
+    if not NUMBA_AVAILABLE:
+        return False
+    valid_name_mask(['warmup', 'warm-up'])
+    _enumerate_combinations_jit(np.frombuffer(b'ab', dtype=np.uint8), 2, 0,
+                                np.empty((1, 2), dtype=np.uint8))
+    return True
+
+def _generate_domains_python(characters: str, length: int, limit: int,
+                             prefix: str, suffix: str, tld: str,
+                             exclude_set: Set[str]) -> List[str]:
+    """逐个生成域名组合（用于非ASCII字符集等无法向量化的情况）"""
+    if 0 < length <= SPECIALIZED_MAX_LENGTH:
+        gen = _specialized_generator(length)
+        return gen(characters, prefix, suffix + tld, exclude_set, limit if limit > 0 else -1)
+    
     generated = []
     count = 0
     
-    for combo in itertools.product(characters, repeat=effective_length):
+    for combo in itertools.product(characters, repeat=length):
         domain_part = ''.join(combo)
         full_domain = f"{prefix}{domain_part}{suffix}{tld}"
         
@@ -210,9 +602,108 @@ def generate_domains(characters: str, length: int = 4, limit: int = 0,
         if limit > 0 and count >= limit:
             break
     
-    logger.info(f"成功生成{len(generated)}个域名")
     return generated
 
+# 按名称长度生成的专用函数，首次使用时编译
+SPECIALIZED_MAX_LENGTH = 6
+_GEN_SPECIAL: Dict[int, Any] = {}
+
+def _specialized_generator(length: int):
+    """
+    获取指定长度的专用生成函数
+
+    用固定层数的嵌套循环代替itertools.product，逐层累加前缀字符串，
+    省去每个组合的元组构造和join调用。生成顺序与itertools.product一致。
+    """
+    gen = _GEN_SPECIAL.get(length)
+    if gen is not None:
+        return gen
+    
+    lines = ["def _gen(chars, prefix, tail, exclude, limit):",
+             "    out = []",
+             "    append = out.append"]
+    parent = "prefix"
+    for depth in range(length):
+        indent = "    " * (depth + 1)
+        lines.append(f"{indent}for c{depth} in chars:")
+        lines.append(f"{indent}    p{depth} = {parent} + c{depth}")
+        parent = f"p{depth}"
+    indent = "    " * (length + 1)
+    lines += [f"{indent}d = {parent} + tail",
+              f"{indent}if d in exclude:",
+              f"{indent}    continue",
+              f"{indent}append(d)",
+              f"{indent}if len(out) == limit:",
+              f"{indent}    return out",
+              "    return out"]
+    
+    namespace = {}
+    exec(compile("\n".join(lines), f"<generate_domains_L{length}>", "exec"), namespace)
+    gen = _GEN_SPECIAL[length] = namespace["_gen"]
+    return gen
+
+class DomainFinder:
+    """域名查找器，提供不带顶级域名的域名名称生成和单个域名检查"""
+
+    def __init__(self, seed: Optional[int] = None):
+        self._rng = np.random.default_rng(seed)
+
+    def generate_domain_names(self, length: int = 4, use_letters: bool = True,
+                              use_digits: bool = False, use_symbols: bool = False,
+                              limit: int = 100) -> List[str]:
+        """
+        生成指定长度的域名名称（不含顶级域名）
+
+        组合数不超过limit时按itertools.product顺序全部列出，否则用NumPy随机抽取
+        limit个互不相同的组合序号。序号在一个(N, length)字节数组中按位展开为字符，
+        整体视为定长字节串后一次转换为字符串，不逐个拼接。
+        使用符号时连字符只出现在中间位置（域名不能以连字符开头或结尾）。
+
+        Args:
+            length: 名称长度
+            use_letters: 是否使用字母
+            use_digits: 是否使用数字
+            use_symbols: 是否使用连字符
+            limit: 生成数量上限，0表示全部
+
+        Returns:
+            生成的名称列表
+        """
+        edge = (string.ascii_lowercase if use_letters else '') + (string.digits if use_digits else '')
+        if length <= 0 or not edge:
+            return []
+
+        # 每一位的可选字符：首尾不能是连字符
+        middle = edge + '-' if use_symbols else edge
+        alphabets = [edge if pos in (0, length - 1) else middle for pos in range(length)]
+        radices = [len(chars) for chars in alphabets]
+        total = int(np.prod(radices, dtype=object))
+        if total >= 2 ** 63:
+            logger.error(f"组合数过大，无法生成: {total}")
+            return []
+
+        if limit <= 0 or limit >= total:
+            idx = np.arange(total, dtype=np.int64)
+        else:
+            idx = np.sort(self._rng.choice(total, size=limit, replace=False))
+
+        names = np.empty((len(idx), length), dtype=np.uint8)
+        for pos in range(length - 1, -1, -1):
+            chars = np.frombuffer(alphabets[pos].encode('ascii'), dtype=np.uint8)
+            idx, digit = np.divmod(idx, radices[pos])
+            names[:, pos] = chars[digit]
+
+        return names.view(f'S{length}').ravel().astype(str).tolist()
+
+    def filter_valid_names(self, names: List[str]) -> List[str]:
+        """过滤掉不是合法域名标签的名称，见valid_name_mask"""
+        valid = valid_name_mask(names)
+        return [name for name, ok in zip(names, valid) if ok]
+
+    def check_domain_dns(self, domain: str) -> Tuple[str, bool, Optional[str]]:
+        """通过DNS查询检查单个域名，见dns_check"""
+        return dns_check(domain)
+
 # ========== DNS检查器 ==========
 def dns_check(domain: str) -> Tuple[str, bool, Optional[str]]:
     """
@@ -235,6 +726,31 @@ def dns_check(domain: str) -> Tuple[str, bool, Optional[str]]:
         error_msg = f"DNS查询错误: {str(e)}"
         return domain, True, error_msg
 
+async def dns_check_async(domain: str, resolver) -> Tuple[str, bool, Optional[str]]:
+    """
+    通过异步DNS查询检查域名是否已注册
+
+    Args:
+        domain: 要检查的域名
+        resolver: 共享的UDPResolver或DoHResolver实例
+
+    Returns:
+        (域名, 是否已注册, 错误信息)
+    """
+    try:
+        rcode, _ = await resolver.query(domain, 'A')
+    except Exception as e:
+        # 超时等错误，谨慎起见假设域名存在
+        return domain, True, f"DNS查询错误: {str(e)}"
+    
+    if rcode == RCODE_NXDOMAIN:
+        # 域名不存在，可能未注册
+        return domain, False, None
+    if rcode == RCODE_NOERROR:
+        # 域名存在（即使没有A记录），视为已注册
+        return domain, True, None
+    return domain, True, f"DNS查询错误: {RCODE_NAMES.get(rcode, rcode)}"
+
 # ========== API检查器 ==========
 def api_check(domain: str, api_config: APIConfig, provider: str = None) -> Tuple[str, bool, Optional[str]]:
     """
@@ -248,27 +764,54 @@ def api_check(domain: str, api_config: APIConfig, provider: str = None) -> Tuple
     Returns:
         (域名, 是否可用, 错误/价格信息)
     """
+    domain, kind, note = _api_query(domain, api_config, provider)
+    return domain, kind.available, note
+
+def _api_query(domain: str, api_config: APIConfig, provider: str = None) -> Tuple[str, ResultKind, str]:
+    """api_check的实现，返回结果类型而不是是否可用，供重试和缓存判断使用"""
     # 如果没有指定提供商，随机选择一个活跃的提供商
     if not provider:
         provider = api_config.get_random_active_provider()
     
     if not provider:
-        return domain, False, "未配置API"
+        return domain, ResultKind.ERROR, "未配置API"
     
     # 获取提供商配置
     provider_config = api_config.get_provider_config(provider)
     if not provider_config:
-        return domain, False, f"未找到提供商配置: {provider}"
+        return domain, ResultKind.ERROR, f"未找到提供商配置: {provider}"
+    
+    # 优先使用缓存的结果
+    cache = api_config.result_cache
+    if cache is not None:
+        cached = cache.get(domain, provider)
+        if cached is not None:
+            logger.debug(f"命中缓存: {domain} ({provider})")
+            return _cached_api_result(domain, cached)
     
     # 根据提供商调用相应的API
     if provider.lower() == 'porkbun':
-        return porkbun_check(domain, provider_config)
+        result = _porkbun_query(domain, provider_config)
     elif provider.lower() == 'dynadot':
-        return dynadot_check(domain, provider_config)
-    
-    # 可以添加更多API提供商支持
+        result = _dynadot_query_batch([domain], provider_config)[0]
+    else:
+        # 可以添加更多API提供商支持
+        return domain, ResultKind.ERROR, f"不支持的API提供商: {provider}"
     
-    return domain, False, f"不支持的API提供商: {provider}"
+    _cache_api_result(cache, provider, result)
+    return result
+
+def _cached_api_result(domain: str, cached: Tuple[bool, str]) -> Tuple[str, ResultKind, str]:
+    """把缓存中的(是否可用, 备注)转换为带结果类型的结果（缓存中只有明确的结果）"""
+    is_available, note = cached
+    return domain, ResultKind.AVAILABLE if is_available else ResultKind.REGISTERED, note
+
+def _cache_api_result(cache: Optional[ResultCache], provider: str,
+                      result: Tuple[str, ResultKind, str]) -> None:
+    """只缓存明确的可用/已注册结果，错误和速率限制不缓存"""
+    domain, kind, note = result
+    if cache is not None and kind in (ResultKind.AVAILABLE, ResultKind.REGISTERED):
+        cache.set(domain, provider, kind.available, note, permanent=kind is ResultKind.REGISTERED)
 
 def porkbun_check(domain: str, config: Dict[str, Any]) -> Tuple[str, bool, Optional[str]]:
     """
@@ -281,6 +824,11 @@ def porkbun_check(domain: str, config: Dict[str, Any]) -> Tuple[str, bool, Optio
     Returns:
         (域名, 是否可用, 错误/价格信息)
     """
+    domain, kind, note = _porkbun_query(domain, config)
+    return domain, kind.available, note
+
+def _porkbun_query(domain: str, config: Dict[str, Any]) -> Tuple[str, ResultKind, str]:
+    """porkbun_check的实现，返回(域名, 结果类型, 错误/价格信息)"""
     api_url = f"https://api.porkbun.com/api/json/v3/domain/checkDomain/{domain}"
     
     payload = {
@@ -295,25 +843,25 @@ def porkbun_check(domain: str, config: Dict[str, Any]) -> Tuple[str, bool, Optio
     logger.debug(f"Porkbun API检查域名: {domain}")
     
     try:
-        response = requests.post(api_url, json=payload, headers=headers)
+        response = _SESSION.post(api_url, json=payload, headers=headers, timeout=HTTP_TIMEOUT)
         
         if response.status_code == 200:
             data = response.json()
             if data.get("status") == "SUCCESS":
                 response_data = data.get("response", {})
-                available = response_data.get("avail") == "yes"
+                kind = ResultKind.AVAILABLE if response_data.get("avail") == "yes" else ResultKind.REGISTERED
                 price = response_data.get("price", "未知")
-                return domain, available, f"Porkbun价格: {price}"
+                return domain, kind, f"Porkbun价格: {price}"
             else:
                 error_msg = data.get("message", "未知错误")
-                return domain, False, f"Porkbun API错误: {error_msg}"
+                return domain, ResultKind.ERROR, f"Porkbun API错误: {error_msg}"
         elif response.status_code == 400 and "within 10 seconds used" in response.text:
             # 速率限制错误
-            return domain, None, "Porkbun速率限制"
+            return domain, ResultKind.RATE_LIMITED, "Porkbun速率限制"
         else:
-            return domain, False, f"Porkbun HTTP错误: {response.status_code}"
+            return domain, ResultKind.ERROR, f"Porkbun HTTP错误: {response.status_code}"
     except Exception as e:
-        return domain, False, f"Porkbun请求异常: {str(e)}"
+        return domain, ResultKind.ERROR, f"Porkbun请求异常: {str(e)}"
 
 def dynadot_check(domain: str, config: Dict[str, Any]) -> Tuple[str, bool, Optional[str]]:
     """
@@ -326,129 +874,460 @@ def dynadot_check(domain: str, config: Dict[str, Any]) -> Tuple[str, bool, Optio
     Returns:
         (域名, 是否可用, 错误/价格信息)
     """
+    return dynadot_check_batch([domain], config)[0]
+
+def dynadot_check_batch(domains: List[str], config: Dict[str, Any]) -> List[Tuple[str, bool, Optional[str]]]:
+    """
+    通过一次Dynadot API请求检查多个域名是否可注册
+    
+    Dynadot的search命令接受domain0...domainN多个参数，一次请求即可返回所有结果。
+    
+    Args:
+        domains: 要检查的域名列表（不超过DYNADOT_BATCH_SIZE个）
+        config: Dynadot API配置
+
+    Returns:
+        [(域名, 是否可用, 错误/价格信息)]，顺序与输入一致
+    """
+    return [(domain, kind.available, note) for domain, kind, note in _dynadot_query_batch(domains, config)]
+
+def _dynadot_query_batch(domains: List[str], config: Dict[str, Any]) -> List[Tuple[str, ResultKind, str]]:
+    """dynadot_check_batch的实现，返回[(域名, 结果类型, 错误/价格信息)]"""
+    def fail(note: str) -> List[Tuple[str, ResultKind, str]]:
+        return [(domain, ResultKind.ERROR, note) for domain in domains]
+    
     api_key = config.get('api_key')
     if not api_key:
-        return domain, False, "未提供Dynadot API密钥"
+        return fail("未提供Dynadot API密钥")
     
     # 使用JSON API格式
     api_url = "https://api.dynadot.com/api3.json"
     
     params = {
         "key": api_key,
-        "command": "search",
-        "domain0": domain  # 正确的参数名，必须是domain0而不是domain
+        "command": "search"
     }
+    # 正确的参数名是domain0、domain1...，而不是domain
+    for i, domain in enumerate(domains):
+        params[f"domain{i}"] = domain
     
-    logger.debug(f"Dynadot API检查域名: {domain}")
+    logger.debug(f"Dynadot API检查域名: {', '.join(domains)}")
     
     try:
-        response = requests.get(api_url, params=params, timeout=10)
+        response = _SESSION.get(api_url, params=params, timeout=HTTP_TIMEOUT)
         
-        if response.status_code == 200:
-            try:
-                data = response.json()
-                logger.debug(f"Dynadot API响应: {data}")
-                
-                # 检查错误
-                if "error" in data:
-                    error_msg = data.get("error", "未知错误")
-                    return domain, False, f"Dynadot API错误: {error_msg}"
-                
-                # 检查SearchResponse中的错误
-                if "SearchResponse" in data and "Error" in data["SearchResponse"]:
-                    error_msg = data["SearchResponse"].get("Error", "未知错误")
-                    return domain, False, f"Dynadot API错误: {error_msg}"
-                
-                # 检查搜索结果
-                if "SearchResponse" in data and "SearchResults" in data["SearchResponse"]:
-                    results = data["SearchResponse"]["SearchResults"]
-                    if isinstance(results, list) and len(results) > 0:
-                        result = results[0]
-                        # 正确处理"yes"/"no"字符串值
-                        available_str = result.get("Available", "no")
-                        available = (available_str.lower() == "yes")
-                        
-                        price = result.get("Price", "未知")
-                        currency = result.get("Currency", "USD")
-                        
-                        if available:
-                            return domain, True, f"Dynadot价格: {price} {currency}"
-                        else:
-                            return domain, False, "Dynadot: 域名已注册"
-                
-                # 无法解析结果
-                return domain, False, "Dynadot API返回格式异常"
-            except json.JSONDecodeError:
-                return domain, False, f"Dynadot JSON解析错误: {response.text[:100]}..."
-        else:
-            return domain, False, f"Dynadot HTTP错误: {response.status_code}"
+        if response.status_code != 200:
+            return fail(f"Dynadot HTTP错误: {response.status_code}")
+        
+        try:
+            data = response.json()
+        except json.JSONDecodeError:
+            return fail(f"Dynadot JSON解析错误: {response.text[:100]}...")
+        logger.debug(f"Dynadot API响应: {data}")
+        
+        # 检查错误
+        if "error" in data:
+            error_msg = data.get("error", "未知错误")
+            return fail(f"Dynadot API错误: {error_msg}")
+        
+        # 检查SearchResponse中的错误
+        if "SearchResponse" in data and "Error" in data["SearchResponse"]:
+            error_msg = data["SearchResponse"].get("Error", "未知错误")
+            return fail(f"Dynadot API错误: {error_msg}")
+        
+        # 检查搜索结果
+        results = data.get("SearchResponse", {}).get("SearchResults")
+        if not isinstance(results, list) or not results:
+            # 无法解析结果
+            return fail("Dynadot API返回格式异常")
+        
+        # 按域名匹配结果，缺少域名字段时按顺序对应
+        by_name = {str(r.get("DomainName", "")).lower(): r for r in results if isinstance(r, dict)}
+        checked = []
+        for i, domain in enumerate(domains):
+            result = by_name.get(domain.lower())
+            if result is None and i < len(results) and isinstance(results[i], dict):
+                result = results[i]
+            if result is None:
+                checked.append((domain, ResultKind.ERROR, "Dynadot API返回格式异常"))
+                continue
+            
+            # 正确处理"yes"/"no"字符串值
+            available = str(result.get("Available", "no")).lower() == "yes"
+            if available:
+                price = result.get("Price", "未知")
+                currency = result.get("Currency", "USD")
+                checked.append((domain, ResultKind.AVAILABLE, f"Dynadot价格: {price} {currency}"))
+            else:
+                checked.append((domain, ResultKind.REGISTERED, "Dynadot: 域名已注册"))
+        return checked
     except Exception as e:
         logger.error(f"Dynadot请求异常: {str(e)}")
-        return domain, False, f"Dynadot请求异常: {str(e)}"
+        return fail(f"Dynadot请求异常: {str(e)}")
+
+def api_check_batch(domains: List[str], api_config: APIConfig, provider: str) -> List[Tuple[str, bool, Optional[str]]]:
+    """
+    使用指定提供商检查一批域名，支持批量查询的提供商只发送一次请求
+    
+    Args:
+        domains: 要检查的域名列表（不超过该提供商的批量上限）
+        api_config: API配置
+        provider: API提供商
+
+    Returns:
+        [(域名, 是否可用, 错误/价格信息)]，顺序与输入一致
+    """
+    return [(domain, kind.available, note)
+            for domain, kind, note in _api_query_batch(domains, api_config, provider)]
+
+def _api_query_batch(domains: List[str], api_config: APIConfig, provider: str) -> List[Tuple[str, ResultKind, str]]:
+    """api_check_batch的实现，返回[(域名, 结果类型, 错误/价格信息)]"""
+    if provider.lower() != 'dynadot' or len(domains) <= 1:
+        return [_api_query(domain, api_config, provider) for domain in domains]
+    
+    # 先取缓存，只查询未命中的域名
+    cache = api_config.result_cache
+    results = {}
+    if cache is not None:
+        for domain in domains:
+            cached = cache.get(domain, provider)
+            if cached is not None:
+                results[domain] = _cached_api_result(domain, cached)
+    
+    pending = [domain for domain in domains if domain not in results]
+    if pending:
+        for result in _dynadot_query_batch(pending, api_config.get_provider_config(provider)):
+            results[result[0]] = result
+            _cache_api_result(cache, provider, result)
+    
+    return [results[domain] for domain in domains]
+
+def get_api_batch_size(provider: str) -> int:
+    """获取提供商单次请求可检查的域名数"""
+    return API_BATCH_SIZES.get(provider.lower(), 1)
 
 # ========== 数据管理 ==========
+CHECKED_COLUMNS = ["domain", "dns_checked", "api_verified", "available", "note"]
+BOOL_COLUMNS = ["dns_checked", "api_verified", "available"]
+
+def _coerce_bool_columns(df: pd.DataFrame) -> None:
+    """将状态列统一转换为bool类型（CSV中有空值时会被读成object）"""
+    for col in BOOL_COLUMNS:
+        if col in df.columns and df[col].dtype != bool:
+            values = df[col].fillna(False).astype(str).str.strip().str.lower()
+            df[col] = values.isin(('true', '1', '1.0', 'yes'))
+
+def pending_api_domains(df: pd.DataFrame) -> List[str]:
+    """
+    筛选DNS检查后可能可用、但尚未经过API验证的域名
+    
+    Args:
+        df: 已检查域名的DataFrame
+
+    Returns:
+        待API验证的域名列表
+    """
+    if df.empty:
+        return []
+    mask = (df['dns_checked'].to_numpy(dtype=bool) &
+            ~df['api_verified'].to_numpy(dtype=bool) &
+            df['available'].to_numpy(dtype=bool))
+    return df['domain'].to_numpy()[mask].tolist()
+
+def _is_parquet(file_path: str) -> bool:
+    """根据扩展名判断是否使用Parquet格式存储"""
+    return file_path.lower().endswith('.parquet')
+
+def _read_checked_file(file_path: str) -> pd.DataFrame:
+    """按扩展名读取CSV或Parquet文件，CSV在安装了pyarrow时使用其多线程解析器"""
+    if _is_parquet(file_path):
+        return pd.read_parquet(file_path)
+    if PYARROW_AVAILABLE:
+        try:
+            return pd.read_csv(file_path, engine='pyarrow')
+        except Exception as e:
+            logger.debug(f"pyarrow解析CSV失败，改用默认解析器: {str(e)}")
+    return pd.read_csv(file_path)
+
 def load_checked_domains(file_path: str) -> Tuple[pd.DataFrame, Set[str]]:
     """
     加载已检查的域名数据
     
+    以.parquet结尾的路径使用Parquet格式（需要pyarrow），其余使用CSV。
+    Parquet文件不存在而同名CSV文件存在时，自动读取CSV并在保存时迁移。
+    
     Args:
-        file_path: CSV文件路径
+        file_path: CSV或Parquet文件路径
 
     Returns:
         (DataFrame, 已检查域名集合)
     """
-    if os.path.exists(file_path):
+    source = file_path
+    if _is_parquet(file_path) and not os.path.exists(file_path):
+        legacy_csv = os.path.splitext(file_path)[0] + '.csv'
+        if os.path.exists(legacy_csv):
+            logger.info(f"从 {legacy_csv} 迁移已检查域名到 {file_path}")
+            source = legacy_csv
+    
+    if os.path.exists(source):
         try:
-            df = pd.read_csv(file_path)
+            df = _read_checked_file(source)
             # 确保所有必需的列都存在
             required_columns = ["domain", "dns_checked", "api_verified", "available"]
             for col in required_columns:
                 if col not in df.columns:
                     df[col] = False if col != "domain" else ""
+            _coerce_bool_columns(df)
             
-            # 提取已检查的域名集合
-            checked_set = set(df['domain'].tolist())
+            # 提取已检查域名集合
+            checked_set = set(df['domain'].to_numpy().tolist())
             logger.info(f"已加载{len(checked_set)}个已检查的域名")
             return df, checked_set
         except Exception as e:
-            logger.error(f"加载CSV文件出错: {str(e)}")
-            return pd.DataFrame(columns=["domain", "dns_checked", "api_verified", "available", "note"]), set()
+            logger.error(f"加载已检查域名文件出错: {str(e)}")
+            return pd.DataFrame(columns=CHECKED_COLUMNS), set()
     else:
-        return pd.DataFrame(columns=["domain", "dns_checked", "api_verified", "available", "note"]), set()
+        return pd.DataFrame(columns=CHECKED_COLUMNS), set()
 
 def save_checked_domains(df: pd.DataFrame, file_path: str):
-    """保存已检查的域名数据"""
+    """
+    保存已检查的域名数据（按扩展名选择CSV或Parquet格式）
+
+    先写入临时文件再替换原文件，写入过程中被中断也不会留下不完整的文件。
+    """
+    tmp_path = None
     try:
-        df.to_csv(file_path, index=False)
+        if _is_parquet(file_path):
+            out = df.copy()
+            # 域名重复值很少，备注重复值很多，用分类类型压缩
+            if 'note' in out.columns:
+                out['note'] = out['note'].astype('category')
+            try:
+                tmp_path = file_path + '.tmp'
+                out.to_parquet(tmp_path, index=False, compression='zstd')
+            except ImportError:
+                # 未安装pyarrow时退回CSV，下次加载时会自动读取
+                file_path = os.path.splitext(file_path)[0] + '.csv'
+                logger.warning(f"未安装pyarrow，改为保存到 {file_path}")
+                tmp_path = file_path + '.tmp'
+                df.to_csv(tmp_path, index=False)
+        else:
+            tmp_path = file_path + '.tmp'
+            df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, file_path)
+        tmp_path = None
         logger.debug(f"已保存检查结果到 {file_path}")
     except Exception as e:
-        logger.error(f"保存CSV文件出错: {str(e)}")
+        logger.error(f"保存已检查域名文件出错: {str(e)}")
+    finally:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
-def save_available_domain(domain: str, note: str, file_path: str):
-    """保存可用域名到文件"""
+def append_checked_domains(df: pd.DataFrame, file_path: str):
+    """
+    把新检查的域名追加到已检查域名文件
+
+    CSV文件按已有表头的列顺序直接追加行，不读入和重写整个文件；
+    Parquet文件无法追加，读入后与新行合并再整体保存。
+    """
+    if df.empty:
+        return
+    header = ''
+    if not _is_parquet(file_path) and os.path.exists(file_path):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            header = f.readline().strip()
+    if not header:
+        existing, _ = load_checked_domains(file_path)
+        if len(existing):
+            df = pd.concat([existing, df], ignore_index=True)
+        save_checked_domains(df, file_path)
+        return
     try:
-        with open(file_path, 'a') as f:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            f.write(f"{domain},{timestamp},{note}\n")
+        df.reindex(columns=header.split(',')).to_csv(file_path, mode='a', header=False, index=False)
+        logger.debug(f"已追加{len(df)}个检查结果到 {file_path}")
     except Exception as e:
-        logger.error(f"保存可用域名出错: {str(e)}")
+        logger.error(f"追加已检查域名文件出错: {str(e)}")
 
-def log_error(domain: str, error: str, file_path: str):
-    """记录错误到日志文件"""
+def load_known_registered(file_path: str = DEFAULT_KNOWN_REGISTERED_FILE,
+                          zone_file: Optional[str] = DEFAULT_ZONE_FILE,
+                          tld: Optional[str] = None) -> Set[str]:
+    """
+    加载已知已注册的域名，这些域名无需再做DNS查询
+    
+    Args:
+        file_path: 每行一个域名的文本文件，#开头为注释
+        zone_file: gzip压缩的区域文件，存在时从中提取域名
+        tld: 只保留该顶级域名下的域名，None表示全部保留
+
+    Returns:
+        已知已注册域名集合（小写）
+    """
+    suffix = tld.lower() if tld else None
+    known = set()
+    
+    if file_path and os.path.exists(file_path):
+        try:
+            with open(file_path, 'r') as f:
+                for line in f:
+                    domain = line.strip().lower()
+                    if domain and not domain.startswith('#'):
+                        known.add(domain)
+        except Exception as e:
+            logger.error(f"加载已知已注册域名出错: {str(e)}")
+    
+    if zone_file and os.path.exists(zone_file):
+        before = len(known)
+        try:
+            known.update(_iter_zone_names(zone_file, suffix))
+            logger.info(f"从区域文件 {zone_file} 加载{len(known) - before}个域名")
+        except Exception as e:
+            logger.error(f"读取区域文件出错: {str(e)}")
+    
+    if suffix:
+        known = {domain for domain in known if domain.endswith(suffix)}
+    if known:
+        logger.info(f"已加载{len(known)}个已知已注册的域名")
+    return known
+
+def _iter_zone_names(zone_file: str, suffix: Optional[str] = None):
+    """逐行解析gzip区域文件，产出记录所属的域名（不含末尾的点）"""
+    origin = ''
+    with gzip.open(zone_file, 'rt', errors='replace') as f:
+        for line in f:
+            # 空白开头的行沿用上一行的所属域名，注释行直接跳过
+            if not line or line[0] in ' \t;\r\n':
+                continue
+            name = line.split(None, 1)[0].lower()
+            if name == '$origin':
+                parts = line.split()
+                origin = parts[1].lower().strip('.') if len(parts) > 1 else ''
+                continue
+            if name.startswith('$') or name == '@':
+                continue
+            if name.endswith('.'):
+                name = name[:-1]
+            elif origin:
+                name = f"{name}.{origin}"
+            if suffix is None or name.endswith(suffix):
+                yield name
+
+def save_known_registered(domains: List[str], file_path: str = DEFAULT_KNOWN_REGISTERED_FILE) -> None:
+    """将新发现的已注册域名追加到已知已注册列表"""
+    if not domains:
+        return
     try:
         with open(file_path, 'a') as f:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            f.write(f"{timestamp} - {domain} - {error}\n")
+            f.writelines(f"{domain}\n" for domain in domains)
+        logger.debug(f"已追加{len(domains)}个已注册域名到 {file_path}")
     except Exception as e:
-        logger.error(f"写入错误日志出错: {str(e)}")
+        logger.error(f"保存已知已注册域名出错: {str(e)}")
+
+class _AppendWriter:
+    """
+    追加写入器：文件只打开一次，由后台线程批量写入
+
+    每行写入只是放入队列，后台线程攒够WRITER_FLUSH_LINES行或等待
+    WRITER_FLUSH_INTERVAL秒后统一写入并刷新到磁盘。
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._queue = queue.Queue()
+        self._file = None
+        self._thread = threading.Thread(target=self._run, name=f"writer:{path}", daemon=True)
+        self._thread.start()
+    
+    def write(self, line: str) -> None:
+        """追加一行（需自带换行符）"""
+        self._queue.put(line)
+    
+    def flush(self) -> None:
+        """等待已提交的内容全部写入文件"""
+        self._queue.join()
+    
+    def _run(self) -> None:
+        while True:
+            lines = [self._queue.get()]
+            deadline = time.monotonic() + WRITER_FLUSH_INTERVAL
+            while len(lines) < WRITER_FLUSH_LINES:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    lines.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            try:
+                if self._file is None:
+                    self._file = open(self.path, 'a', buffering=WRITER_BUFFER_SIZE)
+                self._file.writelines(lines)
+                self._file.flush()
+            except Exception as e:
+                logger.error(f"写入文件 {self.path} 出错: {str(e)}")
+                self._file = None
+            finally:
+                for _ in lines:
+                    self._queue.task_done()
+
+_writers: Dict[str, _AppendWriter] = {}
+_writers_lock = threading.Lock()
+
+def _get_writer(file_path: str) -> _AppendWriter:
+    """获取指定文件的共享追加写入器"""
+    path = os.path.abspath(file_path)
+    with _writers_lock:
+        writer = _writers.get(path)
+        if writer is None:
+            writer = _writers[path] = _AppendWriter(path)
+        return writer
+
+def flush_writers() -> None:
+    """等待所有追加写入器把已提交的内容写入文件"""
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        writer.flush()
+
+# 程序退出前确保所有结果都已写入
+atexit.register(flush_writers)
+
+def save_available_domain(domain: str, note: str, file_path: str):
+    """保存可用域名到文件"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    _get_writer(file_path).write(f"{domain},{timestamp},{note}\n")
+
+def save_available_domains_batch(rows: List[Dict[str, Any]], file_path: str):
+    """
+    批量保存可用域名，所有行合并为一次写入
+
+    Args:
+        rows: 行列表，每行包含domain和note，可选timestamp
+        file_path: 输出文件
+    """
+    if not rows:
+        return
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    _get_writer(file_path).write("".join(
+        f"{row['domain']},{row.get('timestamp', timestamp)},{row.get('note', '')}\n" for row in rows))
+
+def log_error(domain: str, error: str, file_path: str):
+    """记录错误到日志文件"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    _get_writer(file_path).write(f"{timestamp} - {domain} - {error}\n")
 
 # ========== 主程序 ==========
 def run_dns_batch(domains: List[str], 
                 checked_df: pd.DataFrame,
                 available_file: str, 
                 error_file: str,
-                counter: Counter,
-                max_workers: int = 20) -> pd.DataFrame:
+                max_inflight: int = DNS_MAX_INFLIGHT,
+                max_workers: int = DNS_THREADS,
+                cache: Optional[ResultCache] = None,
+                known_registered: Optional[Set[str]] = None,
+                resolver: str = 'udp',
+                doh_url: str = DEFAULT_DOH_URL,
+                dns_rate: float = 0) -> pd.DataFrame:
     """
     运行DNS批量检查
     
@@ -457,52 +1336,324 @@ def run_dns_batch(domains: List[str],
         checked_df: 已检查域名的DataFrame
         available_file: 可用域名输出文件
         error_file: 错误日志文件
-        counter: 计数器
-        max_workers: 最大并发线程数
+        max_inflight: 异步DNS查询的最大并发数
+        max_workers: 回退到系统解析器时的最大并发线程数
+        cache: 可选的结果缓存，命中的域名不再查询DNS
+        known_registered: 已知已注册的域名集合，其中的域名直接标记为已注册
+        resolver: DNS查询方式，'udp'、'doh'或'system'
+        doh_url: 使用DoH时的服务器地址
+        dns_rate: 异步DNS查询的初始速率（每秒），根据应答延迟自动调整；0表示不限速
 
     Returns:
         更新后的DataFrame
     """
     
+    # 同一批次中重复的域名只查询一次
+    domains = list(dict.fromkeys(domains))
+    
     new_rows = []
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_domain = {executor.submit(dns_check, domain): domain for domain in domains}
+    total = len(domains)
+    count = 0  # 结果处理都在单一线程中进行，无需加锁
+    log_progress = logger.isEnabledFor(logging.INFO)
+    
+    def handle_result(result: Tuple[str, bool, Optional[str]]) -> None:
+        nonlocal count
+        domain, is_registered, error = result
+        count += 1
         
-        for future in as_completed(future_to_domain):
-            try:
-                domain, is_registered, error = future.result()
-                count = counter.increment()
-                
-                # 如果出现错误，记录到错误日志
-                if error:
-                    log_error(domain, error, error_file)
-                    status = "❓"
-                else:
-                    status = "❌" if is_registered else "✅"
-                
-                # 显示进度
-                logger.info(f"[{count}/{len(domains)}] {status} {domain}")
-                
-                # 记录结果
-                row = {
+        # 如果出现错误，记录到错误日志
+        if error:
+            log_error(domain, error, error_file)
+            status = "❓"
+        else:
+            status = "❌" if is_registered else "✅"
+        
+        # 显示进度（惰性格式化，日志级别高于INFO时不产生任何开销）
+        if log_progress:
+            logger.info("[%d/%d] %s %s", count, total, status, domain)
+        
+        # 记录结果
+        row = {
+            "domain": domain,
+            "dns_checked": True,
+            "api_verified": False,
+            "available": not is_registered,
+            "note": error if error else ("已注册" if is_registered else "DNS无记录，可能可用")
+        }
+        new_rows.append(row)
+        
+        # 如果看起来可用，添加到候选可用域名列表
+        if not is_registered:
+            save_available_domain(domain, "待API验证", available_file)
+    
+    def handle_fresh_result(result: Tuple[str, bool, Optional[str]]) -> None:
+        domain, is_registered, error = result
+        # 已注册的结果永久有效，查询出错的结果不缓存
+        if cache is not None and not error:
+            cache.set(domain, 'dns', is_registered, None, permanent=is_registered)
+        handle_result(result)
+    
+    # 已知已注册的域名直接跳过DNS查询
+    if known_registered:
+        pending = []
+        for domain in domains:
+            if domain.lower() in known_registered:
+                new_rows.append({
                     "domain": domain,
                     "dns_checked": True,
                     "api_verified": False,
-                    "available": not is_registered,
-                    "note": error if error else ("已注册" if is_registered else "DNS无记录，可能可用")
-                }
-                new_rows.append(row)
-                
-                # 如果看起来可用，添加到候选可用域名列表
-                if not is_registered:
-                    save_available_domain(domain, "待API验证", available_file)
-            except Exception as e:
-                logger.error(f"处理域名时出错: {str(e)}")
+                    "available": False,
+                    "note": KNOWN_REGISTERED_NOTE
+                })
+            else:
+                pending.append(domain)
+        if len(pending) < len(domains):
+            logger.info(f"跳过{len(domains) - len(pending)}个已知已注册的域名")
+        domains = pending
+        total = len(domains)
+    
+    # 先处理缓存中已有结果的域名
+    if cache is not None:
+        pending = []
+        for domain in domains:
+            cached = cache.get(domain, 'dns')
+            if cached is None:
+                pending.append(domain)
+            else:
+                handle_result((domain, cached[0], None))
+        if len(pending) < len(domains):
+            logger.info(f"缓存命中{len(domains) - len(pending)}个域名，需要查询{len(pending)}个")
+        domains = pending
+    
+    interrupted = None
+    try:
+        if domains and resolver == 'system':
+            _run_dns_batch_threaded(domains, handle_fresh_result, max_workers)
+        elif domains:
+            try:
+                get_dns_runner(resolver, doh_url).run(domains, handle_fresh_result, max_inflight, dns_rate)
+            except OSError as e:
+                logger.warning(f"无法初始化异步DNS解析器({str(e)})，改用系统解析器")
+                _run_dns_batch_threaded(domains, handle_fresh_result, max_workers)
+    except BaseException as e:
+        # 中断（Ctrl+C、超时后的SIGTERM、批量脚本进程内运行超时等）时保留已完成的结果，
+        # 由调用方保存后再重新抛出
+        logger.warning(f"DNS检查被中断，已完成{count}/{total}个域名")
+        interrupted = e
+    
+    if cache is not None:
+        cache.flush()
+    flush_writers()
     
     # 整合新的结果
     updated_df = pd.concat([checked_df, pd.DataFrame(new_rows)], ignore_index=True)
+    updated_df.attrs['interrupted'] = interrupted
     return updated_df
 
+# 其他线程请求停止进程内运行的检查（如图形界面关闭窗口）
+_stop_requested = threading.Event()
+
+def request_stop() -> None:
+    """
+    请求停止当前进程内运行的检查（可在任意线程调用）
+
+    正在进行的DNS批量检查在处理下一个域名前停止，API验证在发出下一个请求前停止，
+    保存已完成的结果后以KeyboardInterrupt结束。
+    """
+    _stop_requested.set()
+
+def _check_stop() -> None:
+    if _stop_requested.is_set():
+        raise KeyboardInterrupt
+
+async def _query_domains(domains: List[str], handle_result, max_inflight: int, resolver,
+                         limiter: Optional[AdaptiveRateLimiter] = None) -> None:
+    """
+    用已打开的解析器并发查询所有域名，逐个交给handle_result处理
+    
+    启动max_inflight个工作协程从同一个迭代器中取域名，同时在途的查询数
+    不超过max_inflight，且不必为每个域名预先创建任务。
+    指定limiter时每个查询发出前先取令牌，并把应答延迟反馈给limiter调整速率。
+    """
+    pending = iter(domains)
+    
+    async def worker() -> None:
+        for domain in pending:
+            if _stop_requested.is_set():
+                # 请求停止时各工作协程直接结束，由DNSRunner.run在事件循环外抛出中断
+                return
+            if limiter is None:
+                result = await dns_check_async(domain, resolver)
+            else:
+                await limiter.acquire_async()
+                started = time.monotonic()
+                result = await dns_check_async(domain, resolver)
+                limiter.record(time.monotonic() - started, ok=result[2] is None)
+            try:
+                handle_result(result)
+            except Exception as e:
+                logger.error(f"处理域名时出错: {str(e)}")
+    
+    workers = max(1, min(max_inflight, len(domains)))
+    await asyncio.gather(*[worker() for _ in range(workers)])
+
+class DNSRunner:
+    """
+    长期存在的异步DNS查询执行器
+    
+    持有一个事件循环和在其中打开的解析器，同一进程中的多次run_dns_batch
+    （例如批量脚本在进程内逐个扫描前缀）复用同一组UDP套接字或DoH连接，
+    不必每批重新创建事件循环和解析器。
+    """
+    
+    def __init__(self, resolver: str = 'udp', doh_url: str = DEFAULT_DOH_URL):
+        """
+        初始化执行器（解析器在第一次查询时才打开）
+        
+        Args:
+            resolver: DNS查询方式，'udp'或'doh'
+            doh_url: 使用DoH时的服务器地址
+        """
+        self.resolver = resolver
+        self.doh_url = doh_url
+        self._loop = None
+        self._resolver = None
+        self._limiter = None
+        self._limiter_rate = 0
+        self._lock = threading.Lock()
+    
+    def _open(self) -> None:
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        if self._resolver is None:
+            if self.resolver == 'doh':
+                resolver = DoHResolver(url=self.doh_url, timeout=DNS_TIMEOUT)
+            else:
+                resolver = UDPResolver(timeout=DNS_TIMEOUT)
+            self._loop.run_until_complete(resolver.__aenter__())
+            self._resolver = resolver
+    
+    def _limiter_for(self, rate: float) -> Optional[AdaptiveRateLimiter]:
+        """获取初始速率为rate的限速器，初始速率不变时沿用上一批次调整后的速率"""
+        if rate <= 0:
+            return None
+        if self._limiter is None or self._limiter_rate != rate:
+            self._limiter = AdaptiveRateLimiter(rate)
+            self._limiter_rate = rate
+        return self._limiter
+    
+    def run(self, domains: List[str], handle_result, max_inflight: int = DNS_MAX_INFLIGHT,
+            rate: float = 0) -> None:
+        """
+        查询一批域名，结果逐个交给handle_result处理
+        
+        Args:
+            domains: 要查询的域名列表
+            handle_result: 处理单个结果的函数
+            max_inflight: 同时在途的查询数
+            rate: 初始查询速率（每秒），根据应答延迟自动调整；0表示不限速
+        
+        Raises:
+            OSError: 无法打开解析器
+        """
+        with self._lock:
+            self._open()
+            limiter = self._limiter_for(rate)
+            try:
+                self._loop.run_until_complete(
+                    _query_domains(domains, handle_result, max_inflight, self._resolver, limiter))
+            except BaseException:
+                # 被中断（如批量脚本的超时）时丢弃残留的查询任务，下次重新打开
+                self._close()
+                raise
+        _check_stop()
+    
+    def close(self) -> None:
+        """关闭解析器和事件循环"""
+        with self._lock:
+            self._close()
+    
+    def _close(self) -> None:
+        if self._loop is None:
+            return
+        try:
+            tasks = asyncio.all_tasks(self._loop)
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            if self._resolver is not None:
+                self._loop.run_until_complete(self._resolver.__aexit__(None, None, None))
+        finally:
+            self._resolver = None
+            self._loop.close()
+            self._loop = None
+
+_dns_runner: Optional[DNSRunner] = None
+_dns_runner_lock = threading.Lock()
+
+def get_dns_runner(resolver: str = 'udp', doh_url: str = DEFAULT_DOH_URL) -> DNSRunner:
+    """获取进程内共享的DNS执行器，查询方式改变时关闭旧的并重新创建"""
+    global _dns_runner
+    with _dns_runner_lock:
+        runner = _dns_runner
+        if runner is None or (runner.resolver, runner.doh_url) != (resolver, doh_url):
+            if runner is not None:
+                runner.close()
+            runner = _dns_runner = DNSRunner(resolver, doh_url)
+        return runner
+
+def close_dns_runner() -> None:
+    """关闭共享的DNS执行器"""
+    global _dns_runner
+    with _dns_runner_lock:
+        if _dns_runner is not None:
+            _dns_runner.close()
+            _dns_runner = None
+
+atexit.register(close_dns_runner)
+
+_dns_executor: Optional[ThreadPoolExecutor] = None
+_dns_executor_workers = 0
+_dns_executor_lock = threading.Lock()
+
+def _get_dns_executor(max_workers: int) -> ThreadPoolExecutor:
+    """获取进程内共享的系统解析器线程池，进程内连续运行的批次复用同一组线程；线程数改变时重新创建"""
+    global _dns_executor, _dns_executor_workers
+    with _dns_executor_lock:
+        if _dns_executor is None or _dns_executor_workers != max_workers:
+            if _dns_executor is not None:
+                _dns_executor.shutdown(wait=False)
+            _dns_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='dns')
+            _dns_executor_workers = max_workers
+        return _dns_executor
+
+def close_dns_executor() -> None:
+    """关闭共享的系统解析器线程池"""
+    global _dns_executor
+    with _dns_executor_lock:
+        if _dns_executor is not None:
+            _dns_executor.shutdown(wait=False, cancel_futures=True)
+            _dns_executor = None
+
+atexit.register(close_dns_executor)
+
+def _run_dns_batch_threaded(domains: List[str], handle_result, max_workers: int) -> None:
+    """使用共享线程池和系统解析器执行DNS查询"""
+    executor = _get_dns_executor(max_workers)
+    future_to_domain = {executor.submit(dns_check, domain): domain for domain in domains}
+    try:
+        for future in as_completed(future_to_domain):
+            _check_stop()
+            try:
+                handle_result(future.result())
+            except Exception as e:
+                logger.error(f"处理域名时出错: {str(e)}")
+    finally:
+        # 中断时取消本批次尚未开始的查询，线程池留给之后的批次
+        for future in future_to_domain:
+            future.cancel()
+
 def run_api_verification(domains: List[str], 
                        checked_df: pd.DataFrame,
                        available_file: str, 
@@ -532,6 +1683,11 @@ def run_api_verification(domains: List[str],
     
     logger.info(f"使用的API提供商: {', '.join(api_config.active_providers)}")
     
+    # 缓存中已有明确结果的域名直接使用，不占用API速率限制配额
+    domains = _apply_cached_api_results(domains, checked_df, available_file, api_config)
+    if not domains:
+        return checked_df
+    
     # 单API顺序验证
     if not use_multi_api or max_workers <= 1:
         return run_sequential_api_verification(domains, checked_df, available_file, error_file, api_config)
@@ -539,60 +1695,101 @@ def run_api_verification(domains: List[str],
     # 多API并行验证
     return run_parallel_api_verification(domains, checked_df, available_file, error_file, api_config, max_workers)
 
+def _apply_cached_api_results(domains: List[str],
+                              checked_df: pd.DataFrame,
+                              available_file: str,
+                              api_config: APIConfig) -> List[str]:
+    """
+    用任一活跃提供商的缓存结果标记域名，返回仍需请求API的域名
+    
+    已注册的结果永不过期，所以已知已注册的域名不会再次请求API，
+    也不会为它们等待速率限制。
+    """
+    cache = api_config.result_cache
+    if cache is None:
+        return domains
+    
+    cached_results = []
+    pending = []
+    for domain in domains:
+        for provider in api_config.active_providers:
+            hit = cache.get(domain, provider)
+            if hit is not None:
+                cached_results.append((domain,) + hit)
+                break
+        else:
+            pending.append(domain)
+    
+    if not cached_results:
+        return domains
+    
+    for domain, is_available, note in cached_results:
+        if is_available:
+            save_available_domain(domain, f"API已确认 - {note}", available_file)
+    _apply_api_results(checked_df, cached_results)
+    logger.info(f"缓存命中{len(cached_results)}个域名，需要API验证{len(pending)}个")
+    return pending
+
 def run_sequential_api_verification(domains: List[str], 
                                   checked_df: pd.DataFrame,
                                   available_file: str, 
                                   error_file: str,
                                   api_config: APIConfig) -> pd.DataFrame:
-    """单API顺序验证域名"""
+    """单API顺序验证域名，支持批量查询的提供商每次请求检查一批域名"""
     
-    for i, domain in enumerate(domains):
+    results = []
+    try:
+        _verify_sequentially(domains, api_config, available_file, error_file, results)
+    finally:
+        # 无论是否中断，都把已得到的结果一次性写回DataFrame
+        _apply_api_results(checked_df, results)
+    
+    return checked_df
+
+def _verify_sequentially(domains: List[str],
+                         api_config: APIConfig,
+                         available_file: str,
+                         error_file: str,
+                         results: List[Tuple[str, bool, str]]) -> None:
+    """逐批调用API验证域名，结果追加到results"""
+    total = len(domains)
+    done = 0
+    while done < total:
+        _check_stop()
+        # 轮询选择一个有请求配额的API提供商，全部用尽时等待
+        provider = api_config.acquire_provider()
+        batch = domains[done:done + get_api_batch_size(provider)]
+        done += len(batch)
+        
         try:
-            logger.info(f"[{i+1}/{len(domains)}] API验证域名: {domain}")
-            
-            # 随机选择一个API提供商
-            provider = api_config.get_random_active_provider()
-            provider_config = api_config.get_provider_config(provider)
-            
-            # 获取提供商的速率限制
-            rate_limit = RATE_LIMIT_PORKBUN
-            if provider.lower() == 'dynadot':
-                rate_limit = RATE_LIMIT_DYNADOT
-            
-            # 执行API检查
-            domain, is_available, note = api_check(domain, api_config, provider)
-            
-            # 处理速率限制
-            if is_available is None and "速率限制" in note:
-                logger.warning(f"达到{provider}速率限制，等待{rate_limit}秒...")
-                time.sleep(rate_limit)
-                # 重试，可能使用不同的API
-                domain, is_available, note = api_check(domain, api_config)
-            
-            # 更新数据框中的结果
-            mask = checked_df['domain'] == domain
-            checked_df.loc[mask, 'api_verified'] = True
-            
-            if is_available:
-                checked_df.loc[mask, 'available'] = True
-                checked_df.loc[mask, 'note'] = note
-                logger.info(f"✅ 确认可用: {domain} ({note})")
-                save_available_domain(domain, f"API已确认 - {note}", available_file)
+            if len(batch) == 1:
+                logger.info(f"[{done}/{total}] API验证域名: {batch[0]}")
             else:
-                checked_df.loc[mask, 'available'] = False
-                checked_df.loc[mask, 'note'] = note
-                logger.info(f"❌ 已注册: {domain} ({note})")
+                logger.info(f"[{done}/{total}] API批量验证{len(batch)}个域名 ({provider})")
             
-            # 添加延迟以遵守API速率限制
-            logger.debug(f"等待{rate_limit}秒以遵守速率限制...")
-            time.sleep(rate_limit)
+            # 执行API检查
+            for domain, kind, note in _api_query_batch(batch, api_config, provider):
+                # 处理速率限制：换一个有配额的API重试，全部用尽时等待
+                if kind is ResultKind.RATE_LIMITED:
+                    logger.warning(f"达到{provider}速率限制，等待可用的API...")
+                    retry_provider = api_config.acquire_provider()
+                    domain, kind, note = _api_query(domain, api_config, retry_provider)
+                is_available = kind.available
+                
+                # 记录结果
+                results.append((domain, is_available, note))
+                
+                if is_available:
+                    logger.info(f"✅ 确认可用: {domain} ({note})")
+                    save_available_domain(domain, f"API已确认 - {note}", available_file)
+                else:
+                    logger.info(f"❌ 已注册: {domain} ({note})")
             
         except Exception as e:
             error_msg = f"API验证出错: {str(e)}"
             logger.error(error_msg)
-            log_error(domain, error_msg, error_file)
-    
-    return checked_df
+            for domain in batch:
+                log_error(domain, error_msg, error_file)
 
 def run_parallel_api_verification(domains: List[str], 
                                 checked_df: pd.DataFrame,
@@ -649,15 +1846,31 @@ def run_parallel_api_verification(domains: List[str],
                 logger.error(f"API批处理出错: {str(e)}")
     
     # 更新DataFrame
-    for domain, is_available, note in results:
-        mask = checked_df['domain'] == domain
-        if mask.any():
-            checked_df.loc[mask, 'api_verified'] = True
-            checked_df.loc[mask, 'available'] = is_available
-            checked_df.loc[mask, 'note'] = note
+    _apply_api_results(checked_df, results)
+    _check_stop()
     
     return checked_df
 
+def _apply_api_results(checked_df: pd.DataFrame, results: List[Tuple[str, bool, str]]) -> None:
+    """
+    将API验证结果一次性写回DataFrame（原地修改）
+    
+    Args:
+        checked_df: 已检查域名的DataFrame
+        results: [(域名, 是否可用, 备注)]，同一域名以最后一条为准
+    """
+    if not results:
+        return
+    
+    available_map = {domain: bool(is_available) for domain, is_available, _ in results}
+    note_map = {domain: note for domain, _, note in results}
+    
+    mask = checked_df['domain'].isin(available_map.keys())
+    domains = checked_df.loc[mask, 'domain']
+    checked_df.loc[mask, 'api_verified'] = True
+    checked_df.loc[mask, 'available'] = domains.map(available_map)
+    checked_df.loc[mask, 'note'] = domains.map(note_map)
+
 def process_api_batch(domains: List[str], 
                     provider: str, 
                     api_config: APIConfig,
@@ -666,44 +1879,51 @@ def process_api_batch(domains: List[str],
     """处理一批域名的API验证"""
     
     results = []
-    provider_config = api_config.get_provider_config(provider)
+    batch_size = get_api_batch_size(provider)
+    rate_limiter = api_config.get_rate_limiter(provider)
     
-    # 获取提供商的速率限制
-    rate_limit = RATE_LIMIT_PORKBUN
-    if provider.lower() == 'dynadot':
-        rate_limit = RATE_LIMIT_DYNADOT
-    
-    for i, domain in enumerate(domains):
+    for start in range(0, len(domains), batch_size):
+        if _stop_requested.is_set():
+            break
+        batch = domains[start:start + batch_size]
         try:
-            logger.info(f"[{provider}] [{i+1}/{len(domains)}] 验证域名: {domain}")
-            
-            # 执行API检查
-            domain, is_available, note = api_check(domain, api_config, provider)
+            # 等待该提供商的请求配额
+            rate_limiter.acquire()
             
-            # 记录结果
-            results.append((domain, is_available, note))
-            
-            # 处理可用域名
-            if is_available:
-                logger.info(f"✅ 确认可用: {domain} ({note})")
-                save_available_domain(domain, f"API已确认 - {note}", available_file)
+            if len(batch) == 1:
+                logger.info(f"[{provider}] [{start+1}/{len(domains)}] 验证域名: {batch[0]}")
             else:
-                logger.info(f"❌ 已注册: {domain} ({note})")
+                logger.info(f"[{provider}] [{start+len(batch)}/{len(domains)}] 批量验证{len(batch)}个域名")
             
-            # 添加延迟以遵守API速率限制
-            logger.debug(f"[{provider}] 等待{rate_limit}秒...")
-            time.sleep(rate_limit)
+            # 执行API检查
+            for domain, is_available, note in api_check_batch(batch, api_config, provider):
+                # 记录结果
+                results.append((domain, is_available, note))
+                
+                # 处理可用域名
+                if is_available:
+                    logger.info(f"✅ 确认可用: {domain} ({note})")
+                    save_available_domain(domain, f"API已确认 - {note}", available_file)
+                else:
+                    logger.info(f"❌ 已注册: {domain} ({note})")
             
         except Exception as e:
             error_msg = f"API验证出错: {str(e)}"
             logger.error(error_msg)
-            log_error(domain, error_msg, error_file)
-            results.append((domain, False, error_msg))
+            for domain in batch:
+                log_error(domain, error_msg, error_file)
+                results.append((domain, False, error_msg))
     
     return results
 
-def main():
-    """主程序入口"""
+def main(argv: Optional[List[str]] = None, words: Optional[List[str]] = None):
+    """
+    主程序入口
+    
+    Args:
+        argv: 命令行参数列表，默认使用sys.argv[1:]
+        words: 直接传入的单词列表，代替--wordlist文件（进程内调用时使用）
+    """
     parser = argparse.ArgumentParser(description='域名查找工具')
     
     # 基本参数
@@ -717,6 +1937,8 @@ def main():
                       help='域名前缀')
     parser.add_argument('--suffix', default='', 
                       help='域名后缀')
+    parser.add_argument('--wordlist', default=None,
+                      help='单词列表文件，每行一个单词，-表示从标准输入读取；指定后不再按字符集生成组合')
     parser.add_argument('--tld', default=DEFAULT_TLD, 
                       help=f'顶级域名 (默认: {DEFAULT_TLD})')
     
@@ -731,20 +1953,36 @@ def main():
                       help='使用字母和数字作为字符集')
     
     # 性能参数
-    parser.add_argument('--threads', type=int, default=20, 
-                      help='DNS检查的并发线程数 (默认: 20)')
+    parser.add_argument('--resolver', choices=DNS_RESOLVERS, default='udp',
+                      help='DNS查询方式: udp=直接查询DNS服务器, doh=DNS-over-HTTPS, system=系统解析器 (默认: udp)')
+    parser.add_argument('--doh-url', default=DEFAULT_DOH_URL,
+                      help=f'DoH服务器地址 (默认: {DEFAULT_DOH_URL})')
+    parser.add_argument('--max-inflight', type=int, default=DNS_MAX_INFLIGHT,
+                      help=f'同时在途的异步DNS查询数 (默认: {DNS_MAX_INFLIGHT})')
+    parser.add_argument('--dns-rate', type=float, default=0,
+                      help='异步DNS查询的初始速率（每秒），根据应答延迟自动升降 (默认: 0，不限速)')
+    parser.add_argument('--threads', type=int, default=DNS_THREADS, 
+                      help=f'无法使用异步DNS时，系统解析器的并发线程数 (默认: {DNS_THREADS})')
     parser.add_argument('--api-workers', type=int, default=1,
                       help='API验证的并发线程数 (默认: 1，设置大于1启用多API并行)')
     
     # 文件路径参数
     parser.add_argument('--check-file', default=DEFAULT_CHECKED_FILE, 
-                      help='已检查域名文件路径')
+                      help='已检查域名文件路径（以.parquet结尾时使用Parquet格式）')
+    parser.add_argument('--exclude-file', action='append', default=[],
+                      help='额外的已检查域名文件，其中的域名不再生成和检查，文件本身不会被修改（可多次指定）')
     parser.add_argument('--available-file', default=DEFAULT_AVAILABLE_FILE, 
                       help='可用域名文件路径')
     parser.add_argument('--error-file', default=DEFAULT_ERROR_LOG, 
                       help='错误日志文件')
     parser.add_argument('--config-file', default=DEFAULT_CONFIG_FILE, 
                       help='API配置文件')
+    parser.add_argument('--known-registered-file', default=DEFAULT_KNOWN_REGISTERED_FILE,
+                      help=f'已知已注册域名列表，其中的域名跳过DNS查询 (默认: {DEFAULT_KNOWN_REGISTERED_FILE})')
+    parser.add_argument('--zone-file', default=DEFAULT_ZONE_FILE,
+                      help=f'gzip压缩的区域文件，存在时从中加载已注册域名 (默认: {DEFAULT_ZONE_FILE})')
+    parser.add_argument('--cache-file', default=DEFAULT_CACHE_FILE,
+                      help=f'检查结果缓存文件 (默认: {DEFAULT_CACHE_FILE})')
     
     # 功能开关
     parser.add_argument('--verify-api', action='store_true', 
@@ -753,12 +1991,15 @@ def main():
                       help='显示详细日志')
     parser.add_argument('--only-verify-api', action='store_true',
                       help='仅执行API验证步骤，跳过DNS检查')
+    parser.add_argument('--no-cache', action='store_true',
+                      help='不使用检查结果缓存')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    if words is not None:
+        args.wordlist = '-'
     
-    # 设置日志级别
-    if args.verbose:
-        logging.getLogger().setLevel(logging.DEBUG)
+    # 设置日志级别（同一进程内多次运行时按本次参数重新设置）
+    logging.getLogger().setLevel(logging.DEBUG if args.verbose else logging.INFO)
     
     # 输出程序开始信息
     logger.info("="*50)
@@ -774,31 +2015,82 @@ def main():
     elif args.alphanumeric:
         characters = ALPHANUMERIC
     
-    # 加载已检查的域名
+    # 加载已检查的域名；--exclude-file中的域名只用于排除，结果仍只写入--check-file
     checked_df, checked_set = load_checked_domains(args.check_file)
+    for exclude_file in args.exclude_file:
+        checked_set |= load_checked_domains(exclude_file)[1]
     
+    # 打开检查结果缓存
+    cache = open_result_cache(args)
+    try:
+        run_checks(args, characters, checked_df, checked_set, cache, words)
+    finally:
+        if cache is not None:
+            cache.close()
+
+def run(argv: List[str], words: Optional[List[str]] = None) -> int:
+    """
+    在当前进程中运行一次域名查找，供批量脚本直接调用以省去启动子进程的开销
+    
+    Args:
+        argv: 与命令行相同的参数列表
+        words: 要检查的单词列表（可选），直接传入而不经过临时文件
+    
+    Returns:
+        int: 退出码，0表示成功
+    """
+    _stop_requested.clear()
+    try:
+        main(argv, words)
+    except SystemExit as e:
+        # argparse参数错误或--help
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception as e:
+        logger.error(f"程序执行错误: {str(e)}", exc_info=True)
+        return 1
+    finally:
+        flush_writers()
+    return 0
+
+def open_result_cache(args) -> Optional[ResultCache]:
+    """根据命令行参数打开检查结果缓存，失败时不使用缓存"""
+    if args.no_cache:
+        return None
+    try:
+        return ResultCache(args.cache_file)
+    except Exception as e:
+        logger.warning(f"无法打开结果缓存 {args.cache_file}: {str(e)}")
+        return None
+
+def run_checks(args, characters, checked_df, checked_set, cache=None, words=None):
+    """执行DNS检查和API验证"""
     # 仅执行API验证步骤
     if args.only_verify_api:
-        return run_only_api_verification(args, checked_df)
+        return run_only_api_verification(args, checked_df, cache)
     
     # 生成待检查的域名
-    domains = generate_domains(
-        characters=characters,
-        length=args.length,
-        limit=args.limit,
-        prefix=args.prefix,
-        suffix=args.suffix,
-        tld=args.tld,
-        exclude_set=checked_set,
-        pattern=args.pattern
-    )
+    if args.wordlist:
+        if words is None:
+            words = read_wordlist(args.wordlist)
+        domains = wordlist_domains(words, args.tld, checked_set)
+    else:
+        domains = generate_domains(
+            characters=characters,
+            length=args.length,
+            limit=args.limit,
+            prefix=args.prefix,
+            suffix=args.suffix,
+            tld=args.tld,
+            exclude_set=checked_set,
+            pattern=args.pattern
+        )
     
     if not domains:
         logger.warning("没有新的域名需要检查")
         return
     
-    # 创建计数器
-    counter = Counter()
+    # 已知已注册的域名
+    known_registered = load_known_registered(args.known_registered_file, args.zone_file, args.tld)
     
     # 第一阶段：DNS快速初筛
     logger.info("="*30)
@@ -808,32 +2100,47 @@ def main():
         checked_df=checked_df,
         available_file=args.available_file,
         error_file=args.error_file,
-        counter=counter,
-        max_workers=args.threads
+        max_inflight=args.max_inflight,
+        max_workers=args.threads,
+        cache=cache,
+        known_registered=known_registered,
+        resolver=args.resolver,
+        doh_url=args.doh_url,
+        dns_rate=args.dns_rate
     )
     
+    # 记录本次新发现的已注册域名，下次直接跳过（已在列表中的不再重复追加）
+    new_rows = updated_df.iloc[len(checked_df):]
+    if 'note' in new_rows.columns:
+        registered = new_rows.loc[new_rows['note'] == '已注册', 'domain'].tolist()
+        save_known_registered(
+            [domain for domain in registered if domain.lower() not in known_registered],
+            args.known_registered_file
+        )
+    
     # 保存检查结果
     save_checked_domains(updated_df, args.check_file)
+    interrupted = updated_df.attrs.get('interrupted')
+    if interrupted is not None:
+        logger.info(f"已完成的检查结果已保存到 {args.check_file}")
+        raise interrupted
     logger.info(f"DNS检查完成，结果已保存到 {args.check_file}")
     
     # 第二阶段：API精确验证（如果需要）
+    _check_stop()
     if args.verify_api:
-        run_api_verification_stage(args, updated_df)
+        run_api_verification_stage(args, updated_df, cache=cache)
     
     # 显示统计信息
     show_statistics(updated_df, len(domains), args.verify_api)
 
-def run_only_api_verification(args, checked_df):
+def run_only_api_verification(args, checked_df, cache=None):
     """仅运行API验证步骤"""
     logger.info("="*30)
     logger.info("仅执行API验证步骤，跳过DNS检查")
     
     # 筛选出DNS检查后可能可用但未经API验证的域名
-    possibly_available = checked_df[
-        (checked_df['dns_checked'] == True) & 
-        (checked_df['api_verified'] == False) & 
-        (checked_df['available'] == True)
-    ]['domain'].tolist()
+    possibly_available = pending_api_domains(checked_df)
     
     if not possibly_available:
         logger.warning("没有找到需要API验证的域名")
@@ -842,18 +2149,19 @@ def run_only_api_verification(args, checked_df):
     logger.info(f"找到{len(possibly_available)}个待验证域名")
     
     # 运行API验证阶段
-    run_api_verification_stage(args, checked_df, possibly_available)
+    run_api_verification_stage(args, checked_df, possibly_available, cache)
     
     # 显示统计信息
     show_statistics(checked_df, len(possibly_available), True)
 
-def run_api_verification_stage(args, checked_df, domains=None):
+def run_api_verification_stage(args, checked_df, domains=None, cache=None):
     """运行API验证阶段"""
     logger.info("="*30)
     logger.info("开始API精确验证...")
     
     # 加载API配置
     api_config = APIConfig.from_file(args.config_file)
+    api_config.result_cache = cache
     
     if not api_config.active_providers:
         logger.error(f"无法从{args.config_file}加载有效的API配置，请检查配置文件")
@@ -864,11 +2172,7 @@ def run_api_verification_stage(args, checked_df, domains=None):
     
     # 如果没有指定域名，则从DataFrame中筛选
     if domains is None:
-        domains = checked_df[
-            (checked_df['dns_checked'] == True) & 
-            (checked_df['api_verified'] == False) & 
-            (checked_df['available'] == True)
-        ]['domain'].tolist()
+        domains = pending_api_domains(checked_df)
     
     logger.info(f"需要API验证的域名数量: {len(domains)}")
     
@@ -881,17 +2185,25 @@ def run_api_verification_stage(args, checked_df, domains=None):
     if use_multi_api:
         logger.info(f"启用多API并行验证，使用{args.api_workers}个线程")
     
-    final_df = run_api_verification(
-        domains=domains,
-        checked_df=checked_df,
-        available_file=args.available_file,
-        error_file=args.error_file,
-        api_config=api_config,
-        use_multi_api=use_multi_api,
-        max_workers=args.api_workers
-    )
+    try:
+        final_df = run_api_verification(
+            domains=domains,
+            checked_df=checked_df,
+            available_file=args.available_file,
+            error_file=args.error_file,
+            api_config=api_config,
+            use_multi_api=use_multi_api,
+            max_workers=args.api_workers
+        )
+    except BaseException:
+        # 中断（包括批量脚本进程内运行超时）时已得到的验证结果已写回checked_df，保存后再重新抛出
+        flush_writers()
+        save_checked_domains(checked_df, args.check_file)
+        logger.info(f"API验证被中断，已完成的结果已保存到 {args.check_file}")
+        raise
     
     # 保存最终结果
+    flush_writers()
     save_checked_domains(final_df, args.check_file)
     logger.info(f"API验证完成，结果已保存到 {args.check_file}")
     
@@ -919,19 +2231,41 @@ def show_statistics(df, total_checked, verified_api=False):
 # 导出关键组件以便导入
 __all__ = [
     'generate_domains',
+    'wordlist_domains',
+    'valid_name_mask',
+    'warm_up_jit',
     'dns_check',
     'api_check',
     'porkbun_check',
     'dynadot_check',
+    'dynadot_check_batch',
+    'api_check_batch',
     'load_checked_domains',
     'save_checked_domains',
+    'append_checked_domains',
     'save_available_domain',
+    'save_available_domains_batch',
     'log_error',
+    'pending_api_domains',
+    'load_known_registered',
+    'save_known_registered',
+    'flush_writers',
+    'get_dns_runner',
+    'DNSRunner',
     'APIConfig',
-    'Counter'
+    'Counter',
+    'DomainFinder',
+    'main',
+    'run',
+    'request_stop'
 ]
 
+def _interrupt_on_sigterm(signum, frame):
+    """把SIGTERM当作中断处理，使被批量脚本超时结束的进程也能保存已完成的结果"""
+    raise KeyboardInterrupt
+
 if __name__ == "__main__":
+    signal.signal(signal.SIGTERM, _interrupt_on_sigterm)
     try:
         main()
     except KeyboardInterrupt:
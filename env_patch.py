@@ -12,25 +12,46 @@ This module addresses macOS version detection issues, especially on Apple Silico
 import os
 import sys
 import platform
-import subprocess
-import builtins
-import ctypes
-from functools import wraps
 
 # 保存原始函数 / Save original functions
 _original_platform_mac_ver = platform.mac_ver
 _original_platform_platform = platform.platform
-_original_run = subprocess.run
-_original_getattr = builtins.__getattribute__
-_original___lt__ = str.__lt__
-_original___le__ = str.__le__
-_original___gt__ = str.__gt__
-_original___ge__ = str.__ge__
 
 # 设置版本号常量 / Set version number constants
 TARGET_MACOS_VERSION = '14.7.0'
 TARGET_BUILD_NUMBER = '14.7.0'
 
+# 子进程使用的环境变量，首次使用时计算一次 / Child process environment, computed once on first use
+_PATCHED_ENV = None
+
+def version_tuple(version: str) -> tuple:
+    """
+    将版本号字符串转换为整数元组，用于按数值比较版本
+    Convert a version string to an integer tuple for numeric comparison
+
+    例如 / e.g. version_tuple('10.15.7') < version_tuple('14.7.0')
+    """
+    return tuple(int(part) for part in version.split('.') if part.isdigit())
+
+def patched_env():
+    """
+    返回启动子进程时使用的环境变量：禁用版本检查并把当前目录加入PYTHONPATH
+    Return the environment for child processes: version check disabled, cwd on PYTHONPATH
+    
+    返回的字典在多次调用之间共享，直接作为env参数传入即可，不要修改
+    The returned dict is shared between calls; pass it as env=... without modifying it
+    """
+    global _PATCHED_ENV
+    if _PATCHED_ENV is None:
+        current_path = os.getcwd()
+        pythonpath = os.environ.get('PYTHONPATH')
+        _PATCHED_ENV = {
+            **os.environ,
+            'SYSTEM_VERSION_COMPAT': '1',
+            'PYTHONPATH': f"{current_path}:{pythonpath}" if pythonpath else current_path,
+        }
+    return _PATCHED_ENV
+
 def disable_version_check():
     """
     禁用macOS版本检查，将版本修改为兼容值
@@ -60,71 +81,10 @@ def disable_version_check():
             return ' '.join(parts)
         return result
     
-    # 替换版本比较操作 / Replace version comparison operations
-    # 创建一个通用的版本比较拦截器 / Create a generic version comparison interceptor
-    def intercept_version_comparison(op_name, original_op):
-        @wraps(original_op)
-        def wrapper(a, b):
-            # 检查是否可能是版本号比较
-            if (isinstance(a, str) and isinstance(b, str) and 
-                a.count('.') >= 2 and b.count('.') >= 2 and
-                '14.' in (a + b)):
-                
-                # 根据操作符返回兼容结果
-                if op_name == '__lt__':  # <
-                    return False if '14.' in b else True
-                elif op_name == '__le__':  # <=
-                    return True if '14.' in b else False
-                elif op_name == '__gt__':  # >
-                    return True if '14.' in a else False
-                elif op_name == '__ge__':  # >=
-                    return True if '14.' in a else False
-            
-            # 其他情况使用原始操作符
-            return original_op(a, b)
-        return wrapper
-    
     # 应用所有修补 / Apply all patches
     if sys.platform == 'darwin':
         platform.mac_ver = patched_mac_ver
         platform.platform = patched_platform
-        
-        # 拦截模块级别的比较操作 / Intercept module-level comparison operations
-        # 替换 operator 模块中的比较函数 / Replace comparison functions in operator module
-        import operator
-        
-        # 保存原始操作符函数 / Save original operator functions
-        _original_lt = operator.lt
-        _original_le = operator.le
-        _original_gt = operator.gt
-        _original_ge = operator.ge
-        
-        # 替换操作符函数 / Replace operator functions
-        operator.lt = intercept_version_comparison('__lt__', _original_lt)
-        operator.le = intercept_version_comparison('__le__', _original_le)
-        operator.gt = intercept_version_comparison('__gt__', _original_gt)
-        operator.ge = intercept_version_comparison('__ge__', _original_ge)
-    
-    # 修补subprocess.run以解决可能的进程问题 / Patch subprocess.run to fix potential process issues
-    @wraps(subprocess.run)
-    def _patched_run(cmd, *args, **kwargs):
-        # 添加环境变量来禁用版本检查 / Add environment variable to disable version check
-        env = kwargs.get('env', os.environ.copy())
-        env['SYSTEM_VERSION_COMPAT'] = '1'
-        
-        # 设置PYTHONPATH环境变量 / Set PYTHONPATH environment variable
-        current_path = os.getcwd()
-        if 'PYTHONPATH' in env:
-            env['PYTHONPATH'] = f"{current_path}:{env['PYTHONPATH']}"
-        else:
-            env['PYTHONPATH'] = current_path
-            
-        kwargs['env'] = env
-        
-        return _original_run(cmd, *args, **kwargs)
-    
-    # 应用subprocess修补 / Apply subprocess patch
-    subprocess.run = _patched_run
     
     # 设置环境变量 / Set environment variable
     os.environ['SYSTEM_VERSION_COMPAT'] = '1'
@@ -139,8 +99,9 @@ def disable_version_check():
     except Exception as e:
         print(f"高级修补失败: {e}")
 
-# 自动应用修补 / Automatically apply patch
-disable_version_check()
+# 自动应用修补，只有macOS需要 / Automatically apply patch, only needed on macOS
+if sys.platform == 'darwin':
+    disable_version_check()
 
 if __name__ == "__main__":
     # 如果直接运行这个脚本，打印状态信息 / If this script is run directly, print status
@@ -149,15 +110,10 @@ if __name__ == "__main__":
     print(f"系统环境: {platform.platform()}")
     
     # 测试版本号比较 / Test version number comparison
-    import operator
     print("\n测试版本号比较: / Testing version comparison:")
-    ver1 = "10.15.7"
-    ver2 = "14.7.0"
-    print(f"{ver1} < {ver2} (operator): {operator.lt(ver1, ver2)}")
-    print(f"{ver1} <= {ver2} (operator): {operator.le(ver1, ver2)}")
-    print(f"{ver1} > {ver2} (operator): {operator.gt(ver1, ver2)}")
-    print(f"{ver1} >= {ver2} (operator): {operator.ge(ver1, ver2)}")
-    print(f"{ver2} < {ver1} (operator): {operator.lt(ver2, ver1)}")
-    print(f"{ver2} <= {ver1} (operator): {operator.le(ver2, ver1)}")
-    print(f"{ver2} > {ver1} (operator): {operator.gt(ver2, ver1)}")
-    print(f"{ver2} >= {ver1} (operator): {operator.ge(ver2, ver1)}")
+    ver1 = version_tuple("10.15.7")
+    ver2 = version_tuple(platform.mac_ver()[0] or TARGET_MACOS_VERSION)
+    print(f"{ver1} < {ver2}: {ver1 < ver2}")
+    print(f"{ver1} >= {ver2}: {ver1 >= ver2}")
+    print(f"{ver2} > {ver1}: {ver2 > ver1}")
+    print(f"{ver2} <= {ver1}: {ver2 <= ver1}")
@@ -4,8 +4,12 @@
 Domain Finder 基本使用示例
 """
 
+import asyncio
 import os
 import sys
+import tempfile
+
+from tqdm.asyncio import tqdm_asyncio
 
 # 添加项目根目录到路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -14,10 +18,32 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from domain_finder import (
     generate_domains,
     dns_check,
+    dns_check_async,
     load_checked_domains,
     save_checked_domains,
-    save_available_domain
+    save_available_domain,
+    save_available_domains_batch,
+    flush_writers
 )
+from dns_resolver import UDPResolver
+
+# 同时进行的DNS查询数
+DNS_CONCURRENCY = 128
+
+async def check_domains_async(domains):
+    """并发检查所有域名：共享一个UDP解析器，用信号量限制同时进行的查询数"""
+    sem = asyncio.Semaphore(DNS_CONCURRENCY)
+    
+    async with UDPResolver() as resolver:
+        async def check(domain):
+            async with sem:
+                return await dns_check_async(domain, resolver)
+        
+        return await tqdm_asyncio.gather(*[check(domain) for domain in domains], desc="DNS检查")
+
+def check_domains_sync(domains):
+    """逐个检查域名（慢速参考实现 / slow reference），无法使用异步解析器时使用"""
+    return [dns_check(domain) for domain in domains]
 
 def main():
     """示例：如何使用Domain Finder的核心功能"""
@@ -43,11 +69,14 @@ def main():
     
     # 2. 对这些域名进行DNS检查
     print("执行DNS检查...")
-    results = []
+    try:
+        checked = asyncio.run(check_domains_async(domains))
+    except OSError as e:
+        print(f"异步DNS解析器不可用 ({e})，改用逐个检查")
+        checked = check_domains_sync(domains)
     
-    for domain in domains:
-        domain, is_registered, error = dns_check(domain)
-        
+    results = []
+    for domain, is_registered, error in checked:
         status = "已注册" if is_registered else "可能可用"
         if error:
             status += f" (错误: {error})"
@@ -70,6 +99,14 @@ def main():
     print("这些结果通常会保存到CSV文件中...")
     print("可用的域名会单独记录到available_domains.csv文件中")
     
+    # 批量写入只提交一次，而不是每个域名写一次文件；
+    # 示例写入临时文件，不改动实际的available_domains.csv
+    available_rows = [row for row in results if row["available"]]
+    example_file = os.path.join(tempfile.gettempdir(), "example_available_domains.csv")
+    save_available_domains_batch(available_rows, example_file)
+    flush_writers()
+    print(f"已批量写入 {len(available_rows)} 个可能可用的域名到 {example_file}")
+    
     # 实际使用Domain Finder时，这些操作会自动完成
     print("-" * 50)
     
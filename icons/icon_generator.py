@@ -7,50 +7,55 @@
 import os
 from PIL import Image, ImageDraw, ImageFont
 
+# 最大尺寸的图标只绘制一次，较小的尺寸由它缩小得到
+MASTER_SIZE = 512
+
+def _render_icon(size):
+    """绘制size×size的图标"""
+    # 创建一个正方形图像，使用RGBA模式支持透明度
+    img = Image.new('RGBA', (size, size), color=(0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    
+    # 绘制圆形背景
+    circle_color = (52, 152, 219)  # 蓝色
+    draw.ellipse([(0, 0), (size, size)], fill=circle_color)
+    
+    # 在中心绘制文字 'D'
+    try:
+        # 尝试使用系统字体
+        font = ImageFont.truetype("Arial Bold", int(size * 0.6))
+    except IOError:
+        # 如果无法加载特定字体，使用默认字体
+        font = ImageFont.load_default()
+    text = "D"
+    text_color = (255, 255, 255)  # 白色
+    
+    # 计算文本位置以使其居中
+    text_width, text_height = draw.textbbox((0, 0), text, font=font)[2:4]
+    position = ((size - text_width) // 2, (size - text_height) // 2 - int(size * 0.05))
+    
+    # 绘制文字
+    draw.text(position, text, font=font, fill=text_color)
+    return img
+
 def create_icon():
     # 创建不同尺寸的图标
     sizes = [16, 32, 48, 64, 128, 256, 512]
     
-    # 创建基本图标
+    # 绘制一次最大尺寸，其余尺寸用LANCZOS缩小，不再为每个尺寸重新栅格化文字
+    master = _render_icon(MASTER_SIZE)
+    images = {}
+    if not os.path.exists('icons'):
+        os.makedirs('icons')
     for size in sizes:
-        # 创建一个正方形图像，使用RGBA模式支持透明度
-        img = Image.new('RGBA', (size, size), color=(0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        
-        # 绘制圆形背景
-        circle_color = (52, 152, 219)  # 蓝色
-        draw.ellipse([(0, 0), (size, size)], fill=circle_color)
-        
-        # 在中心绘制文字 'D'
-        font_size = int(size * 0.6)
-        try:
-            # 尝试使用系统字体
-            font = ImageFont.truetype("Arial Bold", font_size)
-        except IOError:
-            # 如果无法加载特定字体，使用默认字体
-            font = ImageFont.load_default()
-        
-        text = "D"
-        text_color = (255, 255, 255)  # 白色
-        
-        # 计算文本位置以使其居中
-        text_width, text_height = draw.textbbox((0, 0), text, font=font)[2:4]
-        position = ((size - text_width) // 2, (size - text_height) // 2 - int(size * 0.05))
-        
-        # 绘制文字
-        draw.text(position, text, font=font, fill=text_color)
+        img = master if size == MASTER_SIZE else master.resize((size, size), Image.LANCZOS)
+        images[size] = img
         
         # 保存为PNG
-        if not os.path.exists('icons'):
-            os.makedirs('icons')
         img.save(f'icons/icon_{size}.png')
     
     # 创建.ico文件（用于Windows）
-    icons = []
-    for size in sizes:
-        icon_path = f'icons/icon_{size}.png'
-        if os.path.exists(icon_path):
-            icons.append(Image.open(icon_path))
+    icons = list(images.values())
     
     if icons:
         # 确保图标按尺寸排序（从小到大）
@@ -75,12 +80,9 @@ def create_icon():
             512: 'icon_256x256@2x.png',  # 也可以是 icon_512x512.png
         }
         
-        for size in sizes:
-            icon_path = f'icons/icon_{size}.png'
-            if os.path.exists(icon_path) and size in name_map:
+        for size, img in images.items():
+            if size in name_map:
                 output_path = f'icons/icon.iconset/{name_map[size]}'
-                # 复制文件
-                img = Image.open(icon_path)
                 img.save(output_path)
         
         # 使用iconutil创建.icns文件
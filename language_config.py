@@ -9,7 +9,9 @@ This module provides multilingual support for the Domain Finder tool
 作者/Author: Alan
 """
 
+import functools
 import os
+import sys
 
 # 支持的语言 / Supported languages
 SUPPORTED_LANGUAGES = ["zh", "en"]
@@ -25,6 +27,21 @@ def get_language():
         return DEFAULT_LANGUAGE
     return lang
 
+@functools.lru_cache(maxsize=1)
+def _cached_language():
+    """缓存的当前语言，只在首次调用或set_language之后读取环境变量 / Cached current language"""
+    return get_language()
+
+def set_language(lang):
+    """
+    切换当前语言 / Switch current language
+    
+    Args:
+        lang: 语言代码 / Language code (zh/en)
+    """
+    os.environ["DOMAIN_FINDER_LANG"] = lang
+    _cached_language.cache_clear()
+
 # 通用文本 / Common text
 _TEXT = {
     "zh": {
@@ -108,30 +125,37 @@ _TEXT = {
     }
 }
 
+class _LanguageTables(dict):
+    """语言 -> 文本表，不支持的语言回退到默认语言 / Unsupported languages fall back to the default"""
+    
+    def __missing__(self, lang):
+        return self[DEFAULT_LANGUAGE]
+
+# 预先构建的各语言文本表，键已intern，一次字典查询即可取得文本
+# Prebuilt per-language tables with interned keys, so each lookup is a single dict access
+_TABLES = _LanguageTables({
+    sys.intern(lang): {sys.intern(key): text for key, text in texts.items()}
+    for lang, texts in _TEXT.items()
+})
+
 def get_text(key, lang=None):
     """
     获取指定键的文本 / Get text for a specific key
     
     Args:
         key: 文本键 / Text key
-        lang: 语言代码 / Language code (zh/en)
+        lang: 语言代码 / Language code (zh/en)，不支持的语言使用默认中文
     
     Returns:
-        str: 对应的文本 / Corresponding text
+        str: 对应的文本，不存在时返回键名 / Corresponding text, or the key if not found
     """
-    lang = lang or get_language()
-    
-    # 确保使用支持的语言 / Ensure using a supported language
-    if lang not in SUPPORTED_LANGUAGES:
-        lang = DEFAULT_LANGUAGE
-    
-    # 返回请求的文本，如果不存在则返回键名 / Return requested text, or key if not found
-    return _TEXT.get(lang, {}).get(key, key)
+    return _TABLES[lang or _cached_language()].get(key, key)
 
 # 便于导入的函数和变量
 __all__ = [
     'get_language',
     'get_text',
+    'set_language',
     'SUPPORTED_LANGUAGES',
     'DEFAULT_LANGUAGE'
 ]
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+速率限制模块 - 线程安全的令牌桶
+
+令牌按固定速率补充，桶满后不再增加；每次请求消耗一个令牌，
+令牌不足时可以立即放弃（try_acquire）或等待补充（acquire）。
+AdaptiveRateLimiter在此基础上根据观察到的请求延迟自动升降速率。
+
+此模块可以独立使用，也可以集成到域名查找工具中。
+"""
+
+import asyncio
+import threading
+import time
+
+class TokenBucket:
+    """
+    线程安全的令牌桶
+
+        bucket = TokenBucket.per_interval(11)  # 每11秒一次
+        bucket.acquire()  # 令牌不足时阻塞等待
+        await bucket.acquire_async()  # 在事件循环中异步等待
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        初始化令牌桶（初始为满）
+
+        Args:
+            rate: 每秒补充的令牌数
+            capacity: 桶容量，即允许的最大突发请求数
+        """
+        if rate <= 0:
+            raise ValueError("rate必须大于0")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_interval(cls, interval: float, capacity: float = 1.0) -> 'TokenBucket':
+        """创建每interval秒补充一个令牌的令牌桶"""
+        return cls(1.0 / interval, capacity)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """
+        尝试取出令牌，不等待
+
+        Returns:
+            bool: 是否取到令牌
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """距离有足够令牌还需等待的秒数"""
+        with self._lock:
+            self._refill()
+            return max(0.0, (tokens - self._tokens) / self.rate)
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """取出令牌，令牌不足时阻塞等待"""
+        while True:
+            delay = self._take_or_delay(tokens)
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+    def _take_or_delay(self, tokens: float) -> float:
+        """令牌足够时取出并返回0，否则返回还需等待的秒数"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    async def acquire_async(self, tokens: float = 1.0) -> None:
+        """取出令牌，令牌不足时异步等待（不阻塞事件循环）"""
+        while True:
+            delay = self._take_or_delay(tokens)
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+class AdaptiveRateLimiter(TokenBucket):
+    """
+    根据请求延迟自动调整速率的令牌桶
+
+    连续slow_samples次请求的延迟超过slow_latency（或失败）时速率减半，
+    连续grow_after次请求都较快时速率提高10%，速率限制在[min_rate, max_rate]之间。
+
+        limiter = AdaptiveRateLimiter(200)
+        await limiter.acquire_async()
+        ...  # 发出请求
+        limiter.record(latency, ok)
+
+    异步等待时按顺序预约令牌（令牌数可以为负），每个等待者只需睡眠一次，
+    大量协程同时等待时不会反复被唤醒争抢同一个令牌。
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0,
+                 min_rate: float = 1.0, max_rate: float = None,
+                 slow_latency: float = 0.2, slow_samples: int = 5,
+                 grow_after: int = 100, growth: float = 1.1):
+        """
+        初始化自适应令牌桶
+
+        Args:
+            rate: 初始速率（每秒请求数）
+            capacity: 桶容量，即允许的最大突发请求数
+            min_rate: 速率下限
+            max_rate: 速率上限，默认为初始速率的10倍
+            slow_latency: 判定为慢请求的延迟（秒）
+            slow_samples: 连续多少次慢请求后减速
+            grow_after: 连续多少次快请求后加速
+            growth: 每次加速的倍数
+        """
+        super().__init__(rate, capacity)
+        self.min_rate = min(min_rate, rate)
+        self.max_rate = max_rate if max_rate is not None else rate * 10
+        self.slow_latency = slow_latency
+        self.slow_samples = slow_samples
+        self.grow_after = grow_after
+        self.growth = growth
+        self._slow = 0
+        self._fast = 0
+
+    def record(self, latency: float, ok: bool = True) -> None:
+        """
+        记录一次请求的结果，必要时调整速率
+
+        Args:
+            latency: 请求耗时（秒）
+            ok: 请求是否得到应答（超时等错误视为慢请求）
+        """
+        with self._lock:
+            if ok and latency <= self.slow_latency:
+                self._slow = 0
+                self._fast += 1
+                if self._fast >= self.grow_after:
+                    self._fast = 0
+                    self._set_rate(min(self.max_rate, self.rate * self.growth))
+            else:
+                self._fast = 0
+                self._slow += 1
+                if self._slow >= self.slow_samples:
+                    self._slow = 0
+                    self._set_rate(max(self.min_rate, self.rate / 2))
+
+    def _set_rate(self, rate: float) -> None:
+        # 先按旧速率补充到当前时刻，之后按新速率补充
+        self._refill()
+        self.rate = rate
+
+    async def acquire_async(self, tokens: float = 1.0) -> None:
+        """预约令牌并异步等待到预约的时刻"""
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay > 0:
+            await asyncio.sleep(delay)
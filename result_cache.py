@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+检查结果缓存模块 - 基于SQLite的跨运行结果缓存
+
+按(域名, 检查来源)缓存DNS/API检查结果，重复检查同一域名时直接返回，
+避免重复的网络请求。普通结果在TTL到期后失效，已注册的结果永久有效。
+写入由单个后台线程批量完成，检查线程只需把结果放入队列。
+
+此模块可以独立使用，也可以集成到域名查找工具中。
+"""
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+# 缓存参数
+DEFAULT_CACHE_FILE = 'domain_cache.db'
+DEFAULT_TTL = 24 * 3600  # 普通结果的有效期（秒）
+WRITE_BATCH = 500        # 后台线程每个事务最多写入的结果数
+
+class ResultCache:
+    """
+    域名检查结果缓存
+
+    线程安全，可在多个检查线程间共享。set()只把结果放入写入队列，
+    由后台线程用executemany批量写入；尚未落盘的结果同样可以查到：
+
+        cache = ResultCache('domain_cache.db')
+        hit = cache.get('abc.com', 'dns')
+        if hit is None:
+            cache.set('abc.com', 'dns', True, None, permanent=True)
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_FILE, ttl: float = DEFAULT_TTL):
+        """
+        初始化缓存
+
+        Args:
+            path: SQLite数据库文件路径，':memory:'表示仅在内存中缓存
+            ttl: 普通结果的有效期（秒）
+        """
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._pending = {}  # 已入队但尚未写入数据库的结果 {(域名, 来源): 行}
+        self._queue = queue.Queue()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " domain TEXT NOT NULL,"
+            " provider TEXT NOT NULL,"
+            " result INTEGER,"
+            " note TEXT,"
+            " expires_at REAL,"
+            " PRIMARY KEY (domain, provider))"
+        )
+        self._conn.commit()
+        self._writer = threading.Thread(target=self._write_loop, name='result-cache-writer', daemon=True)
+        self._writer.start()
+
+    def get(self, domain: str, provider: str) -> Optional[Tuple[Optional[bool], Optional[str]]]:
+        """
+        查询缓存的检查结果
+
+        Args:
+            domain: 域名
+            provider: 检查来源，如'dns'、'porkbun'
+
+        Returns:
+            (检查结果, 备注)，未命中或已过期时返回None
+        """
+        key = (domain, provider.lower())
+        with self._lock:
+            row = self._pending.get(key)
+            if row is not None:
+                row = row[2:]
+            else:
+                row = self._conn.execute(
+                    "SELECT result, note, expires_at FROM results WHERE domain = ? AND provider = ?",
+                    key).fetchone()
+        if row is None:
+            return None
+
+        result, note, expires_at = row
+        if expires_at is not None and expires_at < time.time():
+            return None
+        return (None if result is None else bool(result)), note
+
+    def set(self, domain: str, provider: str, result: Optional[bool],
+            note: Optional[str], permanent: bool = False, ttl: Optional[float] = None) -> None:
+        """
+        写入检查结果
+
+        Args:
+            domain: 域名
+            provider: 检查来源，如'dns'、'porkbun'
+            result: 检查结果
+            note: 备注信息
+            permanent: 是否永不过期（用于已注册的结果）
+            ttl: 本条结果的有效期（秒），默认使用缓存的ttl
+        """
+        expires_at = None if permanent else time.time() + (self.ttl if ttl is None else ttl)
+        row = (domain, provider.lower(), None if result is None else int(result), note, expires_at)
+        with self._lock:
+            self._pending[row[:2]] = row
+        self._queue.put(row)
+
+    def flush(self) -> None:
+        """等待队列中的结果全部写入数据库"""
+        self._queue.join()
+
+    def close(self) -> None:
+        """写入剩余结果并关闭数据库"""
+        if not self._writer.is_alive():
+            return
+        self._queue.put(None)
+        self._writer.join()
+        with self._lock:
+            self._conn.close()
+
+    def _write_loop(self) -> None:
+        """后台写入线程：取出队列中已有的结果，合并为一个事务写入"""
+        while True:
+            rows = [self._queue.get()]
+            while len(rows) < WRITE_BATCH:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in rows
+            rows = [row for row in rows if row is not None]
+            if rows:
+                self._write(rows)
+            for _ in range(len(rows) + stop):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, rows) -> None:
+        with self._lock:
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO results (domain, provider, result, note, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?)", rows)
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"写入结果缓存出错: {str(e)}")
+            for row in rows:
+                # 写入期间同一键可能已有更新的结果入队，只移除已写入的那一行
+                if self._pending.get(row[:2]) is row:
+                    del self._pending[row[:2]]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
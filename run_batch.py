@@ -11,38 +11,47 @@ import sys
 import platform
 import subprocess
 import time
-import datetime
-import csv
 import argparse
 import itertools
 import string
 
+from rate_limiter import TokenBucket
+from batch_common import (BatchTimeout, ProgressWriter, format_timestamp, get_domain_counts,
+                          run_in_process, run_subprocess)
+
 # 设置环境变量跳过系统版本检查
 os.environ['SYSTEM_VERSION_COMPAT'] = '1'
 
 def log(message):
     """记录日志"""
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    timestamp = format_timestamp()
     print(f"[{timestamp}] {message}")
 
-def run_domain_checker(args, timeout=None):
-    """运行域名检查器"""
-    cmd = [sys.executable, 'domain_finder.py'] + args
-    log(f"执行命令: {' '.join(cmd)}")
+def run_domain_checker(args, timeout=None, words=None):
+    """
+    运行域名检查器（优先在当前进程中运行，无法进程内运行时启动子进程）
     
+    words不为None时配合--wordlist -使用：进程内直接传入列表，子进程则通过标准输入传入。
+    """
     try:
-        # 使用超时参数，避免某些检查卡住
-        process = subprocess.run(cmd, timeout=timeout, check=False)
+        log(f"执行域名检查: {' '.join(args)}")
+        returncode = run_in_process(args, timeout, words)
+        if returncode is None:
+            cmd = [sys.executable, 'domain_finder.py'] + args
+            log(f"执行命令: {' '.join(cmd)}")
+            payload = "\n".join(words) if words is not None else None
+            # 使用超时参数，避免某些检查卡住；超时后先让子进程保存进度
+            returncode = run_subprocess(cmd, timeout=timeout, input=payload, log=log)
         
-        if process.returncode != 0:
-            log(f"域名检查器异常退出，返回码: {process.returncode}")
+        if returncode != 0:
+            log(f"域名检查器异常退出，返回码: {returncode}")
             return False
         else:
             log("域名检查器已完成运行")
             return True
             
-    except subprocess.TimeoutExpired:
-        log(f"命令执行超时（{timeout}秒），强制终止")
+    except (subprocess.TimeoutExpired, BatchTimeout):
+        log(f"命令执行超时（{timeout}秒），已终止")
         return False
     except KeyboardInterrupt:
         log("用户中断操作...")
@@ -51,41 +60,14 @@ def run_domain_checker(args, timeout=None):
         log(f"执行域名检查器时出错: {str(e)}")
         return False
 
-def get_domain_counts():
-    """获取当前已检查和可用域名数量"""
-    checked_count = 0
-    available_count = 0
-    
-    try:
-        if os.path.exists('checked_domains.csv'):
-            with open('checked_domains.csv', 'r') as f:
-                checked_count = sum(1 for _ in f)
-    except:
-        pass
-        
-    try:
-        if os.path.exists('available_domains.csv'):
-            with open('available_domains.csv', 'r') as f:
-                available_count = sum(1 for _ in f)
-    except:
-        pass
-        
-    return checked_count, available_count
+# 批次进度文件，保持打开并缓冲写入，程序退出时刷新
+_progress_writer = ProgressWriter('batch_progress.csv', [
+    'timestamp', 'batch_type', 'length', 'limit', 'success',
+    'checked_count', 'available_count', 'duration'])
 
-def save_batch_progress(batch_info):
-    """保存批次进度到CSV文件"""
-    fieldnames = ['timestamp', 'batch_type', 'length', 'limit', 'success', 
-                  'checked_count', 'available_count', 'duration']
-    
-    file_exists = os.path.exists('batch_progress.csv')
-    
-    with open('batch_progress.csv', 'a', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        
-        if not file_exists:
-            writer.writeheader()
-            
-        writer.writerow(batch_info)
+def record_batch(batch_start, success, **fields):
+    """记录批次结果到进度文件，返回(已检查域名数, 可用域名数, 耗时)"""
+    return _progress_writer.record(batch_start, success, **fields)
 
 def run_auto_batch():
     """运行自动批量检查"""
@@ -102,8 +84,11 @@ def run_auto_batch():
     lengths = [3, 4, 5]
     batches = [100, 200, 500]
     
+    pacer = TokenBucket.per_interval(10)
     for length in lengths:
         for batch in batches:
+            # 相邻批次的开始时间至少相隔10秒，避免请求过于频繁；批次本身超过该间隔时不再等待
+            pacer.acquire()
             batch_start = time.time()
             
             log(f"--------------------------------------------------")
@@ -117,31 +102,14 @@ def run_auto_batch():
             ], timeout=600)  # 10分钟超时
             
             # 记录批次信息
-            checked, available = get_domain_counts()
-            duration = time.time() - batch_start
-            
-            batch_info = {
-                'timestamp': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'batch_type': 'basic',
-                'length': length,
-                'limit': batch,
-                'success': success,
-                'checked_count': checked,
-                'available_count': available,
-                'duration': round(duration, 2)
-            }
-            
-            save_batch_progress(batch_info)
+            checked, available, duration = record_batch(
+                batch_start, success, batch_type='basic', length=length, limit=batch)
             
             log(f"批次完成: 已检查 {checked} 个域名，发现 {available} 个可用域名")
             log(f"耗时: {round(duration, 2)}秒")
             
             if not success:
                 log("该批次检查失败，将继续下一个批次")
-            
-            # 每次检查后暂停几秒，避免请求过于频繁
-            log("暂停10秒...")
-            time.sleep(10)
     
     # 3. 进行API验证检查
     log("--------------------------------------------------")
@@ -151,21 +119,8 @@ def run_auto_batch():
     api_success = run_domain_checker(['--only-verify-api', '--api-workers', '1'], timeout=3600)  # 1小时超时
     
     # 记录API验证批次信息
-    checked, available = get_domain_counts()
-    duration = time.time() - batch_start
-    
-    batch_info = {
-        'timestamp': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        'batch_type': 'api_verify',
-        'length': 'all',
-        'limit': 'all',
-        'success': api_success,
-        'checked_count': checked,
-        'available_count': available,
-        'duration': round(duration, 2)
-    }
-    
-    save_batch_progress(batch_info)
+    checked, available, duration = record_batch(
+        batch_start, api_success, batch_type='api_verify', length='all', limit='all')
     
     # 4. 汇总结果
     final_checked, final_available = get_domain_counts()
@@ -179,17 +134,18 @@ def run_auto_batch():
     log("--------------------------------------------------")
     
     # 5. 显示可用域名列表（如果数量不太多的话）
+    # 行数直接用上面增量统计的结果，只有需要显示时才读取文件内容
     if os.path.exists('available_domains.csv'):
         try:
-            with open('available_domains.csv', 'r') as f:
-                domains = f.readlines()
-                
-            if len(domains) < 100:  # 只有当数量不多时才全部显示
+            if final_available < 100:  # 只有当数量不多时才全部显示
+                # 最多读取100行，统计之后文件又有追加时也不会读入整个文件
+                with open('available_domains.csv', 'r', encoding='utf-8', errors='replace') as f:
+                    domains = list(itertools.islice(f, 100))
                 log("可用域名列表:")
                 for domain in domains:
                     log(f"  {domain.strip()}")
             else:
-                log(f"可用域名过多 ({len(domains)}个)，请直接查看available_domains.csv文件")
+                log(f"可用域名过多 ({final_available}个)，请直接查看available_domains.csv文件")
         except Exception as e:
             log(f"读取域名文件时出错: {str(e)}")
     
@@ -204,7 +160,10 @@ def run_custom_patterns(patterns, limit_per_pattern=50):
     
     total_patterns = len(patterns)
     
+    pacer = TokenBucket.per_interval(5)
     for i, pattern in enumerate(patterns, 1):
+        # 与上一批次的开始时间至少相隔5秒
+        pacer.acquire()
         batch_start = time.time()
         
         log(f"--------------------------------------------------")
@@ -218,28 +177,11 @@ def run_custom_patterns(patterns, limit_per_pattern=50):
         ], timeout=300)  # 5分钟超时
         
         # 记录批次信息
-        checked, available = get_domain_counts()
-        duration = time.time() - batch_start
-        
-        batch_info = {
-            'timestamp': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'batch_type': 'pattern',
-            'length': len(pattern),
-            'limit': limit_per_pattern,
-            'success': success,
-            'checked_count': checked,
-            'available_count': available,
-            'duration': round(duration, 2)
-        }
-        
-        save_batch_progress(batch_info)
+        checked, available, duration = record_batch(
+            batch_start, success, batch_type='pattern', length=len(pattern), limit=limit_per_pattern)
         
         log(f"模式完成: 已检查 {checked} 个域名，发现 {available} 个可用域名")
         log(f"耗时: {round(duration, 2)}秒")
-        
-        # 每次检查后暂停，避免过快请求
-        log("暂停5秒...")
-        time.sleep(5)
     
     # 可能需要进行API验证
     log("--------------------------------------------------")
@@ -288,7 +230,10 @@ def run_letter_combinations(length=4, batch_size=100, verify_api=True, include_d
     batch_count = 10  # 分成10个批次
     batch_size_actual = batch_size  # 每批次处理的域名数量
     
+    pacer = TokenBucket.per_interval(10)
     for batch_idx in range(batch_count):
+        # 与上一批次的开始时间至少相隔10秒
+        pacer.acquire()
         batch_start = time.time()
         
         log(f"--------------------------------------------------")
@@ -311,28 +256,11 @@ def run_letter_combinations(length=4, batch_size=100, verify_api=True, include_d
         success = run_domain_checker(cmd_args, timeout=600)  # 10分钟超时
         
         # 记录批次信息
-        checked, available = get_domain_counts()
-        duration = time.time() - batch_start
-        
-        batch_info = {
-            'timestamp': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'batch_type': 'combination',
-            'length': length,
-            'limit': batch_size_actual,
-            'success': success,
-            'checked_count': checked,
-            'available_count': available,
-            'duration': round(duration, 2)
-        }
-        
-        save_batch_progress(batch_info)
+        checked, available, duration = record_batch(
+            batch_start, success, batch_type='combination', length=length, limit=batch_size_actual)
         
         log(f"批次完成: 已检查 {checked} 个域名，发现 {available} 个可用域名")
         log(f"耗时: {round(duration, 2)}秒")
-        
-        # 每次检查后暂停，防止过快请求
-        log("暂停10秒...")
-        time.sleep(10)
     
     # 最终汇总
     final_checked, final_available = get_domain_counts()
@@ -369,59 +297,34 @@ def run_dictionary_check(dict_file, batch_size=50, verify_api=True):
         # 按批次处理
         batch_count = (total_words + batch_size - 1) // batch_size
         
+        pacer = TokenBucket.per_interval(10)
         for i in range(batch_count):
+            # 与上一批次的开始时间至少相隔10秒
+            pacer.acquire()
             batch_start = time.time()
             start_idx = i * batch_size
             end_idx = min((i + 1) * batch_size, total_words)
             
-            # 创建临时批次文件
-            batch_file = f"temp_batch_{i}.txt"
-            with open(batch_file, 'w') as f:
-                for word in words[start_idx:end_idx]:
-                    f.write(word + "\n")
-            
             log(f"--------------------------------------------------")
             log(f"正在检查批次 [{i+1}/{batch_count}]: 单词 {start_idx+1}-{end_idx}")
             
-            # 构建命令参数
-            cmd_args = ['--wordlist', batch_file, '--threads', '50']
+            # 构建命令参数，本批单词直接传入，不再写临时文件
+            cmd_args = ['--wordlist', '-', '--threads', '50']
             
             # 如果需要，添加API验证
             if verify_api:
                 cmd_args.append('--verify-api')
                 
             # 执行检查
-            success = run_domain_checker(cmd_args, timeout=600)  # 10分钟超时
-            
-            # 删除临时文件
-            try:
-                os.remove(batch_file)
-            except:
-                pass
+            success = run_domain_checker(cmd_args, timeout=600,  # 10分钟超时
+                                         words=words[start_idx:end_idx])
             
             # 记录批次信息
-            checked, available = get_domain_counts()
-            duration = time.time() - batch_start
-            
-            batch_info = {
-                'timestamp': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'batch_type': 'dictionary',
-                'length': 'varied',
-                'limit': end_idx - start_idx,
-                'success': success,
-                'checked_count': checked,
-                'available_count': available,
-                'duration': round(duration, 2)
-            }
-            
-            save_batch_progress(batch_info)
+            checked, available, duration = record_batch(
+                batch_start, success, batch_type='dictionary', length='varied', limit=end_idx - start_idx)
             
             log(f"批次完成: 已检查 {checked} 个域名，发现 {available} 个可用域名")
             log(f"耗时: {round(duration, 2)}秒")
-            
-            # 每次检查后暂停
-            log("暂停10秒...")
-            time.sleep(10)
     
     except Exception as e:
         log(f"字典检查过程中出错: {str(e)}")
@@ -11,141 +11,365 @@ import platform
 import subprocess
 import time
 import datetime
-import csv
 import itertools
+import functools
 import signal
 import atexit
 import string
 import argparse
+import json
+import asyncio
+from pathlib import Path
+
+import domain_finder
+from rate_limiter import TokenBucket
+from batch_common import (TERMINATE_GRACE, BatchTimeout, ProgressWriter, format_timestamp,
+                          get_domain_counts, run_in_process, run_subprocess)
 
 # 设置环境变量跳过系统版本检查
 os.environ['SYSTEM_VERSION_COMPAT'] = '1'
 
+# 日志文件及其写缓冲区大小
+LOG_FILE = 'full_scan.log'
+LOG_BUFFER_SIZE = 1 << 15
+
+_log_file = None
+# 新日志的表头，第一次写日志时才清空旧日志并写入
+_log_header = None
+
+def start_new_log(header):
+    """
+    开始新的日志文件
+    
+    旧日志不会立即清空，而是等到第一次写日志时再以清空模式打开并写入表头，
+    之后保持打开，日志写入缓冲区，程序退出时刷新并关闭。
+    
+    Args:
+        header: 日志表头
+    """
+    global _log_header
+    close_log_file()
+    _log_header = header
+
+def _get_log_file():
+    """返回打开的日志文件，首次使用时打开"""
+    global _log_file, _log_header
+    if _log_file is None:
+        mode = 'a' if _log_header is None else 'w'
+        _log_file = open(LOG_FILE, mode, encoding='utf-8', buffering=LOG_BUFFER_SIZE)
+        if _log_header is not None:
+            _log_file.write(_log_header)
+            _log_header = None
+    return _log_file
+
+def close_log_file():
+    """刷新并关闭日志文件"""
+    global _log_file
+    if _log_file is not None:
+        _log_file.close()
+        _log_file = None
+
+atexit.register(close_log_file)
+
 def log(message):
     """记录日志"""
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] {message}")
-    # 同时写入日志文件
-    with open('full_scan.log', 'a', encoding='utf-8') as f:
-        f.write(f"[{timestamp}] {message}\n")
+    timestamp = format_timestamp()
+    line = f"[{timestamp}] {message}\n"
+    sys.stdout.write(line)
+    # 同时写入日志文件（复用打开的文件句柄，不再每条日志打开关闭一次）
+    _get_log_file().write(line)
 
 def run_domain_checker(args, timeout=None):
-    """运行域名检查器"""
-    cmd = [sys.executable, 'domain_finder.py'] + args
-    log(f"执行命令: {' '.join(cmd)}")
-    
+    """运行域名检查器（优先在当前进程中运行，无法进程内运行时启动子进程）"""
     try:
-        # 使用超时参数，避免某些检查卡住
-        process = subprocess.run(cmd, timeout=timeout, check=False)
+        log(f"执行域名检查: {' '.join(args)}")
+        # 脚本把SIGINT处理为sys.exit(0)，进程内运行期间临时恢复默认处理，
+        # 使Ctrl+C以KeyboardInterrupt中断检查：domain_finder先保存已完成的结果，再结束整个扫描
+        returncode = run_in_process(args, timeout, interruptible=True)
+        if returncode is None:
+            cmd = [sys.executable, 'domain_finder.py'] + args
+            log(f"执行命令: {' '.join(cmd)}")
+            # 使用超时参数，避免某些检查卡住；超时后先让子进程保存进度
+            returncode = run_subprocess(cmd, timeout=timeout, log=log)
         
-        if process.returncode != 0:
-            log(f"域名检查器异常退出，返回码: {process.returncode}")
+        if returncode != 0:
+            log(f"域名检查器异常退出，返回码: {returncode}")
             return False
         else:
             log("域名检查器已完成运行")
             return True
             
-    except subprocess.TimeoutExpired:
-        log(f"命令执行超时（{timeout}秒），强制终止")
+    except (subprocess.TimeoutExpired, BatchTimeout):
+        log(f"命令执行超时（{timeout}秒），已终止")
         return False
     except KeyboardInterrupt:
+        # 不把被中断的前缀记为完成，交给main结束扫描
         log("用户中断操作...")
-        return False
+        raise
     except Exception as e:
         log(f"执行域名检查器时出错: {str(e)}")
         return False
 
-def get_domain_counts():
-    """获取当前已检查和可用域名数量"""
-    checked_count = 0
-    available_count = 0
-    
-    try:
-        if os.path.exists('checked_domains.csv'):
-            with open('checked_domains.csv', 'r') as f:
-                checked_count = sum(1 for _ in f)
-    except:
-        pass
-        
-    try:
-        if os.path.exists('available_domains.csv'):
-            with open('available_domains.csv', 'r') as f:
-                available_count = sum(1 for _ in f)
-    except:
-        pass
-        
-    return checked_count, available_count
+# 全面扫描的域名长度
+SCAN_LENGTH = 4
 
-def save_batch_progress(batch_info):
-    """保存批次进度到CSV文件"""
-    fieldnames = ['timestamp', 'prefix', 'success', 
-                  'checked_count', 'available_count', 'duration']
-    
-    file_exists = os.path.exists('full_scan_progress.csv')
-    
-    with open('full_scan_progress.csv', 'a', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        
-        if not file_exists:
-            writer.writeheader()
-            
-        writer.writerow(batch_info)
+# 主已检查域名文件，以及并发扫描时子进程各自使用的分片文件目录
+CHECKED_FILE = 'checked_domains.csv'
+PARTS_DIR = 'scan_parts'
+
+# 各前缀的历史产出率（可用域名数/检查域名数），用于调整默认前缀的扫描顺序
+PREFIX_YIELD_FILE = 'prefix_yield.json'
+# 更新产出率时新一次结果所占的权重（指数移动平均）
+YIELD_EMA_WEIGHT = 0.3
+
+# 批次进度文件，保持打开并缓冲写入，程序退出时刷新
+_progress_writer = ProgressWriter('full_scan_progress.csv', [
+    'timestamp', 'prefix', 'length', 'limit', 'success', 'checked_count', 'available_count', 'duration'])
+
+def record_batch(batch_start, success, **fields):
+    """记录批次结果到进度文件，返回(已检查域名数, 可用域名数, 耗时)"""
+    return _progress_writer.record(batch_start, success, **fields)
+
+def load_processed_prefixes(path, length, limit):
+    """
+    从进度文件中读取已按相同参数处理过的前缀
+    
+    进度文件由ProgressWriter写入，字段不含逗号和引号，因此直接按字节切分，
+    只取出需要的列，不经过csv模块逐行解析所有字段。
+    
+    Args:
+        path: 进度文件路径
+        length: 本次扫描的域名长度
+        limit: 本次扫描每个前缀的数量限制
+    
+    Returns:
+        (前缀, 长度, 限制)与本次参数相同的前缀集合；旧版本没有记录长度和限制的行视为相同
+    """
+    with open(path, 'rb') as f:
+        lines = f.read().splitlines()
+    if not lines:
+        return set()
+    header = lines[0].split(b',')
+    columns = [header.index(name) if name in header else None
+               for name in (b'prefix', b'length', b'limit')]
+    wanted = (str(length).encode(), str(limit).encode())
+    
+    processed = set()
+    for line in lines[1:]:
+        if not line:
+            continue
+        fields = line.split(b',')
+        key = [fields[i] if i is not None and i < len(fields) else b'' for i in columns]
+        if all(not value or value == want for value, want in zip(key[1:], wanted)):
+            processed.add(key[0].decode())
+    return processed
+
+# 进度条两次刷新之间的最小间隔（秒），最后一次总会显示
+PROGRESS_MIN_INTERVAL = 0.1
+
+_last_progress_time = 0.0
 
 def print_progress_bar(iteration, total, prefix='', suffix='', length=50, fill='█'):
-    """打印进度条"""
+    """打印进度条（刷新过于频繁时跳过中间的更新）"""
+    global _last_progress_time
+    now = time.monotonic()
+    if iteration != total and now - _last_progress_time < PROGRESS_MIN_INTERVAL:
+        return
+    _last_progress_time = now
+    
     percent = f"{100 * (iteration / float(total)):.1f}"
     filled_length = int(length * iteration // total)
     bar = fill * filled_length + '-' * (length - filled_length)
-    print(f'\r{prefix} |{bar}| {percent}% {suffix}', end='\r')
-    if iteration == total:
-        print()
+    end = '\n' if iteration == total else '\r'
+    sys.stdout.write(f'\r{prefix} |{bar}| {percent}% {suffix}{end}')
+    sys.stdout.flush()
+
+# 常见三字母前缀，如app, dev, etc
+COMMON_THREE_LETTER_PREFIXES = (
+    'app', 'dev', 'web', 'api', 'get', 'buy', 'top', 'pro', 'win', 'new',
+    'one', 'our', 'you', 'the', 'all', 'use', 'try', 'pay', 'vip', 'max',
+    'hot', 'now', 'job', 'net', 'ipi', 'car', 'eco', 'map', 'air', 'led',
+    'pen', 'key', 'fly', 'box', 'fun', 'fit', 'lab', 'gym', 'pet', 'red',
+    'tax', 'bet', 'bio', 'diy', 'art', 'toy', 'aid', 'run', 'zen', 'vr'
+)
 
+@functools.lru_cache(maxsize=1)
 def generate_prefixes():
-    """生成所有可能的1-3字母前缀，确保全面覆盖所有4字母域名"""
-    prefixes = []
-    
+    """生成所有可能的1-3字母前缀，确保全面覆盖所有4字母域名（结果缓存为元组）"""
     # 按字母频率排序（常用字母优先）
     common_first = 'etaoinsrhdlucmfywgpbvkjxqz'
     
     # 方法1: 单字母前缀（覆盖所有a???、b???等模式）
-    for c in common_first:
-        prefixes.append(c)
+    single = list(common_first)
     
     # 方法2: 对特定常用字母生成两字母前缀，增加命中率
     common_second = common_first[:10]  # 取最常见的10个字母
-    for c1 in common_second:
-        for c2 in common_second:
-            prefixes.append(c1 + c2)
+    two = [''.join(p) for p in itertools.product(common_second, repeat=2)]
     
-    # 方法3: 对排名靠后的字母生成两字母组合，确保完整性
+    # 方法3: 对排名靠后的字母生成两字母组合（以a、e、i、t开头），确保完整性
     uncommon = common_first[10:]
-    for c in uncommon:
-        prefixes.append('a' + c)  # 添加以'a'开头的组合
-        prefixes.append('e' + c)  # 添加以'e'开头的组合
-        prefixes.append('i' + c)  # 添加以'i'开头的组合
-        prefixes.append('t' + c)  # 添加以't'开头的组合
+    uncommon_two = [v + c for c in uncommon for v in 'aeit']
     
     # 方法4: 添加一些特定的三字母前缀，用于更细化扫描
-    # 常见三字母前缀，如app, dev, etc
-    common_three_letter_prefixes = [
-        'app', 'dev', 'web', 'api', 'get', 'buy', 'top', 'pro', 'win', 'new',
-        'one', 'our', 'you', 'the', 'all', 'use', 'try', 'pay', 'vip', 'max',
-        'hot', 'now', 'job', 'net', 'ipi', 'car', 'eco', 'map', 'air', 'led',
-        'pen', 'key', 'fly', 'box', 'fun', 'fit', 'lab', 'gym', 'pet', 'red',
-        'tax', 'bet', 'bio', 'diy', 'art', 'toy', 'aid', 'run', 'zen', 'vr'
+    prefixes = single + two + uncommon_two + list(COMMON_THREE_LETTER_PREFIXES)
+    
+    # 根据实际频率调整前缀顺序，元音字母优先，其余保持原顺序，最后一次性去重
+    high_priority = [p for p in 'aeiou' if p in single]
+    return tuple(dict.fromkeys(high_priority + prefixes))
+
+def build_prefix_args(prefix, args):
+    """构建扫描单个前缀的domain_finder参数"""
+    cmd_args = [
+        '--letters',
+        '--length', str(SCAN_LENGTH),
+        '--prefix', prefix,
+        '--limit', str(args.limit),  # 使用用户指定的限制
+        '--threads', str(args.threads),
+        '--tld', '.com'
     ]
-    prefixes.extend(common_three_letter_prefixes)
     
-    # 根据实际频率调整前缀顺序，越可能有价值的前缀越靠前
-    high_priority = []
-    for prefix in ['a', 'e', 'i', 'o', 'u']:  # 元音字母优先
-        if prefix in prefixes:
-            high_priority.append(prefix)
-            prefixes.remove(prefix)
+    # 如果需要立即进行API验证
+    if args.verify_api:
+        cmd_args.append('--verify-api')
+        cmd_args.extend(['--api-workers', str(args.api_workers)])
+    return cmd_args
+
+def build_part_args(prefix, args):
+    """
+    构建扫描单个前缀的domain_finder参数，结果写入该前缀的分片文件
+    
+    主文件只作为排除来源，使检查跳过已检查的域名继续向后扫描。
+    
+    Returns:
+        (参数列表, 分片文件路径)
+    """
+    part_file = os.path.join(PARTS_DIR, f"checked_{prefix}.csv")
+    cmd_args = build_prefix_args(prefix, args) + [
+        '--check-file', part_file, '--exclude-file', CHECKED_FILE]
+    return cmd_args, part_file
+
+def merge_checked_part(part_file, merged, check_file=CHECKED_FILE):
+    """
+    把前缀的已检查域名分片追加到主文件，然后删除分片文件
+    
+    每个前缀写自己的分片文件，避免多个进程同时整体重写同一个主文件
+    而互相覆盖结果；合并时只追加主文件中还没有的域名，不重写主文件。
+    
+    Args:
+        part_file: 分片文件路径
+        merged: 主文件中已有的域名集合，原地加入新追加的域名
+        check_file: 主已检查域名文件
+    
+    Returns:
+        (分片中的域名数, 其中DNS检查可能可用的域名数)
+    """
+    if not os.path.exists(part_file):
+        return 0, 0
+    part_df, _ = domain_finder.load_checked_domains(part_file)
+    part_df = part_df.drop_duplicates('domain', keep='last')
+    new_rows = part_df[~part_df['domain'].isin(merged)]
+    domain_finder.append_checked_domains(new_rows, check_file)
+    merged.update(new_rows['domain'].tolist())
+    os.remove(part_file)
+    return len(part_df), int(part_df['available'].sum())
+
+async def run_prefixes_concurrently(prefixes, args, total, yields, merged):
+    """
+    同时运行多个前缀的扫描子进程
+    
+    最多args.concurrency个子进程同时运行，每个子进程使用独立的已检查域名分片文件，
+    完成后在锁内依次合并到主文件并记录进度。
+    
+    Args:
+        prefixes: 待扫描的前缀列表
+        args: 命令行参数
+        total: 本次需要处理的前缀总数（用于显示进度）
+        yields: 前缀产出率字典，每个前缀完成后更新
+        merged: 主文件中已有的域名集合，见merge_checked_part
+    """
+    semaphore = asyncio.Semaphore(args.concurrency)
+    lock = asyncio.Lock()
+    done = 0
+    
+    async def scan(prefix):
+        nonlocal done
+        async with semaphore:
+            prefix_start_time = time.time()
+            cmd_args, part_file = build_part_args(prefix, args)
+            cmd = [sys.executable, 'domain_finder.py'] + cmd_args
+            log(f"开始处理前缀 '{prefix}'")
+            
+            proc = await asyncio.create_subprocess_exec(*cmd)
+            try:
+                returncode = await asyncio.wait_for(proc.wait(), timeout=args.timeout)
+            except asyncio.TimeoutError:
+                # 先发送SIGTERM让子进程保存进度，超过宽限时间仍未退出再强制终止
+                log(f"前缀 '{prefix}' 执行超时（{args.timeout}秒），通知子进程保存进度后退出")
+                proc.terminate()
+                try:
+                    returncode = await asyncio.wait_for(proc.wait(), timeout=TERMINATE_GRACE)
+                except asyncio.TimeoutError:
+                    log(f"前缀 '{prefix}' 的子进程{TERMINATE_GRACE}秒内未退出，强制终止")
+                    proc.kill()
+                    returncode = await proc.wait()
+            success = returncode == 0
+            if not success:
+                log(f"前缀 '{prefix}' 的域名检查器异常退出，返回码: {returncode}")
+            
+            async with lock:
+                part_checked, part_available = await asyncio.to_thread(merge_checked_part, part_file, merged)
+                record_prefix_yield(yields, prefix, part_checked, part_available)
+                checked, available, duration = record_batch(
+                    prefix_start_time, success, prefix=prefix, length=SCAN_LENGTH, limit=args.limit)
+                done += 1
+                log(f"前缀 '{prefix}' 完成 [{done}/{total}]: 已检查 {checked} 个域名，"
+                    f"发现 {available} 个可用域名，耗时: {round(duration, 2)}秒")
+                print_progress_bar(done, total, prefix='总进度:', suffix=f'完成 {done}/{total}')
+            
+            # 暂停在信号量内进行，与其他前缀的扫描重叠；扫描本身已超过pause秒时不再等待
+            await asyncio.sleep(max(0, args.pause - (time.time() - prefix_start_time)))
     
-    # 合并并去重
-    prefixes = high_priority + prefixes
-    return list(dict.fromkeys(prefixes))  # 去重
+    await asyncio.gather(*(scan(prefix) for prefix in prefixes))
+
+def load_prefix_yields(path=PREFIX_YIELD_FILE):
+    """读取各前缀的历史产出率，文件不存在或无法解析时返回空字典"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def record_prefix_yield(yields, prefix, checked, available, path=PREFIX_YIELD_FILE):
+    """
+    用本次扫描结果更新前缀的产出率并写回文件
+    
+    Args:
+        yields: load_prefix_yields返回的字典，原地更新
+        prefix: 前缀
+        checked: 本次新检查的域名数
+        available: 本次新发现的可用域名数
+        path: 产出率文件路径
+    """
+    if checked <= 0:
+        return
+    rate = available / checked
+    old = yields.get(prefix)
+    yields[prefix] = rate if old is None else (1 - YIELD_EMA_WEIGHT) * old + YIELD_EMA_WEIGHT * rate
+    
+    # 先写临时文件再替换，避免中断时留下不完整的文件
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(yields, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        log(f"无法保存前缀产出率: {str(e)}")
+
+def order_by_yield(prefixes, yields):
+    """按历史产出率从高到低排列前缀，没有记录的前缀保持原有的相对顺序"""
+    if not yields:
+        return prefixes
+    return sorted(prefixes, key=lambda p: -yields.get(p, 0.0))
 
 def run_full_scan(args):
     """运行完整的4字母域名扫描"""
@@ -159,6 +383,7 @@ def run_full_scan(args):
     log(f"初始状态：已检查域名 {initial_checked}，可用域名 {initial_available}")
     
     # 确定扫描的前缀
+    yields = load_prefix_yields()
     if args.prefix:
         # 用户指定了特定前缀
         prefixes = [args.prefix]
@@ -173,8 +398,8 @@ def run_full_scan(args):
             log(f"无法读取前缀文件: {str(e)}，将使用默认前缀")
             prefixes = generate_prefixes()
     else:
-        # 使用默认生成的前缀
-        prefixes = generate_prefixes()
+        # 使用默认生成的前缀，历史产出率高的前缀优先扫描
+        prefixes = order_by_yield(generate_prefixes(), yields)
     
     total_prefixes = len(prefixes)
     log(f"共有 {total_prefixes} 个前缀需要扫描")
@@ -185,10 +410,7 @@ def run_full_scan(args):
     # 如果有进度文件且不是重新开始，加载已处理的前缀
     if os.path.exists('full_scan_progress.csv') and not args.restart:
         try:
-            with open('full_scan_progress.csv', 'r') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    processed_prefixes.add(row['prefix'])
+            processed_prefixes = load_processed_prefixes('full_scan_progress.csv', SCAN_LENGTH, args.limit)
             log(f"从进度文件中加载了 {len(processed_prefixes)} 个已处理的前缀")
         except:
             log("无法读取进度文件，将从头开始扫描")
@@ -202,53 +424,46 @@ def run_full_scan(args):
     
     processed_count = 0
     
+    # 各前缀的结果先写入分片文件，完成后追加到主文件；主文件的域名集合只读取一次
+    os.makedirs(PARTS_DIR, exist_ok=True)
+    _, merged = domain_finder.load_checked_domains(CHECKED_FILE)
+    
+    # 并发扫描多个前缀
+    if args.concurrency > 1:
+        pending = [prefix for prefix in prefixes
+                   if args.force or prefix not in processed_prefixes]
+        asyncio.run(run_prefixes_concurrently(pending, args, total_prefixes_to_process, yields, merged))
+        prefixes = ()  # 已全部并发处理，跳过下面的逐个扫描
+    
     # 遍历所有前缀
+    pacer = TokenBucket.per_interval(args.pause) if args.pause > 0 else None
     for i, prefix in enumerate(prefixes, 1):
         # 如果已经处理过且不是强制模式，跳过
         if prefix in processed_prefixes and not args.force:
             continue
         
+        # 相邻前缀的开始时间至少相隔pause秒，前缀本身耗时超过该间隔时不再等待
+        if pacer is not None:
+            pacer.acquire()
         prefix_start_time = time.time()
         processed_count += 1
         
         log(f"--------------------------------------------------")
         log(f"正在处理前缀 [{processed_count}/{total_prefixes_to_process}]: '{prefix}'")
         
-        # 计算剩余长度
-        remaining_length = 4 - len(prefix)
-        
         # 构建命令参数
-        cmd_args = [
-            '--letters',
-            '--length', '4',
-            '--prefix', prefix,
-            '--limit', str(args.limit),  # 使用用户指定的限制
-            '--threads', str(args.threads),
-            '--tld', '.com'
-        ]
-        
-        # 如果需要立即进行API验证
-        if args.verify_api:
-            cmd_args.append('--verify-api')
-            cmd_args.extend(['--api-workers', str(args.api_workers)])
+        cmd_args, part_file = build_part_args(prefix, args)
         
-        # 执行检查
-        success = run_domain_checker(cmd_args, timeout=args.timeout)  # 用户指定的超时
-        
-        # 记录批次信息
-        checked, available = get_domain_counts()
-        duration = time.time() - prefix_start_time
-        
-        batch_info = {
-            'timestamp': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'prefix': prefix,
-            'success': success,
-            'checked_count': checked,
-            'available_count': available,
-            'duration': round(duration, 2)
-        }
+        # 执行检查，中断时也先把已保存到分片的结果合并到主文件
+        try:
+            success = run_domain_checker(cmd_args, timeout=args.timeout)  # 用户指定的超时
+        finally:
+            part_checked, part_available = merge_checked_part(part_file, merged)
         
-        save_batch_progress(batch_info)
+        # 记录批次信息，产出率与并发扫描相同，按分片中DNS检查可能可用的比例计算
+        record_prefix_yield(yields, prefix, part_checked, part_available)
+        checked, available, duration = record_batch(
+            prefix_start_time, success, prefix=prefix, length=SCAN_LENGTH, limit=args.limit)
         
         log(f"前缀完成: 已检查 {checked} 个域名，发现 {available} 个可用域名")
         log(f"耗时: {round(duration, 2)}秒")
@@ -264,10 +479,6 @@ def run_full_scan(args):
         # 打印总体进度
         print_progress_bar(processed_count, total_prefixes_to_process, 
                        prefix='总进度:', suffix=f'完成 {processed_count}/{total_prefixes_to_process}')
-        
-        # 每次检查后暂停，避免过快请求
-        log(f"暂停{args.pause}秒...")
-        time.sleep(args.pause)
     
     # 如果需要最后进行API验证
     if not args.verify_api and args.final_verify:
@@ -308,17 +519,15 @@ def export_results():
         return
     
     try:
-        # 读取可用域名
-        with open('available_domains.csv', 'r') as f:
-            domains = [line.strip() for line in f]
+        # 一次读入整个文件并在bytes上切分、排序，不为每行创建str对象
+        domains = [line.strip() for line in Path('available_domains.csv').read_bytes().splitlines()]
         
         # 按字母排序
         domains.sort()
         
-        # 写入排序后的结果文件
-        with open('sorted_available_domains.csv', 'w') as f:
-            for domain in domains:
-                f.write(f"{domain}\n")
+        # 写入排序后的结果文件（一次写入）
+        with open('sorted_available_domains.csv', 'wb') as f:
+            f.write(b"".join(domain + b"\n" for domain in domains))
         
         log(f"共找到 {len(domains)} 个可用域名，已排序并保存到 sorted_available_domains.csv")
         
@@ -326,20 +535,22 @@ def export_results():
         if len(domains) < 100:
             log("可用域名列表:")
             for domain in domains:
-                log(f"  {domain}")
+                log(f"  {domain.decode('utf-8', 'replace')}")
         
     except Exception as e:
         log(f"导出结果时出错: {str(e)}")
 
 def check_environment():
-    """检查运行环境"""
-    log(f"系统: {platform.system()} {platform.release()}")
-    log(f"Python版本: {platform.python_version()}")
-    log(f"处理器架构: {platform.machine()}")
+    """检查运行环境（只输出到终端，检查未通过时不改动上次的日志）"""
+    print(f"系统: {platform.system()} {platform.release()}")
+    print(f"Python版本: {platform.python_version()}")
+    print(f"处理器架构: {platform.machine()}")
     
     # 检查必要文件
-    if not os.path.exists('domain_finder.py'):
-        log("错误: 无法找到核心文件 domain_finder.py")
+    try:
+        os.stat('domain_finder.py')
+    except FileNotFoundError:
+        print("错误: 无法找到核心文件 domain_finder.py")
         return False
     
     return True
@@ -376,6 +587,7 @@ def parse_args():
     parser.add_argument('--threads', type=int, default=50, help='DNS检查的并发线程数 (默认: 50)')
     parser.add_argument('--timeout', type=int, default=1200, help='每个前缀的超时时间(秒) (默认: 1200)')
     parser.add_argument('--pause', type=int, default=5, help='每个前缀间的暂停时间(秒) (默认: 5)')
+    parser.add_argument('--concurrency', type=int, default=1, help='同时扫描的前缀数 (默认: 1，逐个扫描)')
     
     # API验证相关
     parser.add_argument('--verify-api', action='store_true', help='在DNS检查时直接进行API验证')
@@ -394,16 +606,7 @@ def main():
     args = parse_args()
     
     # 创建日志目录
-    if not os.path.exists('logs'):
-        os.makedirs('logs')
-    
-    # 初始化日志文件
-    log_file = f"logs/full_scan_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-    with open('full_scan.log', 'w') as f:
-        f.write(f"==== 四字母域名全面扫描 开始于 {datetime.datetime.now()} ====\n\n")
-    
-    # 设置信号处理
-    setup_signal_handlers()
+    os.makedirs('logs', exist_ok=True)
     
     print("=" * 80)
     print("  四字母域名全面扫描工具")
@@ -414,9 +617,16 @@ def main():
     print("=" * 80)
     
     if not check_environment():
-        log("环境检查未通过，程序无法运行")
+        print("环境检查未通过，程序无法运行")
         return 1
     
+    # 环境检查通过后才开始新日志（第一次写日志时清空旧日志）
+    log_file = f"logs/full_scan_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+    start_new_log(f"==== 四字母域名全面扫描 开始于 {datetime.datetime.now()} ====\n\n")
+    
+    # 设置信号处理
+    setup_signal_handlers()
+    
     try:
         # 运行全面扫描
         run_full_scan(args)
@@ -426,6 +636,7 @@ def main():
         log(f"扫描过程中出错: {str(e)}")
         import traceback
         log(traceback.format_exc())
+        _get_log_file().flush()
         return 1
     
     log("程序执行完毕")
@@ -11,34 +11,78 @@ import subprocess
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import threading
+import queue
+import codecs
+import logging
 import time
 import signal
 
 # 应用环境修补 - 必须在所有导入之前进行
 try:
     # 直接导入环境修补模块
-    from env_patch import disable_version_check
+    from env_patch import disable_version_check, patched_env
     # 确保版本检查被禁用
     disable_version_check()
     print("已应用环境修补")
 except ImportError:
     print("警告: 无法导入环境修补模块，某些功能可能不可用")
+    
+    def patched_env():
+        # 没有环境修补时子进程直接继承当前环境变量
+        return None
 
 # 跳过所有版本检查逻辑
 os.environ['SYSTEM_VERSION_COMPAT'] = '1'
 
+from batch_common import count_lines, map_file, run_in_process
+
 # 检查Python版本
 if sys.version_info < (3, 8):
     print("错误: 需要Python 3.8或更高版本")
     sys.exit(1)
 
+# 系统信息在启动时查询一次（需在环境修补之后），之后直接使用这些常量
+SYSTEM = platform.system()
+RELEASE = platform.release()
+MACHINE = platform.machine()
+MAC_VERSION = platform.mac_ver()[0]
+
 # 显示版本信息
-print(f"当前macOS版本: {platform.mac_ver()[0]}")
+print(f"当前macOS版本: {MAC_VERSION}")
 print(f"系统环境: {platform.platform()}")
 
+# 指定--subprocess时每次检查启动domain_finder.py子进程（便于调试），默认在界面进程内运行
+USE_SUBPROCESS = "--subprocess" in sys.argv[1:]
+
+# 子进程输出先放入队列，每隔该时间（毫秒）统一写入日志框一次
+LOG_FLUSH_INTERVAL_MS = 50
+# 关闭窗口时检查进程内运行的检查是否已停止的间隔（毫秒）
+STOP_POLL_INTERVAL_MS = 100
+# 每次从子进程输出管道读取的最大字节数
+PIPE_READ_SIZE = 1 << 16
+# 每次最多写入的日志行数，避免一次写入过多阻塞界面
+LOG_DRAIN_MAX = 500
+
+class _GUILogHandler(logging.Handler):
+    """把进程内运行的domain_finder的日志记录转交给界面的日志队列"""
+    
+    def __init__(self, queue_log):
+        super().__init__()
+        self.queue_log = queue_log
+        self.setFormatter(logging.Formatter('%(levelname)s - %(message)s'))
+    
+    def emit(self, record):
+        try:
+            self.queue_log(self.format(record), error=record.levelno >= logging.ERROR)
+        except Exception:
+            self.handleError(record)
+
 class SimpleDomainFinderGUI:
     """域名查找工具的简化GUI实现"""
     
+    # 域名类型对应的domain_finder参数
+    _TYPE_FLAG = {"letters": "--letters", "digits": "--digits", "mixed": "--alphanumeric"}
+    
     def __init__(self, root):
         """初始化GUI界面"""
         self.root = root
@@ -105,6 +149,7 @@ class SimpleDomainFinderGUI:
         self.log_text = scrolledtext.ScrolledText(log_frame, wrap=tk.WORD, height=15)
         self.log_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         self.log_text.config(state=tk.DISABLED)
+        self.log_text.tag_config("error", foreground="red")
         
         # 状态栏
         status_frame = ttk.Frame(root, relief=tk.SUNKEN)
@@ -117,14 +162,36 @@ class SimpleDomainFinderGUI:
         self.process = None
         self.log_thread = None
         self.running = False
+        self._log_q = queue.Queue()
+        self._pending_idle_status = None  # 后台线程设置，由_drain_log_queue在主线程显示
+        self._drain_job = self.root.after(LOG_FLUSH_INTERVAL_MS, self._drain_log_queue)
         
         # 更新日志
         self.add_log('域名查找工具已启动，请设置参数并点击"开始检查"')
-        self.add_log(f"系统信息: {platform.system()} {platform.release()} ({platform.machine()})")
-        self.add_log(f"macOS版本: {platform.mac_ver()[0]} (环境修补已应用)")
+        self.add_log(f"系统信息: {SYSTEM} {RELEASE} ({MACHINE})")
+        self.add_log(f"macOS版本: {MAC_VERSION} (环境修补已应用)")
         
         # 检查必要文件
         self._check_files()
+        
+        # 后台预编译numba函数，编译结果缓存到磁盘，检查子进程直接加载
+        self._idle_status = self.status_var.get()
+        threading.Thread(target=self._warm_up_jit, daemon=True).start()
+    
+    def _warm_up_jit(self):
+        """导入domain_finder并预编译其中的numba函数，失败时忽略（检查时会再编译）"""
+        try:
+            import domain_finder
+            if domain_finder.warm_up_jit():
+                # 不在后台线程中调用Tk，交给主线程的_drain_log_queue显示
+                self._pending_idle_status = "就绪 (JIT已预编译)"
+        except Exception as e:
+            print(f"预编译失败: {str(e)}")
+    
+    def _set_idle_status(self, message):
+        """没有检查任务运行、状态栏仍是初始状态时更新状态栏"""
+        if not self.running and self.status_var.get() == self._idle_status:
+            self.status_var.set(message)
     
     def _check_files(self):
         """检查必要文件是否存在"""
@@ -151,44 +218,59 @@ class SimpleDomainFinderGUI:
         # 更新状态栏
         self.status_var.set(message)
     
+    def queue_log(self, message, error=False):
+        """添加日志消息（可在任意线程调用），由_drain_log_queue在主线程批量写入"""
+        self._log_q.put((time.strftime('%H:%M:%S'), message, error))
+    
+    def _drain_log_queue(self):
+        """把队列中积累的日志一次性写入日志框，并只用最后一行更新状态栏"""
+        segments = []
+        last_message = None
+        try:
+            for _ in range(LOG_DRAIN_MAX):
+                ts, message, error = self._log_q.get_nowait()
+                line = f"{ts} - {message}\n"
+                tags = ("error",) if error else ()
+                # 相邻且样式相同的行合并为一段
+                if segments and segments[-1][1] == tags:
+                    segments[-1][0].append(line)
+                else:
+                    segments.append(([line], tags))
+                last_message = message
+        except queue.Empty:
+            pass
+        
+        if segments:
+            args = []
+            for lines, tags in segments:
+                args += ["".join(lines), tags]
+            self.log_text.config(state=tk.NORMAL)
+            self.log_text.insert(tk.END, *args)
+            self.log_text.see(tk.END)
+            self.log_text.config(state=tk.DISABLED)
+            self.status_var.set(last_message)
+        
+        if self._pending_idle_status is not None:
+            self._set_idle_status(self._pending_idle_status)
+            self._pending_idle_status = None
+        
+        self._drain_job = self.root.after(LOG_FLUSH_INTERVAL_MS, self._drain_log_queue)
+    
     def build_command(self, api_only=False):
         """构建命令行参数"""
-        cmd = []
-        
         if api_only:
-            cmd.append("--only-verify-api")
-            cmd.append("--limit")
-            cmd.append(str(min(10, self.limit_var.get())))
-        else:
-            # 域名长度
-            cmd.append("--length")
-            cmd.append(str(self.length_var.get()))
-            
-            # 域名类型
-            domain_type = self.domain_type.get()
-            if domain_type == "letters":
-                cmd.append("--letters")
-            elif domain_type == "digits":
-                cmd.append("--digits")
-            elif domain_type == "mixed":
-                cmd.append("--alphanumeric")
-            
-            # 检查数量
-            cmd.append("--limit")
-            cmd.append(str(self.limit_var.get()))
-            
-            # 线程数
-            cmd.append("--threads")
-            cmd.append(str(self.threads_var.get()))
-            
-            # API验证
-            if self.use_api.get():
-                cmd.append("--verify-api")
-        
-        # 添加详细输出
-        cmd.append("--verbose")
-        
-        return cmd
+            return ["--only-verify-api", "--limit", str(min(10, self.limit_var.get())), "--verbose"]
+        
+        # 未知的域名类型（下拉框可手动输入）不添加类型参数
+        type_flag = self._TYPE_FLAG.get(self.domain_type.get())
+        return [
+            "--length", str(self.length_var.get()),
+            *([type_flag] if type_flag else []),
+            "--limit", str(self.limit_var.get()),
+            "--threads", str(self.threads_var.get()),
+            *(["--verify-api"] if self.use_api.get() else []),
+            "--verbose",
+        ]
     
     def start_check(self):
         """开始域名检查"""
@@ -221,14 +303,21 @@ class SimpleDomainFinderGUI:
         self.add_log(start_message)
         self.add_log(f"命令: python domain_finder.py {' '.join(cmd)}")
         
+        if not USE_SUBPROCESS:
+            # 在后台线程中直接调用domain_finder，复用已加载的模块、编译缓存和网络连接；
+            # 不设为守护线程，关闭窗口时等待其保存结果后再退出
+            self.log_thread = threading.Thread(target=self._invoke, args=(cmd,))
+            self.log_thread.start()
+            return
+        
         try:
             # 启动进程
             self.process = subprocess.Popen(
                 ["python", "domain_finder.py"] + cmd,
+                env=patched_env(),
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                universal_newlines=True,
-                bufsize=1
+                bufsize=0
             )
             
             # 在线程中读取输出
@@ -239,22 +328,52 @@ class SimpleDomainFinderGUI:
             self.add_log(f"启动失败: {str(e)}", error=True)
             self.running = False
     
+    def _invoke(self, cmd):
+        """在当前进程中运行domain_finder，日志通过队列批量写入日志框"""
+        handler = _GUILogHandler(self.queue_log)
+        logging.getLogger().addHandler(handler)
+        try:
+            returncode = run_in_process(cmd)
+            if returncode is None:
+                self.queue_log("无法导入domain_finder模块", error=True)
+            elif returncode == 0:
+                self.queue_log("检查完成", error=False)
+            else:
+                self.queue_log(f"检查异常退出，返回码: {returncode}", error=True)
+        except KeyboardInterrupt:
+            self.queue_log("检查已停止，已完成的结果已保存", error=True)
+        except Exception as e:
+            self.queue_log(f"检查出错: {str(e)}", error=True)
+        finally:
+            logging.getLogger().removeHandler(handler)
+            self.running = False
+    
     def _read_output(self):
         """读取进程输出"""
         try:
-            for line in iter(self.process.stdout.readline, ''):
-                if line:
-                    self.add_log(line.rstrip())
+            # 每次读取管道中已有的全部输出（最多64KB），再按行拆分，不逐行调用readline
+            fd = self.process.stdout.fileno()
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+            leftover = ''
+            while True:
+                chunk = os.read(fd, PIPE_READ_SIZE)
+                text = leftover + decoder.decode(chunk, final=not chunk)
+                lines = text.split('\n')
+                leftover = lines.pop() if chunk else ''
+                for line in lines:
+                    self.queue_log(line.rstrip())
+                if not chunk:
+                    break
             
             self.process.stdout.close()
             self.process.wait()
             
             if self.process.returncode == 0:
-                self.add_log("检查完成", error=False)
+                self.queue_log("检查完成", error=False)
             else:
-                self.add_log(f"检查异常退出，返回码: {self.process.returncode}", error=True)
+                self.queue_log(f"检查异常退出，返回码: {self.process.returncode}", error=True)
         except Exception as e:
-            self.add_log(f"读取输出出错: {str(e)}", error=True)
+            self.queue_log(f"读取输出出错: {str(e)}", error=True)
         finally:
             self.running = False
     
@@ -269,15 +388,15 @@ class SimpleDomainFinderGUI:
                 
                 self.add_log("查看可用域名结果:")
                 
-                # 读取文件
-                with open('available_domains.csv', 'r') as f:
-                    lines = f.readlines()
+                # 映射文件后一次性写入日志框，不逐行插入
+                with map_file('available_domains.csv') as mm:
+                    if mm is not None:
+                        self.log_text.config(state=tk.NORMAL)
+                        self.log_text.insert(tk.END, mm[:].decode('utf-8'))
+                        self.log_text.see(tk.END)
+                        self.log_text.config(state=tk.DISABLED)
                 
-                # 显示结果
-                for line in lines:
-                    self.add_log(line.strip())
-                
-                self.add_log(f"找到 {len(lines)} 个可能可用的域名")
+                self.add_log(f"找到 {count_lines('available_domains.csv')} 个可能可用的域名")
             except Exception as e:
                 self.add_log(f"读取结果出错: {str(e)}", error=True)
         else:
@@ -286,8 +405,8 @@ class SimpleDomainFinderGUI:
     def open_cli(self):
         """打开命令行界面"""
         try:
-            if platform.system() == "Darwin":  # macOS
-                subprocess.Popen(["python", "run_m2.py"])
+            if SYSTEM == "Darwin":  # macOS
+                subprocess.Popen(["python", "run_m2.py"], env=patched_env())
                 self.add_log("已启动命令行界面")
             else:
                 subprocess.Popen(["start", "python", "run_m2.py"], shell=True)
@@ -304,18 +423,53 @@ class SimpleDomainFinderGUI:
                         self.process.terminate()
                     except:
                         pass
-                self.root.destroy()
+                elif self._stop_in_process_check():
+                    # 等检查保存完结果后再关闭窗口，等待期间界面照常刷新
+                    return
+                self._destroy()
+        else:
+            self._destroy()
+
+    def _destroy(self):
+        """停止日志刷新并销毁窗口"""
+        self.root.after_cancel(self._drain_job)
+        self.root.destroy()
+
+    def _stop_in_process_check(self):
+        """
+        通知进程内运行的检查停止，检查线程结束后自动关闭窗口
+
+        Returns:
+            bool: 检查线程仍在运行、需要等待时为True
+        """
+        if self.log_thread is None or not self.log_thread.is_alive():
+            return False
+        self.status_var.set("正在停止检查并保存结果...")
+        try:
+            import domain_finder
+            domain_finder.request_stop()
+        except ImportError:
+            pass
+        # 重复点击关闭按钮时不再询问
+        self.root.protocol("WM_DELETE_WINDOW", lambda: None)
+        self.root.after(STOP_POLL_INTERVAL_MS, self._close_when_stopped)
+        return True
+
+    def _close_when_stopped(self):
+        """检查线程结束后关闭窗口，否则稍后再检查"""
+        if self.log_thread.is_alive():
+            self.root.after(STOP_POLL_INTERVAL_MS, self._close_when_stopped)
         else:
-            self.root.destroy()
+            self._destroy()
 
 def main():
     """主函数"""
     try:
         # 设置更好的缩放
-        if platform.system() == "Windows":
+        if SYSTEM == "Windows":
             from ctypes import windll
             windll.shcore.SetProcessDpiAwareness(1)
-        elif platform.system() == "Darwin":  # macOS
+        elif SYSTEM == "Darwin":  # macOS
             os.environ['TK_SILENCE_DEPRECATION'] = '1'  # 抑制macOS的tk警告
         
         # 创建主窗口
@@ -324,7 +478,7 @@ def main():
         
         # 设置图标（如果存在）
         icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "icons", "icon.ico")
-        if os.path.exists(icon_path) and platform.system() == "Windows":
+        if os.path.exists(icon_path) and SYSTEM == "Windows":
             root.iconbitmap(icon_path)
         
         # 启动主循环
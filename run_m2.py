@@ -12,9 +12,16 @@ import sys
 import time
 import subprocess
 import signal
-import csv
+import shlex
 from datetime import datetime
 
+import numpy as np
+
+from batch_common import iter_line_blocks, map_file, run_in_process
+
+# 为True时每次检查都启动domain_finder.py子进程（--subprocess，便于调试）
+USE_SUBPROCESS = False
+
 # 尝试导入语言配置模块
 try:
     from language_config import get_text, get_language
@@ -77,26 +84,22 @@ except ImportError:
         else:
             return en_texts.get(key, key)
 
-def print_header():
-    """打印标题头部 / Print header"""
-    print("\n" + "=" * 80)
-    if get_language() == "zh":
-        print(f"  {get_text('title')} - Apple M2 版本")
-    else:
-        print(f"  {get_text('title')} - Apple M2 Version")
-    print("=" * 80)
+def format_header():
+    """生成标题头部文本 / Build header text"""
+    version = "Apple M2 版本" if get_language() == "zh" else "Apple M2 Version"
+    return "\n".join(["\n" + "=" * 80, f"  {get_text('title')} - {version}", "=" * 80])
 
-def print_menu():
-    """打印主菜单 / Print main menu"""
-    print("\n选择操作：" if get_language() == "zh" else "\nSelect operation:")
-    print(f"1. {get_text('menu_basic')} (--letters --length 4 --limit 100)")
-    print(f"2. {get_text('menu_api')} (--verify-api)")
-    print(f"3. {get_text('menu_high_perf')} (--threads 50)")
-    print(f"4. {get_text('menu_custom')}")
-    print(f"5. {get_text('menu_view')}")
-    print(f"6. {get_text('menu_exit')}")
-    
-    return input(f"{get_text('prompt_option')}")
+def format_menu():
+    """生成主菜单文本 / Build main menu text"""
+    return "\n".join([
+        "\n选择操作：" if get_language() == "zh" else "\nSelect operation:",
+        f"1. {get_text('menu_basic')} (--letters --length 4 --limit 100)",
+        f"2. {get_text('menu_api')} (--verify-api)",
+        f"3. {get_text('menu_high_perf')} (--threads 50)",
+        f"4. {get_text('menu_custom')}",
+        f"5. {get_text('menu_view')}",
+        f"6. {get_text('menu_exit')}",
+    ])
 
 def run_command(cmd_args):
     """
@@ -109,16 +112,26 @@ def run_command(cmd_args):
     Returns:
         bool: 命令是否成功执行 / Whether the command was executed successfully
     """
-    full_cmd = f"python3 domain_finder.py {cmd_args}"
-    print(f"\n{get_text('running_command')}: {full_cmd}")
-    
     try:
-        result = subprocess.run(full_cmd, shell=True)
-        if result.returncode == 0:
+        argv = shlex.split(cmd_args)
+        full_cmd = [sys.executable, "domain_finder.py", *argv]
+        print(f"\n{get_text('running_command')}: {' '.join(full_cmd)}")
+        
+        # 默认在当前进程中运行，多次检查复用已加载的模块和网络连接
+        returncode = None
+        if not USE_SUBPROCESS:
+            try:
+                returncode = run_in_process(argv, interruptible=True)
+            except KeyboardInterrupt:
+                returncode = 130
+        if returncode is None:
+            # 直接启动解释器，不经过shell
+            returncode = subprocess.run(full_cmd).returncode
+        if returncode == 0:
             print(f"\n{get_text('command_complete')}")
             return True
         else:
-            print(f"\n{get_text('command_failed')} (code: {result.returncode})")
+            print(f"\n{get_text('command_failed')} (code: {returncode})")
             return False
     except Exception as e:
         print(f"\n{get_text('command_failed')}: {str(e)}")
@@ -136,27 +149,34 @@ def view_available_domains():
         return
     
     try:
-        domains = []
-        with open(available_file, 'r') as f:
-            reader = csv.reader(f)
-            for row in reader:
-                if len(row) >= 3:
-                    domains.append(row)
+        total = 0
+        # 每块记录拆成域名、时间、备注三列，按列统一对齐后一次输出
+        with map_file(available_file) as mm:
+            for block in iter_line_blocks(mm):
+                lines = np.char.rstrip(np.array(b''.join(block).decode('utf-8').split('\n')[:len(block)]))
+                domain, sep1, rest = np.char.partition(lines, ',').T
+                check_time, sep2, note = np.char.partition(rest, ',').T
+                # 至少有三个字段的记录才显示；备注中的逗号保留在备注内
+                valid = (sep1 == ',') & (sep2 == ',')
+                if not valid.any():
+                    continue
+                if total == 0:
+                    print(f"\n{get_text('available_domains')}:")
+                    print(f"{'=' * 70}")
+                    print(f"{get_text('domain'):<30} | {get_text('check_time'):<20} | {get_text('notes')}")
+                    print(f"{'-' * 30}---{'-' * 20}---{'-' * 20}")
+                out = np.char.add(np.char.ljust(domain[valid], 30), ' | ')
+                out = np.char.add(np.char.add(out, np.char.ljust(check_time[valid], 20)), ' | ')
+                out = np.char.add(out, note[valid])
+                print('\n'.join(out.tolist()))
+                total += int(valid.sum())
         
-        if not domains:
+        if not total:
             print(f"\n{get_text('no_results')}")
             return
         
-        print(f"\n{get_text('available_domains')}:")
         print(f"{'=' * 70}")
-        print(f"{get_text('domain'):<30} | {get_text('check_time'):<20} | {get_text('notes')}")
-        print(f"{'-' * 30}---{'-' * 20}---{'-' * 20}")
-        
-        for domain, check_time, note in domains:
-            print(f"{domain:<30} | {check_time:<20} | {note}")
-        
-        print(f"{'=' * 70}")
-        print(f"总计: {len(domains)}个域名" if get_language() == "zh" else f"Total: {len(domains)} domains")
+        print(f"总计: {total}个域名" if get_language() == "zh" else f"Total: {total} domains")
         
     except Exception as e:
         print(f"Error: {str(e)}")
@@ -172,21 +192,24 @@ def main():
     
     signal.signal(signal.SIGINT, signal_handler)
     
+    # 语言在启动时已确定，菜单文本和各选项的操作只生成一次
+    screen = format_header() + "\n" + format_menu()
+    prompt = get_text('prompt_option')
+    actions = {
+        '1': lambda: run_command("--letters --length 4 --limit 100"),
+        '2': lambda: run_command("--letters --length 4 --limit 50 --verify-api"),
+        '3': lambda: run_command("--letters --length 4 --limit 500 --threads 50"),
+        '4': lambda: run_command(input(f"\n{get_text('custom_prompt')}")),
+        '5': view_available_domains,
+    }
+    
     while True:
-        print_header()
-        choice = print_menu()
+        print(screen)
+        choice = input(prompt)
         
-        if choice == '1':
-            run_command("--letters --length 4 --limit 100")
-        elif choice == '2':
-            run_command("--letters --length 4 --limit 50 --verify-api")
-        elif choice == '3':
-            run_command("--letters --length 4 --limit 500 --threads 50")
-        elif choice == '4':
-            custom_cmd = input(f"\n{get_text('custom_prompt')}")
-            run_command(custom_cmd)
-        elif choice == '5':
-            view_available_domains()
+        action = actions.get(choice)
+        if action is not None:
+            action()
         elif choice == '6':
             print(f"\n{get_text('thank_you')}")
             break
@@ -201,6 +224,7 @@ if __name__ == "__main__":
         if len(sys.argv) > 1 and sys.argv[1].startswith("--lang="):
             lang = sys.argv[1].split("=")[1]
             os.environ["DOMAIN_FINDER_LANG"] = lang
+        USE_SUBPROCESS = "--subprocess" in sys.argv[1:]
         
         main()
     except KeyboardInterrupt:
@@ -10,12 +10,19 @@ import sys
 import platform
 import subprocess
 import signal
-import time
 import argparse
 
+from batch_common import count_lines, iter_line_blocks, map_file, run_in_process
+
 # 设置环境变量跳过系统版本检查
 os.environ['SYSTEM_VERSION_COMPAT'] = '1'
 
+# 自动批量检查时DNS查询的初始速率（每秒）
+AUTO_DNS_RATE = 200
+
+# 为True时每次检查都启动domain_finder.py子进程（--subprocess，便于调试）
+USE_SUBPROCESS = False
+
 def print_header():
     """打印程序头部信息"""
     print("=" * 80)
@@ -31,29 +38,42 @@ def get_available_domains():
     print("\n已发现的可用域名:")
     print("-" * 40)
     try:
-        with open('available_domains.csv', 'r') as f:
-            domains = f.readlines()
-            for domain in domains:
-                print(domain.strip())
+        # 映射文件后按块输出，每块只调用一次write
+        with map_file('available_domains.csv') as mm:
+            for block in iter_line_blocks(mm):
+                text = b''.join(block).decode('utf-8')
+                sys.stdout.write(text if text.endswith('\n') else text + '\n')
         print("-" * 40)
-        print(f"共找到 {len(domains)} 个可能可用的域名")
+        print(f"共找到 {count_lines('available_domains.csv')} 个可能可用的域名")
     except Exception as e:
         print(f"读取域名文件时出错: {str(e)}")
 
 def run_domain_checker(args):
-    """运行域名检查器"""
-    cmd = [sys.executable, 'domain_finder.py'] + args
-    print(f"\n执行命令: {' '.join(cmd)}\n")
+    """
+    运行域名检查器
     
+    默认在当前进程中运行，多次检查复用已加载的模块、DNS套接字和HTTPS连接池；
+    指定--subprocess或无法进程内运行时改为启动子进程。
+    
+    Args:
+        args: domain_finder的命令行参数
+    """
     try:
-        # 直接执行并将输出传递到当前控制台
-        process = subprocess.Popen(cmd)
-        
-        # 等待进程完成
-        process.wait()
+        # 交互界面忽略了SIGINT（让Ctrl+C只结束子进程），进程内运行时临时恢复默认处理
+        returncode = None if USE_SUBPROCESS else run_in_process(args, interruptible=True)
+        if returncode is None:
+            cmd = [sys.executable, 'domain_finder.py'] + args
+            print(f"\n执行命令: {' '.join(cmd)}\n")
+            
+            # 直接执行并将输出传递到当前控制台
+            process = subprocess.Popen(cmd)
+            
+            # 等待进程完成
+            process.wait()
+            returncode = process.returncode
         
-        if process.returncode != 0:
-            print(f"域名检查器异常退出，返回码: {process.returncode}")
+        if returncode != 0:
+            print(f"域名检查器异常退出，返回码: {returncode}")
             return False
         else:
             print("域名检查器已完成运行")
@@ -66,39 +86,46 @@ def run_domain_checker(args):
         print(f"执行域名检查器时出错: {str(e)}")
         return False
 
+MENU = """
+选择操作：
+1. 基本域名检查 (--letters --length 4 --limit 100)
+2. 带API验证的域名检查 (--verify-api)
+3. 高性能检查 (--threads 50)
+4. 自定义命令
+5. 查看已发现可用域名
+6. 批量自动检查 (先基本检查，然后API验证)
+7. 退出"""
+
+def run_custom_command():
+    """读取用户输入的参数并运行域名检查器"""
+    custom_args = input("请输入自定义参数 (例如: --letters --length 3 --limit 50): ").strip()
+    if custom_args:
+        run_domain_checker(custom_args.split())
+    else:
+        print("未提供参数，操作取消")
+
 def run_cli():
     """运行命令行界面"""
     print_header()
     
+    actions = {
+        '1': lambda: run_domain_checker(['--letters', '--length', '4', '--limit', '100']),
+        '2': lambda: run_domain_checker(['--letters', '--length', '4', '--limit', '50', '--verify-api']),
+        '3': lambda: run_domain_checker(['--letters', '--length', '4', '--limit', '200', '--threads', '50']),
+        '4': run_custom_command,
+        '5': get_available_domains,
+        '6': run_auto_batch,
+    }
+    
     while True:
-        print("\n选择操作：")
-        print("1. 基本域名检查 (--letters --length 4 --limit 100)")
-        print("2. 带API验证的域名检查 (--verify-api)")
-        print("3. 高性能检查 (--threads 50)")
-        print("4. 自定义命令")
-        print("5. 查看已发现可用域名")
-        print("6. 批量自动检查 (先基本检查，然后API验证)")
-        print("7. 退出")
+        print(MENU)
         
         try:
             choice = input("请输入选项 [1-7]: ").strip()
             
-            if choice == '1':
-                run_domain_checker(['--letters', '--length', '4', '--limit', '100'])
-            elif choice == '2':
-                run_domain_checker(['--letters', '--length', '4', '--limit', '50', '--verify-api'])
-            elif choice == '3':
-                run_domain_checker(['--letters', '--length', '4', '--limit', '200', '--threads', '50'])
-            elif choice == '4':
-                custom_args = input("请输入自定义参数 (例如: --letters --length 3 --limit 50): ").strip()
-                if custom_args:
-                    run_domain_checker(custom_args.split())
-                else:
-                    print("未提供参数，操作取消")
-            elif choice == '5':
-                get_available_domains()
-            elif choice == '6':
-                run_auto_batch()
+            action = actions.get(choice)
+            if action is not None:
+                action()
             elif choice == '7':
                 print("谢谢使用域名查找工具！")
                 return True
@@ -118,20 +145,20 @@ def run_auto_batch():
     print("\n开始自动批量检查流程...")
     
     # 1. 先运行多组基本检查以收集潜在可用域名
+    # 所有批次在当前进程中运行，共用一次导入的domain_finder和同一组DNS套接字
     lengths = [3, 4]
     batches = [100, 200, 300]
     
     for length in lengths:
         for batch in batches:
             print(f"\n[自动批量] 正在检查长度为{length}的域名，批次大小: {batch}")
-            success = run_domain_checker(['--letters', '--length', str(length), '--limit', str(batch), '--threads', '50'])
+            # 不在批次之间暂停，而是限制每个DNS查询的速率：从每秒AUTO_DNS_RATE个开始，
+            # 应答变慢时自动减速；进程内的各批次沿用已调整的速率
+            # 不指定--threads，使用domain_finder按CPU核数估算的默认值
+            success = run_domain_checker(['--letters', '--length', str(length), '--limit', str(batch),
+                                          '--dns-rate', str(AUTO_DNS_RATE)])
             if not success:
                 print("基本检查失败，跳过该批次")
-                continue
-            
-            # 每次检查后暂停几秒，避免过于频繁的请求
-            print("暂停5秒...")
-            time.sleep(5)
     
     # 2. 对收集到的可用域名进行API验证
     print("\n[自动批量] 所有基本检查完成，开始API验证...")
@@ -162,11 +189,14 @@ def parse_args():
     """解析命令行参数"""
     parser = argparse.ArgumentParser(description='域名查找工具 - 命令行版本')
     parser.add_argument('--auto', action='store_true', help='自动执行批量检查，无需用户交互')
+    parser.add_argument('--subprocess', action='store_true', help='每次检查启动独立的domain_finder.py子进程')
     return parser.parse_args()
 
 def main():
     """主函数"""
+    global USE_SUBPROCESS
     args = parse_args()
+    USE_SUBPROCESS = args.subprocess
     
     if not check_environment():
         print("环境检查未通过，程序无法运行")
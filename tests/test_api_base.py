@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+from unittest import mock
+import sys
+import os
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from tests.test_dns_resolver import FakeDNSServer
+
+# 导入待测试模块
+import api_base
+from api_base import BaseDomainAPI, DNS_REGISTERED_NOTE, ResultKind
+from dns_resolver import UDPResolver
+from result_cache import ResultCache
+
+class FakeAPI(BaseDomainAPI):
+    """按域名前缀返回固定结果的测试客户端"""
+
+    rate_limit = 0.001
+    provider = 'fake'
+
+    def _build_request(self, domain):
+        return 'GET', f'http://example.invalid/{domain}', {}
+
+    def _parse_response(self, status, text):
+        if text == 'error':
+            return ResultKind.ERROR, "API错误: 500"
+        if text == 'free':
+            return ResultKind.AVAILABLE, "价格: 9.99"
+        return ResultKind.REGISTERED, "域名已注册"
+
+def fake_response(text):
+    return mock.Mock(status_code=200, text=text)
+
+class TestResponseCache(unittest.TestCase):
+    """查询结果缓存测试类"""
+
+    def test_cached_result_skips_request(self):
+        """测试确定的结果被缓存，错误结果不缓存"""
+        api = FakeAPI(timeout=1)
+        self.addCleanup(api.close)
+        with mock.patch.object(api.session, 'request', return_value=fake_response('taken')) as request:
+            self.assertEqual(api.check_domain('abc.com'), (False, "域名已注册"))
+            self.assertEqual(api.check_domain('ABC.com'), (False, "域名已注册"))
+            self.assertEqual(request.call_count, 1)
+
+        with mock.patch.object(api.session, 'request', return_value=fake_response('error')) as request:
+            api.check_domain('xyz.com')
+            api.check_domain('xyz.com')
+            self.assertEqual(request.call_count, 2)
+
+    def test_persistent_cache(self):
+        """测试结果写入持久化缓存，新的客户端实例可以直接复用"""
+        cache = ResultCache(':memory:')
+        self.addCleanup(cache.close)
+        api = FakeAPI(timeout=1, cache=cache)
+        self.addCleanup(api.close)
+        with mock.patch.object(api.session, 'request', return_value=fake_response('free')):
+            api.check_domain('abc.com')
+
+        other = FakeAPI(timeout=1, cache=cache)
+        self.addCleanup(other.close)
+        with mock.patch.object(other.session, 'request') as request:
+            self.assertEqual(other.check_domain('abc.com'), (True, "价格: 9.99"))
+            request.assert_not_called()
+
+class TestBatchCheck(unittest.TestCase):
+    """批量查询测试类"""
+
+    def test_threaded_abort_on_errors(self):
+        """测试线程池模式下连续错误达到上限后取消剩余查询"""
+        api = FakeAPI(timeout=1)
+        self.addCleanup(api.close)
+        domains = [f'd{i}.com' for i in range(50)]
+        with mock.patch.object(api.session, 'request', return_value=fake_response('error')) as request:
+            results = api.batch_check(domains, max_errors=3, concurrency=1, use_async=False)
+        self.assertEqual(list(results), domains[:3])
+        self.assertLessEqual(request.call_count, 4)
+
+    def test_dns_precheck_skips_registered(self):
+        """测试DNS预检筛掉的已注册域名不再调用API"""
+        server = FakeDNSServer()
+        self.addCleanup(server.stop)
+        self.addCleanup(api_base._dns_cache.clear)
+        patcher = mock.patch.multiple(api_base, DNS_CACHE_FILE=':memory:', _dns_store=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        api = FakeAPI(timeout=1)
+        self.addCleanup(api.close)
+        api._create_dns_resolver = lambda: UDPResolver(['127.0.0.1'], port=server.port, timeout=1)
+
+        domains = ['taken1.com', 'free1.com', 'taken2.com']
+        with mock.patch.object(api.session, 'request', return_value=fake_response('free')) as request:
+            results = api.batch_check(domains, use_async=False, dns_precheck=True)
+        self.assertEqual(list(results), domains)
+        self.assertEqual(results['taken1.com'], (False, DNS_REGISTERED_NOTE))
+        self.assertEqual(results['free1.com'], (True, "价格: 9.99"))
+        self.assertEqual(request.call_count, 1)
+
+        # 进程内缓存清空后仍可从磁盘缓存取得预检结果
+        api_base._dns_cache.clear()
+        self.assertEqual(api.dns_precheck(['taken1.com']), {'taken1.com': True})
+
+if __name__ == '__main__':
+    unittest.main()
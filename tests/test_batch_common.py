@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# 导入待测试模块
+from batch_common import LineCounter, ProgressWriter
+
+class TestLineCounter(unittest.TestCase):
+    """增量行数统计测试类"""
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.csv')
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+        self.counter = LineCounter()
+
+    def write(self, text, mode='a'):
+        with open(self.path, mode) as f:
+            f.write(text)
+
+    def test_incremental_append(self):
+        """测试追加内容后只统计新增的行"""
+        self.write("a\nb\n")
+        self.assertEqual(self.counter.count(self.path), 2)
+        self.write("c\nd\ne\n")
+        self.assertEqual(self.counter.count(self.path), 5)
+        self.assertEqual(self.counter.count(self.path + '.missing'), 0)
+
+    def test_rewritten_file(self):
+        """测试文件被整体重写后重新统计"""
+        self.write("a\nb\nc\n")
+        self.assertEqual(self.counter.count(self.path), 3)
+        self.write("x\n", mode='w')
+        self.assertEqual(self.counter.count(self.path), 1)
+        self.write("y\ny\ny\ny\n", mode='w')
+        self.assertEqual(self.counter.count(self.path), 4)
+
+    def test_same_size_rewrite(self):
+        """测试文件被重写为相同大小但不同内容时重新统计"""
+        self.write("ab\ncd\n", mode='w')
+        self.assertEqual(self.counter.count(self.path), 2)
+        self.write("abc\nde", mode='w')
+        os.utime(self.path, ns=(0, os.stat(self.path).st_mtime_ns + 1))
+        self.assertEqual(self.counter.count(self.path), 1)
+
+class TestProgressWriter(unittest.TestCase):
+    """批次进度写入器测试类"""
+
+    def test_header_written_once(self):
+        """测试只有新文件写入表头，关闭后再次打开继续追加"""
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+
+        for value in ('a', 'b'):
+            writer = ProgressWriter(path, ['prefix', 'success'])
+            writer.write({'prefix': value, 'success': True})
+            writer.close()
+
+        with open(path) as f:
+            self.assertEqual(f.read().splitlines(), ['prefix,success', 'a,True', 'b,True'])
+
+    def test_upgrade_old_columns(self):
+        """测试旧文件的列与当前列不同时，按列名重排旧记录"""
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        with open(path, 'w') as f:
+            f.write("prefix,success\na,True\n")
+
+        writer = ProgressWriter(path, ['prefix', 'limit', 'success'])
+        writer.write({'prefix': 'b', 'limit': 100, 'success': False})
+        writer.close()
+
+        with open(path) as f:
+            self.assertEqual(f.read().splitlines(),
+                             ['prefix,limit,success', 'a,,True', 'b,100,False'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import socket
+import struct
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import sys
+import os
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# 导入待测试模块
+import dns_resolver
+
+def fake_answer(query):
+    """名称以free开头返回NXDOMAIN，其余返回NOERROR"""
+    txid = struct.unpack_from('!H', query)[0]
+    first_label = query[13:13 + query[12]]
+    rcode = 3 if first_label.startswith(b'free') else 0
+    header = struct.pack('!HHHHHH', txid, 0x8180 | rcode, 1, 0, 0, 0)
+    return header + query[12:]
+
+class FakeDoHHandler(BaseHTTPRequestHandler):
+    """本地假DoH服务器"""
+
+    def do_POST(self):
+        query = self.rfile.read(int(self.headers['Content-Length']))
+        answer = fake_answer(query)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/dns-message')
+        self.send_header('Content-Length', str(len(answer)))
+        self.end_headers()
+        self.wfile.write(answer)
+
+    def log_message(self, *args):
+        pass
+
+class FakeDNSServer:
+    """本地UDP假DNS服务器：名称以free开头返回NXDOMAIN，其余返回NOERROR"""
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.settimeout(0.2)
+        self.port = self.sock.getsockname()[1]
+        self.running = True
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _serve(self):
+        while self.running:
+            try:
+                data, addr = self.sock.recvfrom(4096)
+            except socket.timeout:
+                continue
+            self.sock.sendto(fake_answer(data), addr)
+
+    def stop(self):
+        self.running = False
+        self.thread.join()
+        self.sock.close()
+
+class TestDNSResolver(unittest.TestCase):
+    """DNS解析模块测试类"""
+
+    def test_build_and_parse(self):
+        """测试报文构建与解析"""
+        packet = dns_resolver.build_query(0x1234, 'abc.com', 'NS')
+        self.assertEqual(packet[12:], b'\x03abc\x03com\x00\x00\x02\x00\x01')
+        self.assertEqual(dns_resolver.parse_response(packet), (0x1234, 0, 0))
+
+    def test_pipelined_queries(self):
+        """测试共享套接字上的并发查询"""
+        self._check_pipelined(use_mmsg=False)
+
+    @unittest.skipUnless(dns_resolver.MMSG_AVAILABLE, "需要sendmmsg/recvmmsg")
+    def test_pipelined_queries_mmsg(self):
+        """测试用sendmmsg/recvmmsg批量收发的并发查询"""
+        self._check_pipelined(use_mmsg=True)
+
+    def _check_pipelined(self, use_mmsg):
+        server = FakeDNSServer()
+        self.addCleanup(server.stop)
+
+        async def run():
+            resolver = dns_resolver.UDPResolver(nameservers=['127.0.0.1'], port=server.port, timeout=2,
+                                                use_mmsg=use_mmsg)
+            resolver.open()
+            try:
+                names = [f"free{i}.com" for i in range(300)] + [f"used{i}.com" for i in range(300)]
+                results = await asyncio.gather(*[resolver.query(name) for name in names])
+            finally:
+                resolver.close()
+            return results
+
+        results = asyncio.run(run())
+        rcodes = [rcode for rcode, _ in results]
+        self.assertEqual(rcodes[:300], [dns_resolver.RCODE_NXDOMAIN] * 300)
+        self.assertEqual(rcodes[300:], [dns_resolver.RCODE_NOERROR] * 300)
+
+    def test_doh_queries(self):
+        """测试DoH解析器"""
+        server = ThreadingHTTPServer(('127.0.0.1', 0), FakeDoHHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f"http://127.0.0.1:{server.server_address[1]}/dns-query"
+
+        async def run():
+            async with dns_resolver.DoHResolver(url=url, timeout=2) as resolver:
+                return await asyncio.gather(resolver.query('free1.com'), resolver.query('used1.com'))
+
+        results = asyncio.run(run())
+        self.assertEqual([rcode for rcode, _ in results],
+                         [dns_resolver.RCODE_NXDOMAIN, dns_resolver.RCODE_NOERROR])
+
+if __name__ == '__main__':
+    unittest.main()
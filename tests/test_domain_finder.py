@@ -14,9 +14,15 @@ import domain_finder
 class TestDomainFinder(unittest.TestCase):
     """域名查找工具测试类"""
 
-    def setUp(self):
-        """测试前设置"""
-        self.finder = domain_finder.DomainFinder()
+    @classmethod
+    def setUpClass(cls):
+        """所有测试共用一个查找器"""
+        cls.finder = domain_finder.DomainFinder()
+
+    @classmethod
+    def tearDownClass(cls):
+        """测试结束后释放查找器"""
+        cls.finder = None
         
     def test_generate_domain_names(self):
         """测试域名生成功能"""
@@ -46,6 +52,13 @@ class TestDomainFinder(unittest.TestCase):
             self.assertEqual(len(domain), 2)
             self.assertTrue(all(c.isdigit() for c in domain))
 
+    def test_valid_name_mask(self):
+        """测试域名名称校验"""
+        names = ['abc', 'a-b', '-ab', 'ab-', 'a_b', '', '中文', 'x9']
+        mask = domain_finder.valid_name_mask(names)
+        self.assertEqual(mask.tolist(), [True, True, False, False, False, False, False, True])
+        self.assertEqual(self.finder.filter_valid_names(names), ['abc', 'a-b', 'x9'])
+
     def test_check_domain_dns(self):
         """测试DNS域名检查功能（模拟测试）"""
         # 这里仅创建测试结构，实际测试需要模拟DNS响应
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+import unittest
+import sys
+import os
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# 导入待测试模块
+from rate_limiter import AdaptiveRateLimiter, TokenBucket
+
+class TestTokenBucket(unittest.TestCase):
+    """令牌桶测试类"""
+
+    def test_try_acquire(self):
+        """测试令牌用尽后需要等待补充"""
+        bucket = TokenBucket.per_interval(60, capacity=2)
+        self.assertTrue(bucket.try_acquire())
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+        self.assertGreater(bucket.wait_time(), 50)
+
+    def test_acquire_waits(self):
+        """测试阻塞获取会等待令牌补充"""
+        bucket = TokenBucket(rate=20)
+        bucket.acquire()
+        start = time.monotonic()
+        bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+class TestAdaptiveRateLimiter(unittest.TestCase):
+    """自适应令牌桶测试类"""
+
+    def test_adjusts_rate(self):
+        """测试连续慢请求后减速、连续快请求后加速"""
+        limiter = AdaptiveRateLimiter(200, slow_samples=5, grow_after=3)
+        for _ in range(4):
+            limiter.record(0.5)
+        self.assertEqual(limiter.rate, 200)
+        limiter.record(1.0, ok=False)
+        self.assertEqual(limiter.rate, 100)
+        for _ in range(3):
+            limiter.record(0.01)
+        self.assertAlmostEqual(limiter.rate, 110)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+import sys
+import os
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# 导入待测试模块
+from result_cache import ResultCache
+
+class TestResultCache(unittest.TestCase):
+    """检查结果缓存测试类"""
+
+    def setUp(self):
+        self.cache = ResultCache(':memory:', ttl=60)
+        self.addCleanup(self.cache.close)
+
+    def test_get_set(self):
+        """测试读写缓存"""
+        self.assertIsNone(self.cache.get('abc.com', 'dns'))
+        self.cache.set('abc.com', 'dns', False, None)
+        self.cache.set('abc.com', 'Porkbun', True, 'Porkbun价格: 9.68')
+        self.assertEqual(self.cache.get('abc.com', 'dns'), (False, None))
+        self.assertEqual(self.cache.get('abc.com', 'porkbun'), (True, 'Porkbun价格: 9.68'))
+
+    def test_expiry(self):
+        """测试普通结果过期、已注册结果永久有效"""
+        self.cache.ttl = -1
+        self.cache.set('free.com', 'dns', False, None)
+        self.cache.set('used.com', 'dns', True, None, permanent=True)
+        self.assertIsNone(self.cache.get('free.com', 'dns'))
+        self.assertEqual(self.cache.get('used.com', 'dns'), (True, None))
+
+    def test_flush_writes_through(self):
+        """测试flush后结果由后台线程写入数据库"""
+        for i in range(1200):
+            self.cache.set(f'd{i}.com', 'dns', True, None, permanent=True)
+        self.cache.flush()
+        self.assertEqual(self.cache._pending, {})
+        self.assertEqual(self.cache.get('d1199.com', 'dns'), (True, None))
+
+if __name__ == '__main__':
+    unittest.main()